@@ -0,0 +1,158 @@
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import List
+
+# Subcommands which must start fast, as they are called from shell pipelines
+COMMANDS = [
+    ["version"],
+    ["team"],
+    ["team", "--current"],
+    ["dataset", "local"],
+    ["dataset", "path", "demo"],
+]
+
+# Library modules which must not load the HTTP clients until a request is sent
+LIBRARY_MODULES = [
+    "darwin",
+    "darwin.dataset",
+    "darwin.dataset.remote_dataset",
+    "darwin.dataset.upload_manager",
+    "darwin.dataset.download_manager",
+    "darwin.async_client",
+]
+
+# Dependencies which are slow to import, and only needed to send requests
+HEAVY_MODULES = ["requests", "aiohttp"]
+
+
+def time_command(args: List[str], env: dict, runs: int) -> float:
+    """
+    Measures how long a command takes to run, in a fresh interpreter each time.
+
+    Parameters
+    ----------
+    args : list[str]
+        Command to run
+    env : dict
+        Environment to run the command in
+    runs : int
+        Number of times the command is run
+
+    Returns
+    -------
+    float
+        Median duration of the runs, in seconds
+    """
+    durations = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(args, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        durations.append(time.perf_counter() - start)
+    return statistics.median(durations)
+
+
+def find_eager_imports(env: dict) -> List[str]:
+    """
+    Imports each library module in a fresh interpreter and lists the heavy dependencies it
+    loads eagerly.
+
+    Parameters
+    ----------
+    env : dict
+        Environment to run the imports in
+
+    Returns
+    -------
+    list[str]
+        The offending imports, as `module -> dependency`
+    """
+    eager = []
+    for module in LIBRARY_MODULES:
+        code = (
+            f"import sys, {module}; "
+            f"print(' '.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", code], env=env, stdout=subprocess.PIPE, check=True
+        )
+        eager += [f"{module} -> {dependency}" for dependency in result.stdout.decode().split()]
+    return eager
+
+
+def run_benchmark(*, runs: int, threshold: float) -> bool:
+    """
+    Times the startup of the darwin CLI subcommands which do not talk to the server, against a
+    throwaway configuration, and reports the ones slower than the threshold. The time taken by
+    the interpreter to start, measured with a no-op, is not accounted in the threshold as it
+    varies from one machine to another. The library modules are checked not to import the HTTP
+    clients eagerly either.
+
+    Parameters
+    ----------
+    runs : int
+        Number of times each command is run
+    threshold : float
+        Maximum median duration allowed for a command on top of the interpreter, in milliseconds
+
+    Returns
+    -------
+    bool
+        Whether all the commands start within the threshold, and no library module imports
+        the HTTP clients eagerly
+    """
+    with tempfile.TemporaryDirectory() as home:
+        datasets_dir = Path(home) / "datasets"
+        (datasets_dir / "demo" / "images").mkdir(parents=True)
+        (datasets_dir / "demo" / "annotations").mkdir()
+        config_path = Path(home) / ".darwin" / "config.yaml"
+        config_path.parent.mkdir()
+        config_path.write_text(
+            "global:\n"
+            "  api_endpoint: https://darwin.v7labs.com/api/\n"
+            "  base_url: https://darwin.v7labs.com\n"
+            "  default_team: demo\n"
+            "teams:\n"
+            "  demo:\n"
+            "    api_key: key\n"
+            f"    datasets_dir: {datasets_dir}\n"
+        )
+        env = {**os.environ, "HOME": home, "PYTHONPATH": str(Path(__file__).parent)}
+
+        interpreter = time_command([sys.executable, "-c", "pass"], env, runs)
+        print(f"{'python (no-op)':<30}{interpreter * 1000:>8.1f} ms")
+        ok = True
+        for command in COMMANDS:
+            duration = time_command([sys.executable, "-m", "darwin.cli", *command], env, runs)
+            overhead = duration - interpreter
+            slow = overhead * 1000 > threshold
+            ok = ok and not slow
+            print(
+                f"{'darwin ' + ' '.join(command):<30}{duration * 1000:>8.1f} ms"
+                f" (+{overhead * 1000:.1f} ms){' SLOW' * slow}"
+            )
+        for eager in find_eager_imports(env):
+            ok = False
+            print(f"{'import ' + eager:<30} EAGER")
+    return ok
+
+
+if __name__ == "__main__":
+    # Parse arguments
+    parser = argparse.ArgumentParser(
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+        description="This script checks that the darwin CLI starts fast",
+    )
+    parser.add_argument("--runs", help="Number of runs of each command", default=10, type=int)
+    parser.add_argument(
+        "--threshold", help="Maximum startup time allowed, in ms", default=100.0, type=float
+    )
+    args = parser.parse_args()
+
+    # Run the actual code, failing if any command is too slow
+    sys.exit(0 if run_benchmark(**args.__dict__) else 1)
@@ -1,5 +1,14 @@
 import darwin.dataset
 import darwin.exceptions
 
-from .client import Client
 from .team import Team
+
+# Client pulls in the HTTP stack, hence is only imported at first use
+
+
+def __getattr__(name):
+    if name == "Client":
+        from .client import Client
+
+        return Client
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
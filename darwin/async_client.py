@@ -0,0 +1,383 @@
+# Requirements: aiohttp
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import TYPE_CHECKING, Awaitable, Callable, Dict, Optional
+
+from darwin.client import ENDPOINT_CLASSES
+from darwin.exceptions import InsufficientStorage, NotFound, Unauthorized
+from darwin.instrumentation import RequestRecord
+from darwin.retry import NO_RETRY
+from darwin.throttle import AdaptiveConcurrency
+from darwin.utils import urljoin
+
+if TYPE_CHECKING:
+    import aiohttp
+
+    from darwin.client import Client
+
+# Number of requests which can be in flight at the same time on one AsyncClient
+DEFAULT_MAX_CONCURRENCY = 1000
+
+
+class AsyncClient:
+    def __init__(self, client: "Client", max_concurrency: int = DEFAULT_MAX_CONCURRENCY):
+        """asyncio counterpart of Client. It shares the configuration, the authentication, the
+        rate limiters and the instrumentation of the synchronous client it is built from.
+        Its concurrency controllers are its own, one per endpoint class: they start at
+        max_concurrency requests in flight and only back off on errors, whereas the ones of the
+        synchronous client are sized for its threads. It must be used as an async context
+        manager from within a running event loop:
+
+            async with AsyncClient(client) as async_client:
+                await async_client.get("/datasets/")
+
+        Parameters
+        ----------
+        client : Client
+            Client to take the configuration and the authentication from
+        max_concurrency : int
+            Maximum number of connections open, and of requests in flight, at the same time
+        """
+        self.client = client
+        self.url = client.url
+        self.base_url = client.base_url
+        self.default_team = client.default_team
+        self.max_concurrency = max_concurrency
+        self.concurrency = {
+            endpoint_class: AdaptiveConcurrency(initial=max_concurrency, maximum=max_concurrency)
+            for endpoint_class in ENDPOINT_CLASSES
+        }
+        self._session: Optional["aiohttp.ClientSession"] = None
+        # Requests of this client in flight per endpoint class, bounded by their controller
+        self._in_flight = {endpoint_class: 0 for endpoint_class in ENDPOINT_CLASSES}
+        self._slots: Optional[asyncio.Condition] = None
+
+    @property
+    def session(self) -> "aiohttp.ClientSession":
+        """Pooled HTTP session of the client, bound to the running event loop"""
+        import aiohttp
+
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self.max_concurrency)
+            self._session = aiohttp.ClientSession(connector=connector)
+        return self._session
+
+    async def close(self):
+        """Closes all the pooled connections of the client"""
+        if self._session is not None:
+            await self._session.close()
+        self._session = None
+        self._slots = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def get(
+        self,
+        endpoint: str,
+        team: Optional[str] = None,
+        retry: bool = True,
+        raw: bool = False,
+        debug: bool = False,
+    ):
+        """Get something from the server trough HTTP. See Client.get()
+
+        Returns
+        -------
+        dict
+        Dictionary which contains the server response, or the body as bytes if raw is True
+
+        Raises
+        ------
+        NotFound
+            Resource not found
+        Unauthorized
+            Action is not authorized
+        """
+        response = await self._send("get", endpoint, team=team, retry=retry, debug=debug)
+
+        if response.status == 401:
+            raise Unauthorized()
+        if response.status == 404:
+            raise NotFound(urljoin(self.url, endpoint))
+        if raw:
+            return await response.read()
+        return await self._decode_response(response, debug)
+
+    async def put(
+        self,
+        endpoint: str,
+        payload: Dict,
+        team: Optional[str] = None,
+        retry: bool = False,
+        error_handlers: Optional[list] = None,
+        debug: bool = False,
+    ):
+        """Put something on the server trough HTTP. See Client.put()
+
+        Returns
+        -------
+        dict
+        Dictionary which contains the server response
+        """
+        response = await self._send(
+            "put", endpoint, team=team, retry=retry, debug=debug, json=payload
+        )
+
+        if response.status == 401:
+            raise Unauthorized()
+
+        body = await self._decode_response(response, debug)
+        if _is_insufficient_storage(response.status, body):
+            raise InsufficientStorage()
+        if response.status != 200:
+            for error_handler in error_handlers or []:
+                error_handler(response.status, body)
+        return body
+
+    async def post(
+        self,
+        endpoint: str,
+        payload: Optional[Dict] = None,
+        team: Optional[str] = None,
+        retry: bool = False,
+        error_handlers: Optional[list] = None,
+        debug: bool = False,
+    ):
+        """Post something new on the server trough HTTP. See Client.post()
+
+        Returns
+        -------
+        dict
+        Dictionary which contains the server response
+        """
+        if payload is None:
+            payload = {}
+        if error_handlers is None:
+            error_handlers = []
+        response = await self._send(
+            "post", endpoint, team=team, retry=retry, debug=debug, json=payload
+        )
+
+        if response.status == 401:
+            raise Unauthorized()
+
+        body = await self._decode_response(response, debug)
+        if response.status != 200:
+            for error_handler in error_handlers:
+                error_handler(response.status, body)
+        return body
+
+    async def _send(
+        self, method: str, endpoint: str, team: Optional[str], retry: bool, debug: bool, **kwargs
+    ) -> "aiohttp.ClientResponse":
+        """Sends a request to the API, following the retry policy of the client if requested.
+        Requests changing something on the server invalidate what the synchronous client
+        cached about it. See Client._send()
+
+        Returns
+        -------
+        aiohttp.ClientResponse
+            The last response received, with its body already read
+        """
+        url = urljoin(self.url, endpoint)
+
+        async def send():
+            async with self.session.request(
+                method, url, headers=self.client._get_headers(team), **kwargs
+            ) as response:
+                await response.read()
+                return response
+
+        async def is_fatal(response):
+            return _is_insufficient_storage(response.status, await self._decode_response(response))
+
+        response = await self.run(send, method, url, retry=retry, is_fatal=is_fatal)
+        if response.status == 200:
+            self.client._invalidate(method, url, team)
+        if response.status != 200 and debug:
+            print(
+                f"Client {method} request response ({await response.text()}) with unexpected "
+                f"status ({response.status}). "
+                f"Client: ({self})"
+                f"Request: (endpoint={endpoint}, payload={kwargs.get('json')})"
+            )
+        return response
+
+    async def run(
+        self,
+        send: Callable[[], Awaitable["aiohttp.ClientResponse"]],
+        method: str,
+        url: str,
+        endpoint_class: str = "api",
+        retry: bool = True,
+        is_fatal: Optional[Callable[["aiohttp.ClientResponse"], Awaitable[bool]]] = None,
+    ) -> "aiohttp.ClientResponse":
+        """Awaits a request until it succeeds or the retry policy of the client gives up.
+        Every attempt waits for the rate limiter and the concurrency controller of the endpoint
+        class, and is reported to them and to the instrumentation.
+        See RetryPolicy.run()
+
+        Parameters
+        ----------
+        send : Callable
+            Coroutine function sending the request and returning its response
+        method, url : str
+            HTTP method and url of the request sent, for the instrumentation
+        endpoint_class : str
+            Class of the endpoint the request is sent to, see Client.get_session()
+        retry : bool
+            Retry the request on transient failures
+        is_fatal : Callable
+            Optional coroutine function on a response, preventing any further attempt when True
+
+        Returns
+        -------
+        aiohttp.ClientResponse
+            The last response received
+        """
+        import aiohttp
+
+        policy = self.client.retry_policy if retry else NO_RETRY
+        start = time.time()
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                response = await self._attempt(send, method, url, endpoint_class, attempt)
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                delay = policy.next_delay(attempt, time.time() - start)
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
+                continue
+            if response.status < 400 or (is_fatal is not None and await is_fatal(response)):
+                return response
+            delay = policy.next_delay(
+                attempt, time.time() - start, response.status, response.headers
+            )
+            if delay is None:
+                return response
+            await asyncio.sleep(delay)
+
+    async def _attempt(
+        self,
+        send: Callable[[], Awaitable["aiohttp.ClientResponse"]],
+        method: str,
+        url: str,
+        endpoint_class: str,
+        attempt: int,
+    ) -> "aiohttp.ClientResponse":
+        """Support function to send an attempt of a request once the rate limiter and the
+        concurrency controller allow it, then report its outcome, as done by ThrottledSession"""
+        import aiohttp
+
+        await self.client.rate_limiters[endpoint_class].acquire_async()
+        async with self._slot(endpoint_class):
+            wall_start = time.time()
+            start = time.monotonic()
+            try:
+                response = await send()
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                self._report(
+                    method, url, endpoint_class, wall_start, start, attempt, error=type(e).__name__
+                )
+                raise
+            self._report(
+                method, url, endpoint_class, wall_start, start, attempt, status=response.status
+            )
+            return response
+
+    @asynccontextmanager
+    async def _slot(self, endpoint_class: str = "api"):
+        """Support function to wait until less requests of this client to the endpoint class
+        than the limit of its concurrency controller are in flight, and count one more until
+        exit"""
+        if self._slots is None:
+            self._slots = asyncio.Condition()
+        concurrency = self.concurrency[endpoint_class]
+        async with self._slots:
+            await self._slots.wait_for(
+                lambda: self._in_flight[endpoint_class] < concurrency.limit
+            )
+            self._in_flight[endpoint_class] += 1
+        try:
+            yield
+        finally:
+            async with self._slots:
+                self._in_flight[endpoint_class] -= 1
+                # The limit may have grown with the outcome of the request
+                self._slots.notify_all()
+
+    def _report(
+        self,
+        method: str,
+        url: str,
+        endpoint_class: str,
+        wall_start: float,
+        start: float,
+        attempt: int,
+        status: Optional[int] = None,
+        error: Optional[str] = None,
+    ):
+        """Support function to report the outcome of an attempt to the concurrency controller of
+        the endpoint class and to the instrumentation of the client. The body of the response
+        is not timed separately"""
+        duration = time.monotonic() - start
+        self.concurrency[endpoint_class].record(duration, status)
+        if self.client.instrumentation is not None:
+            self.client.instrumentation.emit(
+                RequestRecord(
+                    method.upper(),
+                    url,
+                    endpoint_class,
+                    wall_start,
+                    status=status,
+                    error=error,
+                    attempt=attempt,
+                    ttfb=duration,
+                )
+            )
+
+    @staticmethod
+    async def _decode_response(response: "aiohttp.ClientResponse", debug: bool = False):
+        """Decode the response as JSON entry or return a dictionary with the error
+
+        Parameters
+        ----------
+        response: aiohttp.ClientResponse
+            Response to decode
+        debug : bool
+            Debugging flag. In this case failed requests get printed
+
+        Returns
+        -------
+        dict
+        JSON decoded entry or error
+        """
+        try:
+            return await response.json(content_type=None)
+        except ValueError:
+            text = await response.text()
+            if debug:
+                print(f"[ERROR {response.status}] {text}")
+            return {
+                "error": "Response is not JSON encoded",
+                "status_code": response.status,
+                "text": text,
+            }
+
+    def __str__(self):
+        return f"AsyncClient(default_team={self.default_team})"
+
+
+def _is_insufficient_storage(status: int, body) -> bool:
+    """Whether the team ran out of storage. Such responses are never retried"""
+    try:
+        return status == 429 and body["errors"]["code"] == "INSUFFICIENT_REMAINING_STORAGE"
+    except (KeyError, TypeError):
+        return False
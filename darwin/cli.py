@@ -1,6 +1,5 @@
 import getpass
-
-import requests.exceptions
+import sys
 
 import darwin.cli_functions as f
 from darwin.exceptions import InvalidTeam, Unauthenticated, Unauthorized
@@ -9,6 +8,8 @@ from darwin.options import Options
 
 def main():
     args, parser = Options().parse_args()
+    if args.profile or args.profile_dir:
+        f.enable_profiling(args.profile_dir)
     try:
         run(args, parser)
     except Unauthorized:
@@ -17,8 +18,14 @@ def main():
         f._error("You need to specify a valid API key to do that action.")
     except InvalidTeam:
         f._error("The team specified is not in the configuration, please authenticate first.")
-    except requests.exceptions.ConnectionError:
-        f._error("Darwin seems unreachable, please try again in a minute or contact support.")
+    except Exception as e:
+        # requests is only imported by the commands talking to the server
+        requests = sys.modules.get("requests")
+        if requests is not None and isinstance(e, requests.exceptions.ConnectionError):
+            f._error("Darwin seems unreachable, please try again in a minute or contact support.")
+        raise
+    finally:
+        f.print_profile()
 
 
 def run(args, parser):
@@ -48,9 +55,9 @@ def run(args, parser):
 
     elif args.command == "dataset":
         if args.action == "remote":
-            f.list_remote_datasets(args.all, args.team)
+            f.list_remote_datasets(args.all, args.team, args.stream)
         elif args.action == "local":
-            f.local()
+            f.local(args.refresh)
         elif args.action == "create":
             f.create_dataset(args.dataset_name, args.team)
         elif args.action == "path":
@@ -63,7 +70,7 @@ def run(args, parser):
         elif args.action == "url":
             f.url(args.dataset)
         elif args.action == "push":
-            f.upload_data(args.dataset, args.files, args.exclude, args.fps)
+            f.upload_data(args.dataset, args.files, args.exclude, args.fps, args.skip_duplicates)
         # Remove a project (remotely)
         elif args.action == "remove":
             f.remove_remote_dataset(args.dataset)
@@ -74,7 +81,9 @@ def run(args, parser):
         elif args.action == "releases":
             f.dataset_list_releases(args.dataset)
         elif args.action == "pull":
-            f.pull_dataset(args.dataset)
+            f.pull_dataset(args.dataset, args.verify, args.link)
+        elif args.action == "gc":
+            f.gc_image_store()
         elif args.action == "help" or args.action == None:
             f.help(parser, "dataset")
 
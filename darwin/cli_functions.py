@@ -1,14 +1,14 @@
 import argparse
 import datetime
+import functools
 import sys
 from pathlib import Path
 from typing import List, Optional
 
-import humanize
-
 from darwin.client import Client
 from darwin.config import Config
 from darwin.dataset.identifier import DatasetIdentifier
+from darwin.dataset.stats import get_dataset_stats
 from darwin.exceptions import (
     InvalidLogin,
     MissingConfig,
@@ -17,8 +17,15 @@ from darwin.exceptions import (
     Unauthenticated,
     ValidationError,
 )
+from darwin.executor import get_executor
+from darwin.instrumentation import Instrumentation, JsonLinesExporter, RequestStats
 from darwin.table import Table
-from darwin.utils import find_files, persist_client_configuration, prompt, secure_continue_request
+from darwin.utils import persist_client_configuration, prompt, secure_continue_request
+
+# Instrumentation of the clients loaded by the commands, when profiling is enabled
+_instrumentation: Optional[Instrumentation] = None
+_request_stats: Optional[RequestStats] = None
+_profile_dir: Optional[Path] = None
 
 
 def authenticate(
@@ -109,23 +116,32 @@ def create_dataset(name: str, team: Optional[str] = None):
         _error(f"Dataset name '{name}' is not valid.")
 
 
-def local():
-    """Lists synced datasets, stored in the specified path. """
+def local(refresh: bool = False):
+    """Lists synced datasets, stored in the specified path.
+
+    Parameters
+    ----------
+    refresh : bool
+        Recomputes the statistics of the datasets instead of using the cached ones
+    """
+    import humanize
+
     table = Table(["name", "images", "sync_date", "size"], [Table.L, Table.R, Table.R, Table.R])
     client = _load_client(offline=True)
-    for dataset_path in client.list_local_datasets():
-        table.add_row(
-            {
-                "name": dataset_path.name,
-                "images": sum(1 for _ in find_files([dataset_path])),
-                "sync_date": humanize.naturaldate(
-                    datetime.datetime.fromtimestamp(dataset_path.stat().st_mtime)
-                ),
-                "size": humanize.naturalsize(
-                    sum(p.stat().st_size for p in find_files([dataset_path]))
-                ),
-            }
-        )
+    dataset_paths = list(client.list_local_datasets())
+    with get_executor("thread") as executor:
+        stats = executor.map(functools.partial(get_dataset_stats, refresh=refresh), dataset_paths)
+        for dataset_path, (images, size) in zip(dataset_paths, stats):
+            table.add_row(
+                {
+                    "name": dataset_path.name,
+                    "images": images,
+                    "sync_date": humanize.naturaldate(
+                        datetime.datetime.fromtimestamp(dataset_path.stat().st_mtime)
+                    ),
+                    "size": humanize.naturalsize(size),
+                }
+            )
     print(table)
 
 
@@ -188,13 +204,19 @@ def export_dataset(
     print(f"Dataset {dataset_slug} successfully exported to {identifier}")
 
 
-def pull_dataset(dataset_slug: str):
+def pull_dataset(dataset_slug: str, verify: bool = False, link_mode: Optional[str] = None):
     """Downloads a remote dataset (images and annotations) in the datasets directory.
 
     Parameters
     ----------
     dataset_slug: str
         Slug of the dataset to which we perform the operation on
+    verify : bool
+        Checks the images already downloaded against the ones of the server, and downloads again
+        the ones which do not match
+    link_mode : str
+        If set, the images are downloaded in the image store and linked in the dataset folder
+        this way: `hardlink`, `reflink` or `symlink`
     """
     version = DatasetIdentifier.parse(dataset_slug).version or "latest"
     client = _load_client(offline=False)
@@ -209,7 +231,7 @@ def pull_dataset(dataset_slug: str):
         _error(f"please re-authenticate")
     try:
         release = dataset.get_release(version)
-        dataset.pull(release=release)
+        dataset.pull(release=release, verify=verify, link_mode=link_mode)
     except NotFound:
         _error(
             f"Version '{dataset.identifier}:{version}' does not exist "
@@ -218,31 +240,62 @@ def pull_dataset(dataset_slug: str):
     print(f"Dataset {release.identifier} downloaded at {dataset.local_path}. ")
 
 
-def list_remote_datasets(all_teams: bool, team: Optional[str] = None):
-    """Lists remote datasets with its annotation progress"""
+def gc_image_store():
+    """Removes the images of the image store of the default team which are no longer linked in
+    any local dataset, see ImageStore.gc()"""
+    import humanize
+
+    from darwin.dataset.image_store import STORE_DIRNAME, ImageStore
+
+    client = _load_client(offline=True)
+    store = ImageStore(Path(client.get_datasets_dir()) / STORE_DIRNAME)
+    removed, size = store.gc()
+    print(f"Removed {removed} images from the store, freeing {humanize.naturalsize(size)}")
+
+
+def list_remote_datasets(all_teams: bool, team: Optional[str] = None, stream: bool = False):
+    """Lists remote datasets with its annotation progress
+
+    Parameters
+    ----------
+    all_teams : bool
+        Lists the datasets of all the teams, queried concurrently
+    team : str
+        Team to list the datasets of, if not all_teams. Defaults to the default team
+    stream : bool
+        Prints each dataset as soon as it is received, in columns of fixed sizes
+    """
     # TODO: add listing open datasets
     table = Table(["name", "images", "progress"], [Table.L, Table.R, Table.R])
-    datasets = []
     if all_teams:
-        for team in _config().get_all_teams():
-            client = _load_client(team["slug"])
-            datasets += client.list_remote_datasets()
+        client = _load_client()
+        teams = [team["slug"] for team in _config().get_all_teams()]
+        datasets = client.list_teams_remote_datasets(teams)
+        if not stream:
+            # Keep the order of the teams in the configuration
+            datasets = sorted(datasets, key=lambda dataset: teams.index(dataset.team))
     else:
         client = _load_client(team)
         datasets = client.list_remote_datasets()
 
-    for dataset in datasets:
-        table.add_row(
-            {
-                "name": f"{dataset.team}/{dataset.slug}",
-                "images": dataset.image_count,
-                "progress": f"{round(dataset.progress*100,1)}%",
-            }
-        )
+    rows = (
+        {
+            "name": f"{dataset.team}/{dataset.slug}",
+            "images": dataset.image_count,
+            "progress": f"{round(dataset.progress*100,1)}%",
+        }
+        for dataset in datasets
+    )
+    if stream:
+        for line in table.stream(rows, column_sizes=[table.default_size, 12, 12]):
+            print(line, flush=True)
+    else:
+        for row in rows:
+            table.add_row(row)
+        if len(table) > 0:
+            print(table)
     if len(table) == 0:
         print("No dataset available.")
-    else:
-        print(table)
 
 
 def remove_remote_dataset(dataset_slug: str):
@@ -288,7 +341,11 @@ def dataset_list_releases(dataset_slug: str):
 
 
 def upload_data(
-    dataset_slug: str, files: Optional[List[str]], files_to_exclude: Optional[List[str]], fps: int
+    dataset_slug: str,
+    files: Optional[List[str]],
+    files_to_exclude: Optional[List[str]],
+    fps: int,
+    skip_duplicates: bool = False,
 ):
     """Uploads the files provided as parameter to the remote dataset selected
 
@@ -302,6 +359,8 @@ def upload_data(
         List of files to exclude from the file scan (which is done only if files is None)
     fps : int
         Frame rate to split videos in
+    skip_duplicates : bool
+        Skips the files whose content was already uploaded to the dataset
 
     Returns
     -------
@@ -313,7 +372,12 @@ def upload_data(
     client = _load_client()
     try:
         dataset = client.get_remote_dataset(dataset_identifier=dataset_slug)
-        dataset.push(files_to_exclude=files_to_exclude, fps=fps, files_to_upload=files)
+        dataset.push(
+            files_to_exclude=files_to_exclude,
+            fps=fps,
+            files_to_upload=files,
+            skip_duplicates=skip_duplicates,
+        )
     except NotFound as e:
         _error(f"No dataset with name '{e.name}'")
     except ValueError:
@@ -340,6 +404,36 @@ def help(parser, subparser: Optional[str] = None):
             print("    {:<19} {}".format(choice.dest, choice.help))
 
 
+def enable_profiling(export_dir: Optional[Path] = None):
+    """Records the timings of every request sent by the clients loaded from now on, see
+    print_profile()
+
+    Parameters
+    ----------
+    export_dir : Path
+        Folder where each request is also appended to requests.jsonl, and the summary of the
+        requests is written to requests.prom, in the Prometheus text format
+    """
+    global _profile_dir, _request_stats, _instrumentation
+    _profile_dir = export_dir
+    _request_stats = RequestStats()
+    _instrumentation = Instrumentation([_request_stats])
+    if export_dir is not None:
+        _instrumentation.add_hook(JsonLinesExporter(export_dir / "requests.jsonl"))
+
+
+def print_profile():
+    """Prints the percentiles of the duration of the requests of each endpoint, and exports them
+    if requested, when profiling is enabled"""
+    if _instrumentation is None:
+        return
+    _instrumentation.close()
+    if _profile_dir is not None:
+        _request_stats.write_prometheus(_profile_dir / "requests.prom")
+    summary = _request_stats.format_summary()
+    print(summary or "No request sent.", file=sys.stderr)
+
+
 def _error(message):
     print(f"Error: {message}")
     sys.exit(1)
@@ -364,7 +458,7 @@ def _load_client(team: Optional[str] = None, offline: bool = False):
     """
     try:
         config_dir = Path.home() / ".darwin" / "config.yaml"
-        client = Client.from_config(config_dir, team_slug=team)
+        client = Client.from_config(config_dir, team_slug=team, instrumentation=_instrumentation)
         return client
     except MissingConfig:
         _error("Authenticate first")
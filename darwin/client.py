@@ -1,13 +1,15 @@
 import os
-import time
+import re
+import threading
+from concurrent.futures import as_completed
 from pathlib import Path
-from typing import Dict, Iterator, Optional, Union
-
-import requests
+from types import MappingProxyType
+from urllib import parse
+from typing import TYPE_CHECKING, Dict, Iterator, List, Mapping, Optional, Set, Union
 
 from darwin.config import Config
-from darwin.dataset import RemoteDataset
 from darwin.dataset.identifier import DatasetIdentifier
+from darwin.dataset_index import DatasetIndex
 from darwin.exceptions import (
     InsufficientStorage,
     InvalidLogin,
@@ -15,22 +17,141 @@ from darwin.exceptions import (
     NotFound,
     Unauthorized,
 )
+from darwin.executor import DEFAULT_MAX_WORKERS, get_executor
+from darwin.http_cache import HttpCache
+from darwin.instrumentation import Instrumentation
+from darwin.pagination import DEFAULT_PAGE_SIZE, STREAM_CHUNK_SIZE, iter_json_array
+from darwin.retry import NO_RETRY, RetryPolicy
+from darwin.throttle import AdaptiveConcurrency, TokenBucket
 from darwin.utils import is_project_dir, urljoin
 from darwin.validators import name_taken, validation_error
 
+# requests is slow to import, hence only imported once a request is made
+if TYPE_CHECKING:
+    import requests
+
+    from darwin.dataset import RemoteDataset
+
+
+# Number of keep-alive connections kept open towards a single host
+DEFAULT_POOL_SIZE = 64
+
+# Paths of the requests renaming or archiving a dataset, which may change the slug it is found by
+_DATASET_CHANGE = re.compile(r"/datasets/(\d+)(?:/archive)?/?$")
+
+# Classes of endpoints the client talks to, each one with its own session and rate limit:
+# the darwin API, the storage receiving the uploads and the CDN serving the images
+ENDPOINT_CLASSES = ["api", "s3", "cdn"]
+
 
 class Client:
-    def __init__(self, config: Config, default_team: Optional[str] = None):
+    def __init__(
+        self,
+        config: Config,
+        default_team: Optional[str] = None,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        retry_policy: Optional[RetryPolicy] = None,
+        rate_limits: Optional[Dict[str, float]] = None,
+        concurrency: Optional[Dict[str, AdaptiveConcurrency]] = None,
+        dataset_index: Optional[DatasetIndex] = None,
+        http_cache: Optional[HttpCache] = None,
+        instrumentation: Optional[Instrumentation] = None,
+    ):
         self.config = config
         self.url = config.get("global/api_endpoint")
         self.base_url = config.get("global/base_url")
         self.default_team = default_team or config.get("global/default_team")
+        self.pool_size = pool_size
+        self.retry_policy = retry_policy or RetryPolicy()
+        # Maximum number of requests per second for each endpoint class. Unlimited if missing
+        self.rate_limits = rate_limits or {}
+        self.rate_limiters = {
+            endpoint_class: TokenBucket(self.rate_limits.get(endpoint_class))
+            for endpoint_class in ENDPOINT_CLASSES
+        }
+        # Controllers of the number of requests in flight for each endpoint class, which are
+        # tuned independently as their latencies and errors differ by orders of magnitude
+        concurrency = concurrency or {}
+        self.concurrency = {
+            endpoint_class: concurrency.get(endpoint_class)
+            or AdaptiveConcurrency(initial=DEFAULT_MAX_WORKERS)
+            for endpoint_class in ENDPOINT_CLASSES
+        }
+        # Datasets by slug, stored next to the configuration file if any
+        if dataset_index is None:
+            dataset_index = DatasetIndex(
+                config.path.parent / "cache" / "datasets" if config.path else None
+            )
+        self.dataset_index = dataset_index
+        # Responses of the list endpoints, opted in with the DARWIN_HTTP_CACHE environment variable
+        if http_cache is None and config.path and _env_flag("DARWIN_HTTP_CACHE"):
+            http_cache = HttpCache(config.path.parent / "cache" / "http")
+        self.http_cache = http_cache
+        # Hooks called with the timings of every request sent by the sessions of the client
+        self.instrumentation = instrumentation
+        # Optional endpoints the server was found not to provide, e.g. batch uploads, so that
+        # they are not requested again
+        self.unsupported_endpoints: Set[str] = set()
+        self._sessions: Dict[str, "requests.Session"] = {}
+        self._sessions_pid: Optional[int] = None
+        self._sessions_lock = threading.Lock()
+        self._headers: Dict[Optional[str], Mapping[str, str]] = {}
+        self._headers_version: Optional[int] = None
+
+    @property
+    def session(self) -> "requests.Session":
+        """Pooled HTTP session used for the requests to the darwin API. See get_session()"""
+        return self.get_session("api")
+
+    def get_session(self, endpoint_class: str = "api") -> "requests.Session":
+        """Pooled HTTP session shared by every request made to a class of endpoints.
+        Connections are kept alive and reused across threads. Requests wait for the rate limiter
+        and the concurrency controller of their endpoint class, and are reported to the
+        controller and to the instrumentation of the client.
+        New sessions are created lazily in every process, so the client can be safely forked
+        or pickled.
+
+        Parameters
+        ----------
+        endpoint_class : str
+            One of ENDPOINT_CLASSES
+
+        Returns
+        -------
+        requests.Session
+        The session of the current process
+        """
+        if endpoint_class not in ENDPOINT_CLASSES:
+            raise ValueError(f"Endpoint class {endpoint_class} not in {ENDPOINT_CLASSES}")
+        pid = os.getpid()
+        if self._sessions_pid != pid or endpoint_class not in self._sessions:
+            with self._sessions_lock:
+                if self._sessions_pid != pid:
+                    self._sessions = {}
+                    self._sessions_pid = pid
+                if endpoint_class not in self._sessions:
+                    self._sessions[endpoint_class] = make_session(
+                        self.pool_size,
+                        self.rate_limiters[endpoint_class],
+                        self.concurrency[endpoint_class],
+                        self.instrumentation,
+                        endpoint_class,
+                    )
+        return self._sessions[endpoint_class]
+
+    def close(self):
+        """Closes all the pooled connections of the client"""
+        if self._sessions_pid == os.getpid():
+            for session in self._sessions.values():
+                session.close()
+        self._sessions = {}
+        self._sessions_pid = None
 
     def get(
         self,
         endpoint: str,
         team: Optional[str] = None,
-        retry: bool = False,
+        retry: bool = True,
         raw: bool = False,
         debug: bool = False,
     ):
@@ -41,7 +162,7 @@ class Client:
         endpoint : str
             Recipient of the HTTP operation
         retry : bool
-            Retry to perform the operation. Set to False on recursive calls.
+            Retry the operation on transient failures, as described by the client retry policy
         raw : bool
             Flag for returning raw response
         debug : bool
@@ -59,33 +180,118 @@ class Client:
         Unauthorized
             Action is not authorized
         """
-        response = requests.get(urljoin(self.url, endpoint), headers=self._get_headers(team))
+        response = self._send("get", endpoint, team=team, retry=retry, debug=debug)
 
         if response.status_code == 401:
             raise Unauthorized()
         if response.status_code == 404:
             raise NotFound(urljoin(self.url, endpoint))
-        if response.status_code != 200 and retry:
-            if debug:
-                print(
-                    f"Client get request response ({response.json()}) with unexpected status "
-                    f"({response.status_code}). "
-                    f"Client: ({self})"
-                    f"Request: (endpoint={endpoint})"
-                )
-            time.sleep(10)
-            return self.get(endpoint=endpoint, retry=False)
         if raw:
             return response
         else:
             return self._decode_response(response, debug)
 
+    def get_paginated(
+        self,
+        endpoint: str,
+        team: Optional[str] = None,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        retry: bool = True,
+        debug: bool = False,
+    ) -> Iterator[Dict]:
+        """Lazily iterates over the items of a list endpoint. The items of each page are parsed
+        while its body is received, and yielded one at a time, so that the first ones are
+        available before the whole page is and only one item is held in memory.
+        The next page, given by the `Link: <url>; rel="next"` header of a response, is only
+        requested once the items of the current one have been consumed.
+
+        If the client has a HTTP cache, pages are read from it while their endpoint TTL has not
+        expired, then revalidated with conditional requests.
+
+        Parameters
+        ----------
+        endpoint : str
+            Recipient of the HTTP operation, returning a JSON array
+        team : str
+            Team to authenticate the calls against. Defaults to the default team
+        page_size : int
+            Number of items requested per page. Servers not paginating the endpoint return all
+            the items in a single page
+        retry : bool
+            Retry the operation on transient failures, as described by the client retry policy
+        debug : bool
+            Debugging flag. In this case failed requests get printed
+
+        Returns
+        -------
+        Iterator[dict]
+        Items of all the pages, in order
+
+        Raises
+        ------
+        NotFound
+            Resource not found
+        Unauthorized
+            Action is not authorized
+        ValueError
+            The server did not answer with a JSON array
+        """
+        team = team or self.default_team
+        cache = self.http_cache
+        ttl = cache.ttl(endpoint) if cache is not None else 0
+        separator = "&" if "?" in endpoint else "?"
+        url: Optional[str] = urljoin(self.url, f"{endpoint}{separator}page_size={page_size}")
+        while url is not None:
+            cached = cache.get(team, url) if cache is not None else None
+            if cached is not None and cached.is_fresh(ttl):
+                yield from iter_json_array([cached.body])
+                url = cached.next_page
+                continue
+
+            response = self._send(
+                "get",
+                url,
+                team=team,
+                retry=retry,
+                debug=debug,
+                stream=True,
+                headers=cached.validators if cached is not None else None,
+            )
+            try:
+                if response.status_code == 401:
+                    raise Unauthorized()
+                if response.status_code == 404:
+                    raise NotFound(urljoin(self.url, endpoint))
+                if response.status_code == 304 and cached is not None:
+                    cache.revalidate(team, cached)
+                    yield from iter_json_array([cached.body])
+                    url = cached.next_page
+                    continue
+                if response.status_code != 200:
+                    raise ValueError(
+                        f"Unexpected status ({response.status_code}) listing {endpoint}"
+                    )
+                next_page = response.links.get("next", {}).get("url")
+                if next_page:
+                    next_page = parse.urljoin(response.url, next_page)
+                chunks = response.iter_content(chunk_size=STREAM_CHUNK_SIZE)
+                etag = response.headers.get("ETag")
+                last_modified = response.headers.get("Last-Modified")
+                # Responses which can neither be used as is nor revalidated are not cached
+                if cache is not None and (ttl or etag or last_modified):
+                    chunks = cache.record(team, url, chunks, etag, last_modified, next_page)
+                yield from iter_json_array(chunks)
+            finally:
+                response.close()
+            url = next_page
+
     def put(
         self,
         endpoint: str,
         payload: Dict,
         team: Optional[str] = None,
         retry: bool = False,
+        error_handlers: Optional[list] = None,
         debug: bool = False,
     ):
         """Put something on the server trough HTTP
@@ -97,7 +303,10 @@ class Client:
         payload : dict
             What you want to put on the server (typically json encoded)
         retry : bool
-            Retry to perform the operation. Set to False on recursive calls.
+            Retry the operation on transient failures, as described by the client retry policy
+            Only enable it for requests which can safely be sent more than once.
+        error_handlers : list
+            Functions called with the status code and the decoded body of unsuccessful responses
         debug : bool
             Debugging flag. In this case failed requests get printed
 
@@ -106,28 +315,17 @@ class Client:
         dict
         Dictionary which contains the server response
         """
-        response = requests.put(
-            urljoin(self.url, endpoint), json=payload, headers=self._get_headers(team)
-        )
+        response = self._send("put", endpoint, team=team, retry=retry, debug=debug, json=payload)
 
         if response.status_code == 401:
             raise Unauthorized()
 
-        if response.status_code == 429:
-            error_code = response.json()["errors"]["code"]
-            if error_code == "INSUFFICIENT_REMAINING_STORAGE":
-                raise InsufficientStorage()
+        if _is_insufficient_storage(response):
+            raise InsufficientStorage()
 
-        if response.status_code != 200 and retry:
-            if debug:
-                print(
-                    f"Client get request response ({response.json()}) with unexpected status "
-                    f"({response.status_code}). "
-                    f"Client: ({self})"
-                    f"Request: (endpoint={endpoint}, payload={payload})"
-                )
-            time.sleep(10)
-            return self.put(endpoint, payload=payload, retry=False)
+        if response.status_code != 200:
+            for error_handler in error_handlers or []:
+                error_handler(response.status_code, self._decode_response(response))
 
         return self._decode_response(response, debug)
 
@@ -149,9 +347,10 @@ class Client:
         payload : dict
             What you want to put on the server (typically json encoded)
         retry : bool
-            Retry to perform the operation. Set to False on recursive calls.
-        refresh : bool
-            Flag for use the refresh token instead
+            Retry the operation on transient failures, as described by the client retry policy.
+            Only enable it for requests which can safely be sent more than once.
+        error_handlers : list
+            Functions called with the status code and the decoded body of unsuccessful responses
         debug : bool
             Debugging flag. In this case failed requests get printed
 
@@ -164,29 +363,99 @@ class Client:
             payload = {}
         if error_handlers is None:
             error_handlers = []
-        response = requests.post(
-            urljoin(self.url, endpoint), json=payload, headers=self._get_headers(team)
-        )
+        response = self._send("post", endpoint, team=team, retry=retry, debug=debug, json=payload)
+
         if response.status_code == 401:
             raise Unauthorized()
 
         if response.status_code != 200:
             for error_handler in error_handlers:
-                error_handler(response.status_code, response.json())
-
-            if debug:
-                print(
-                    f"Client get request response ({response.json()}) with unexpected status "
-                    f"({response.status_code}). "
-                    f"Client: ({self})"
-                    f"Request: (endpoint={endpoint}, payload={payload})"
-                )
-            if retry:
-                time.sleep(10)
-                return self.post(endpoint, payload=payload, retry=False)
+                error_handler(response.status_code, self._decode_response(response))
 
         return self._decode_response(response, debug)
 
+    def _send(
+        self,
+        method: str,
+        endpoint: str,
+        team: Optional[str],
+        retry: bool,
+        debug: bool,
+        headers: Optional[Dict[str, str]] = None,
+        **kwargs,
+    ) -> "requests.Response":
+        """Sends a request to the API, following the retry policy of the client if requested.
+        Requests changing something on the server invalidate the HTTP cache of the team, if any
+
+        Parameters
+        ----------
+        method : str
+            HTTP method of the request
+        endpoint : str
+            Recipient of the HTTP operation, relative to the API or absolute
+        team : str
+            Team whose credentials are used to authenticate the request
+        retry : bool
+            Retry the operation on transient failures
+        debug : bool
+            Debugging flag. In this case failed requests get printed
+        headers : dict
+            Headers sent along with the authentication ones
+        kwargs
+            Passed as is to requests
+
+        Returns
+        -------
+        requests.Response
+            The last response received
+        """
+        if endpoint.startswith(("http://", "https://")):
+            url = endpoint
+        else:
+            url = urljoin(self.url, endpoint)
+        if headers:
+            headers = {**self._get_headers(team), **headers}
+        else:
+            headers = self._get_headers(team)
+        policy = self.retry_policy if retry else NO_RETRY
+        response = policy.run(
+            lambda: self.session.request(method, url, headers=headers, **kwargs),
+            is_fatal=_is_insufficient_storage,
+        )
+        if response.status_code == 200:
+            self._invalidate(method, url, team)
+        if response.status_code not in [200, 304] and debug:
+            print(
+                f"Client {method} request response ({response.text}) with unexpected status "
+                f"({response.status_code}). "
+                f"Client: ({self})"
+                f"Request: (endpoint={endpoint}, payload={kwargs.get('json')})"
+            )
+        return response
+
+    def _invalidate(self, method: str, url: str, team: Optional[str]):
+        """Drops what a successful request may have made stale: the responses of the HTTP cache
+        it may affect and, if it renamed or archived a dataset, the dataset from the dataset
+        index. Also called by AsyncClient
+
+        Parameters
+        ----------
+        method : str
+            HTTP method of the request
+        url : str
+            Url of the request
+        team : str
+            Team the request was authenticated against. Defaults to the default team
+        """
+        if method == "get":
+            return
+        team = team or self.default_team
+        if self.http_cache is not None:
+            self.http_cache.invalidate(team, url)
+        match = _DATASET_CHANGE.search(parse.urlsplit(url).path)
+        if match is not None:
+            self.dataset_index.remove_id(team, int(match.group(1)))
+
     def list_local_datasets(self, team: Optional[str] = None) -> Iterator[Path]:
         """Returns a list of all local folders who are detected as dataset.
 
@@ -201,32 +470,64 @@ class Client:
             if project_path.is_dir() and is_project_dir(project_path):
                 yield Path(project_path)
 
-    def list_remote_datasets(self, team: Optional[str] = None) -> Iterator[RemoteDataset]:
-        """Returns a list of all available datasets with the team currently authenticated against
+    def list_remote_datasets(self, team: Optional[str] = None) -> Iterator["RemoteDataset"]:
+        """Lazily lists the datasets of the team currently authenticated against, page by page.
+        The dataset index of the team is refreshed once all the datasets have been listed
 
         Returns
         -------
-        list[RemoteDataset]
-        List of all remote datasets
+        Iterator[RemoteDataset]
+        All the remote datasets
         """
-        for dataset in self.get("/datasets/", team=team):
-            yield RemoteDataset(
-                name=dataset["name"],
-                slug=dataset["slug"],
-                team=team or self.default_team,
-                dataset_id=dataset["id"],
-                image_count=dataset["num_images"],
-                progress=dataset["progress"],
-                client=self,
-            )
+        datasets = []
+        for dataset in self.get_paginated("/datasets/", team=team):
+            datasets.append(dataset)
+            yield self._make_remote_dataset(dataset, team)
+        # Only a complete listing of the datasets is indexed
+        self.dataset_index.update(team or self.default_team, datasets)
+
+    def list_teams_remote_datasets(
+        self, teams: List[str], max_workers: Optional[int] = None
+    ) -> Iterator["RemoteDataset"]:
+        """Lists the datasets of several teams at once. The teams are queried concurrently over
+        the connections of the client, and the datasets of each team are returned as soon as
+        they are received
+
+        Parameters
+        ----------
+        teams : list[str]
+            Slugs of the teams to list the datasets of
+        max_workers : int
+            Number of teams queried at the same time. Defaults to one per team, up to
+            DEFAULT_MAX_WORKERS
+
+        Returns
+        -------
+        Iterator[RemoteDataset]
+        Datasets of all the teams, grouped by team in no particular order of the teams
+        """
+        if not teams:
+            return
+        if max_workers is None:
+            max_workers = min(len(teams), DEFAULT_MAX_WORKERS)
+        with get_executor("thread", max_workers=max_workers) as executor:
+            futures = [
+                executor.submit(lambda team: list(self.list_remote_datasets(team=team)), team)
+                for team in teams
+            ]
+            for future in as_completed(futures):
+                yield from future.result()
 
     def get_remote_dataset(
         self, dataset_identifier: Union[str, DatasetIdentifier]
-    ) -> RemoteDataset:
+    ) -> "RemoteDataset":
         """Get a remote dataset based on the parameter passed. You can only choose one of the
         possible parameters and calling this method with multiple ones will result in an
         error.
 
+        The dataset is looked up in the dataset index of the client first, and the datasets of
+        its team are only listed if it is not indexed or the index expired.
+
         Parameters
         ----------
         dataset_identifier : int
@@ -242,16 +543,20 @@ class Client:
         if not dataset_identifier.team_slug:
             dataset_identifier.team_slug = self.default_team
 
-        matching_datasets = [
-            dataset
-            for dataset in self.list_remote_datasets(team=dataset_identifier.team_slug)
-            if dataset.slug == dataset_identifier.dataset_slug
-        ]
-        if not matching_datasets:
+        team = dataset_identifier.team_slug
+        dataset = self.dataset_index.get(team, dataset_identifier.dataset_slug)
+        if dataset is not None:
+            return self._make_remote_dataset(dataset, team)
+        # The listing is consumed entirely, to index all the datasets for the next lookups
+        found = None
+        for remote_dataset in self.list_remote_datasets(team=team):
+            if remote_dataset.slug == dataset_identifier.dataset_slug:
+                found = remote_dataset
+        if found is None:
             raise NotFound(dataset_identifier)
-        return matching_datasets[0]
+        return found
 
-    def create_dataset(self, name: str, team: Optional[str] = None) -> RemoteDataset:
+    def create_dataset(self, name: str, team: Optional[str] = None) -> "RemoteDataset":
         """Create a remote dataset
 
         Parameters
@@ -267,6 +572,13 @@ class Client:
         dataset = self.post(
             "/datasets", {"name": name}, team=team, error_handlers=[name_taken, validation_error]
         )
+        self.dataset_index.add(team or self.default_team, dataset)
+        return self._make_remote_dataset(dataset, team)
+
+    def _make_remote_dataset(self, dataset: Dict, team: Optional[str] = None) -> "RemoteDataset":
+        """Support function to build a RemoteDataset from its description by the server"""
+        from darwin.dataset import RemoteDataset
+
         return RemoteDataset(
             name=dataset["name"],
             team=team or self.default_team,
@@ -304,25 +616,35 @@ class Client:
         """
         self.config.put(f"teams/{team or self.default_team}/datasets_dir", datasets_dir)
 
-    def _get_headers(self, team: Optional[str] = None):
-        """Get the headers of the API calls to the backend.
+    def _get_headers(self, team: Optional[str] = None) -> Mapping[str, str]:
+        """Get the headers of the API calls to the backend. They are computed once per team and
+        cached until the configuration changes.
 
         Parameters
         ----------
+        team : str
+            Team to authenticate the calls against. Defaults to the default team
 
         Returns
         -------
-        dict
-        Contains the Content-Type and Authorization token
+        Mapping
+        Contains the Content-Type and Authorization token. Read-only
         """
-        header = {"Content-Type": "application/json"}
-
-        team_config = self.config.get_team(team or self.default_team)
-        api_key = team_config.get("api_key")
-
-        if api_key is not None:
-            header["Authorization"] = f"ApiKey {api_key}"
-        return header
+        team = team or self.default_team
+        if self._headers_version != self.config.version:
+            self._headers = {}
+            self._headers_version = self.config.version
+        headers = self._headers.get(team)
+        if headers is None:
+            header = {"Content-Type": "application/json"}
+
+            team_config = self.config.get_team(team)
+            api_key = team_config.get("api_key")
+
+            if api_key is not None:
+                header["Authorization"] = f"ApiKey {api_key}"
+            headers = self._headers[team] = MappingProxyType(header)
+        return headers
 
     @classmethod
     def local(cls, team_slug: Optional[str] = None):
@@ -337,13 +659,20 @@ class Client:
         return Client.from_config(config_path, team_slug=team_slug)
 
     @classmethod
-    def from_config(cls, config_path: Path, team_slug: Optional[str] = None):
+    def from_config(
+        cls,
+        config_path: Path,
+        team_slug: Optional[str] = None,
+        instrumentation: Optional[Instrumentation] = None,
+    ):
         """Factory method to create a client from the configuration file passed as parameter
 
         Parameters
         ----------
         config_path : str
             Path to a configuration file to use to create the client
+        instrumentation : Instrumentation
+            Hooks called with the timings of every request sent by the client
 
         Returns
         -------
@@ -354,7 +683,7 @@ class Client:
             raise MissingConfig()
         config = Config(config_path)
 
-        return cls(config=config, default_team=team_slug)
+        return cls(config=config, default_team=team_slug, instrumentation=instrumentation)
 
     @classmethod
     def from_api_key(cls, api_key: str, datasets_dir: Optional[Path] = None):
@@ -376,7 +705,11 @@ class Client:
             datasets_dir = Path.home() / ".darwin" / "datasets"
         headers = {"Content-Type": "application/json", "Authorization": f"ApiKey {api_key}"}
         api_url = Client.default_api_url()
-        response = requests.get(urljoin(api_url, "/users/token_info"), headers=headers)
+        import requests
+
+        response = RetryPolicy().run(
+            lambda: requests.get(urljoin(api_url, "/users/token_info"), headers=headers)
+        )
 
         if response.status_code != 200:
             raise InvalidLogin()
@@ -427,5 +760,80 @@ class Client:
                 "text": response.text,
             }
 
+    def __getstate__(self):
+        # Sessions, locks and cached headers do not survive pickling, they are re-created on
+        # first use
+        state = self.__dict__.copy()
+        state["_sessions"] = {}
+        state["_sessions_pid"] = None
+        state["_headers"] = {}
+        state["_headers_version"] = None
+        del state["_sessions_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._sessions_lock = threading.Lock()
+
     def __str__(self):
         return f"Client(default_team={self.default_team})"
+
+
+def _env_flag(name: str) -> bool:
+    """Support function to read a boolean flag from an environment variable"""
+    return os.getenv(name, "").lower() not in ["", "0", "false", "no"]
+
+
+def _is_insufficient_storage(response: "requests.Response") -> bool:
+    """Whether the team ran out of storage. Such responses are never retried"""
+    if response.status_code != 429:
+        return False
+    try:
+        return response.json()["errors"]["code"] == "INSUFFICIENT_REMAINING_STORAGE"
+    except (ValueError, KeyError, TypeError):
+        return False
+
+
+def make_session(
+    pool_size: int = DEFAULT_POOL_SIZE,
+    rate_limiter: Optional[TokenBucket] = None,
+    concurrency: Optional[AdaptiveConcurrency] = None,
+    instrumentation: Optional[Instrumentation] = None,
+    endpoint_class: str = "api",
+) -> "requests.Session":
+    """Creates a HTTP session with keep-alive connection pools for both http and https
+
+    Parameters
+    ----------
+    pool_size : int
+        Maximum number of connections kept open towards a single host
+    rate_limiter : TokenBucket
+        Rate limiter of the requests sent through the session
+    concurrency : AdaptiveConcurrency
+        Controller informed of the outcome of every request
+    instrumentation : Instrumentation
+        Hooks called with the timings of every request
+    endpoint_class : str
+        Class of the endpoints the session sends requests to, reported to the instrumentation
+
+    Returns
+    -------
+    requests.Session
+    The configured session
+    """
+    from requests.adapters import HTTPAdapter
+
+    from darwin.session import ThrottledSession, TimedHTTPAdapter
+
+    session = ThrottledSession(
+        rate_limiter=rate_limiter,
+        concurrency=concurrency,
+        instrumentation=instrumentation,
+        endpoint_class=endpoint_class,
+    )
+    # Opening connections is only timed when the requests are instrumented
+    adapter_class = HTTPAdapter if instrumentation is None else TimedHTTPAdapter
+    adapter = adapter_class(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
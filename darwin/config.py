@@ -1,8 +1,8 @@
+import copy
+import functools
 import io
 from pathlib import Path
-from typing import Any, List, Optional, Union
-
-import yaml
+from typing import Any, Dict, List, Optional, Tuple, Union
 
 from darwin.exceptions import InvalidTeam
 
@@ -18,11 +18,21 @@ class Config(object):
             path = Path(path)
         self._path = path
         self._data = self._parse()
+        # Incremented on every change, so that values derived from the configuration can be
+        # cached until it changes
+        self.version = 0
+
+    @property
+    def path(self) -> Optional[Path]:
+        """File the configuration is persisted to, None if it is in memory only"""
+        return self._path
 
     def _parse(self):
         """Parses the YAML configuration file"""
         if not self._path:
             return {}
+        import yaml
+
         try:
             with open(self._path, "r") as stream:
                 return yaml.safe_load(stream)
@@ -35,21 +45,17 @@ class Config(object):
         Args:
         - key: the key where the value to be fetched is stored.
         It can be formatted as a simple string, or as a path/like/string to fetch nested values.
+        Sections are returned as copies, changes are made through put()
         """
 
-        acc = self._data.copy()
-
-        while True:
-            if isinstance(key, str):
-                key = key.split("/")
-            key, *keys = key
-            acc = acc.get(key)
+        acc = self._data
+        for k in _split_key(key) if isinstance(key, str) else key:
+            acc = acc.get(k)
             if acc is None:
                 return default
-            if len(keys) == 0:
-                return acc
-            else:
-                key = keys
+        if isinstance(acc, (dict, list)):
+            return copy.deepcopy(acc)
+        return acc
 
     def put(self, key: Union[str, List[str]], value: any, save: bool = True):
         """Sets value for specified key
@@ -66,6 +72,7 @@ class Config(object):
         for k in key[:-1]:
             pointer = pointer.setdefault(k, {})
         pointer[key[-1]] = str(value)
+        self.version += 1
 
         if save:
             self._save()
@@ -74,6 +81,8 @@ class Config(object):
         """Persist the configuration to the file system"""
         if not self._path:
             return
+        import yaml
+
         with io.open(self._path, "w", encoding="utf8") as f:
             yaml.dump(self._data, f, default_flow_style=False, allow_unicode=True)
 
@@ -99,9 +108,7 @@ class Config(object):
         api_key = self.get(f"teams/{team}/api_key")
         if api_key is None:
             raise InvalidTeam()
-        default = (
-            self.get("global/default_team") == team or len(list(self.get("teams").keys())) == 1
-        )
+        default = self.get("global/default_team") == team or len(self._teams()) == 1
 
         datasets_dir = self.get(f"teams/{team}/datasets_dir")
         return {"slug": team, "api_key": api_key, "default": default, "datasets_dir": datasets_dir}
@@ -110,11 +117,21 @@ class Config(object):
         default_team = self.get("global/default_team")
         if default_team:
             return self.get_team(default_team)
-        teams = list(self.get("teams").keys())
+        teams = list(self._teams())
         if len(teams) > 1:
             raise InvalidTeam()
         return self.get_team(teams[0])
 
+    def _teams(self) -> Dict[str, Any]:
+        """Support function to read the teams section without copying it. Not to be changed"""
+        return self._data.get("teams") or {}
+
     def get_all_teams(self):
-        teams = list(self.get("teams").keys())
+        teams = list(self._teams())
         return [self.get_team(slug) for slug in teams]
+
+
+@functools.lru_cache(maxsize=1024)
+def _split_key(key: str) -> Tuple[str, ...]:
+    """Support function to split a path/like/key in its components, once per key"""
+    return tuple(key.split("/"))
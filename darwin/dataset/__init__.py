@@ -1 +1,9 @@
-from darwin.dataset.remote_dataset import RemoteDataset
+# RemoteDataset pulls in the upload and download managers, hence is only imported at first use
+
+
+def __getattr__(name):
+    if name == "RemoteDataset":
+        from darwin.dataset.remote_dataset import RemoteDataset
+
+        return RemoteDataset
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
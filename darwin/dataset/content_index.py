@@ -0,0 +1,196 @@
+import hashlib
+import json
+import os
+from collections import deque
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from darwin.executor import DEFAULT_MAX_WORKERS, get_executor
+
+# Size of the blocks read from disk while hashing a file
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def hash_file(path: Path) -> str:
+    """Computes the digest of the content of a file. BLAKE2b is used as it is faster than SHA-256
+    on 64 bits platforms and, like every hashlib algorithm, releases the GIL on large inputs so
+    that several files can be hashed in parallel by threads.
+
+    Parameters
+    ----------
+    path : Path
+        File to hash
+
+    Returns
+    -------
+    str
+        Hexadecimal digest of the file
+    """
+    digest = hashlib.blake2b(digest_size=20)
+    buffer = bytearray(HASH_CHUNK_SIZE)
+    view = memoryview(buffer)
+    with path.open("rb", buffering=0) as f:
+        while True:
+            n = f.readinto(buffer)
+            if not n:
+                break
+            digest.update(view[:n])
+    return digest.hexdigest()
+
+
+class ContentIndex:
+    def __init__(self, path: Path):
+        """On disk index of the content of the files uploaded to a dataset. It holds the digest of
+        every file hashed, cached by path, size and modification time so that unchanged files are
+        never hashed twice, and the set of digests already uploaded to the dataset.
+
+        Parameters
+        ----------
+        path : Path
+            JSON file storing the index. It is created by save() if it does not exist
+        """
+        self.path = path
+        self.hashes: Dict[str, List] = {}
+        self.uploaded = set()
+        if path.exists():
+            try:
+                with path.open() as f:
+                    data = json.load(f)
+                self.hashes = data["hashes"]
+                self.uploaded = set(data["uploaded"])
+            except (ValueError, KeyError, TypeError):
+                # A corrupted index is rebuilt from scratch
+                pass
+
+    def hash_files(
+        self, files: Iterable[Path], max_workers: Optional[int] = None
+    ) -> Dict[str, str]:
+        """Computes the digest of several files, hashing in parallel the ones which are not cached
+        or have changed since they were hashed
+
+        Parameters
+        ----------
+        files : Iterable[Path]
+            Files to hash
+        max_workers : int
+            Number of files hashed at the same time
+
+        Returns
+        -------
+        dict
+            Digest of each file, by path
+        """
+        stats = {}
+        for file in files:
+            stat = file.stat()
+            stats[str(file.resolve())] = (file, stat.st_size, stat.st_mtime_ns)
+
+        stale = [
+            key
+            for key, (_, size, mtime) in stats.items()
+            if self.hashes.get(key, [None, None])[:2] != [size, mtime]
+        ]
+        if stale:
+            with get_executor("thread", max_workers=max_workers) as executor:
+                digests = executor.map(hash_file, [stats[key][0] for key in stale])
+                for key, digest in zip(stale, digests):
+                    _, size, mtime = stats[key]
+                    self.hashes[key] = [size, mtime, digest]
+        return {str(file): self.hashes[key][2] for key, (file, _, _) in stats.items()}
+
+    def filter_duplicates(
+        self, files: List[Path], max_workers: Optional[int] = None
+    ) -> Dict[str, str]:
+        """Selects the files whose content has not been uploaded yet. Among several files with
+        the same content, only the first one is selected
+
+        Parameters
+        ----------
+        files : list[Path]
+            Candidate files to upload
+        max_workers : int
+            Number of files hashed at the same time
+
+        Returns
+        -------
+        dict
+            Digest of each file selected, by path, in the order of files
+        """
+        selected = {}
+        seen = set(self.uploaded)
+        for path, digest in self.hash_files(files, max_workers=max_workers).items():
+            if digest not in seen:
+                seen.add(digest)
+                selected[path] = digest
+        return selected
+
+    def iter_new_files(
+        self, files: Iterable[Path], digests: Dict[str, str], max_workers: Optional[int] = None
+    ) -> Iterator[Path]:
+        """Streaming counterpart of filter_duplicates(). Files are hashed in parallel as they are
+        received, and the ones selected are yielded in order as soon as their digest is known,
+        so that files can be uploaded while the others are still being found and hashed.
+        The index is saved once all the files have been hashed
+
+        Parameters
+        ----------
+        files : Iterable[Path]
+            Candidate files to upload. Can be a generator, consumed lazily
+        digests : dict
+            Filled with the digest of each file selected, by path
+        max_workers : int
+            Number of files hashed at the same time. Defaults to DEFAULT_MAX_WORKERS
+
+        Returns
+        -------
+        Iterator[Path]
+            Files selected, in the order of files
+        """
+        max_in_flight = 4 * (max_workers or DEFAULT_MAX_WORKERS)
+        seen = set(self.uploaded)
+        with get_executor("thread", max_workers=max_workers) as executor:
+            pending = deque()
+
+            def select() -> Optional[Path]:
+                file, future = pending.popleft()
+                digest = future.result()
+                if digest in seen:
+                    return None
+                seen.add(digest)
+                digests[str(file)] = digest
+                return file
+
+            for file in files:
+                pending.append((file, executor.submit(self._digest, file)))
+                if len(pending) >= max_in_flight:
+                    file = select()
+                    if file is not None:
+                        yield file
+            while pending:
+                file = select()
+                if file is not None:
+                    yield file
+        self.save()
+
+    def _digest(self, file: Path) -> str:
+        """Support function to get the digest of a file, hashing it only if it is not cached or
+        has changed since it was hashed"""
+        stat = file.stat()
+        key = str(file.resolve())
+        cached = self.hashes.get(key)
+        if cached is None or cached[:2] != [stat.st_size, stat.st_mtime_ns]:
+            cached = self.hashes[key] = [stat.st_size, stat.st_mtime_ns, hash_file(file)]
+        return cached[2]
+
+    def add_uploaded(self, digests: Iterable[str]):
+        """Records the content of some files as uploaded to the dataset"""
+        self.uploaded.update(digests)
+
+    def save(self):
+        """Writes the index to disk. The file is replaced atomically, so that an interrupted
+        write never corrupts an existing index"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(f"{self.path.name}.tmp")
+        with tmp_path.open("w") as f:
+            json.dump({"hashes": self.hashes, "uploaded": sorted(self.uploaded)}, f)
+        os.replace(tmp_path, self.path)
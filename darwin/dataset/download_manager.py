@@ -1,13 +1,179 @@
+import base64
 import functools
+import hashlib
 import json
-import time
+import os
+import re
+import threading
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Optional
-
-import requests
+from typing import TYPE_CHECKING, Dict, List, Mapping, NamedTuple, Optional, Tuple
+from urllib.parse import urlsplit
 
+from darwin.dataset.image_store import ImageStore, image_key
+from darwin.exceptions import CorruptedDownload
+from darwin.executor import DEFAULT_MAX_WORKERS, get_executor
+from darwin.retry import RetryPolicy
 from darwin.utils import is_image_extension_allowed, urljoin
 
+if TYPE_CHECKING:
+    import requests
+
+    from darwin.async_client import AsyncClient
+
+# Images may not be available right away, downloads are retried for up to a minute
+DOWNLOAD_RETRY_POLICY = RetryPolicy(
+    max_attempts=10, backoff_factor=1, max_backoff=16, max_elapsed=60
+)
+
+# Size of the blocks read from the network and written to disk while downloading a file
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+
+# Suffix of the files being downloaded, until they are complete and verified
+PART_SUFFIX = ".part"
+
+# Number of times a download is resumed in a row after the connection was lost
+MAX_DOWNLOAD_INTERRUPTIONS = 5
+
+# Maximum number of files downloaded at the same time from a single host. Keep it under the
+# connection pool size of the session, connections opened beyond it are discarded after use
+DEFAULT_MAX_PER_HOST = 32
+
+
+class DownloadEngine:
+    def __init__(
+        self,
+        session: Optional["requests.Session"] = None,
+        max_per_host: int = DEFAULT_MAX_PER_HOST,
+        chunk_size: int = DOWNLOAD_CHUNK_SIZE,
+        retry_policy: Optional[RetryPolicy] = None,
+        store: Optional[ImageStore] = None,
+    ):
+        """Downloads files over the keep-alive connections of a shared session, from any number
+        of threads. The number of downloads in progress towards each host is limited so that
+        they all reuse the pooled connections rather than opening new ones.
+
+        Parameters
+        ----------
+        session : requests.Session
+            Pooled session used for the downloads. If None, a new connection is opened per file
+        max_per_host : int
+            Maximum number of files downloaded at the same time from a single host
+        chunk_size : int
+            Size of the blocks read from the network and written to disk
+        retry_policy : RetryPolicy
+            Policy used to retry failed downloads. Defaults to DOWNLOAD_RETRY_POLICY
+        store : ImageStore
+            Store the files are downloaded into once, then linked to their destination from.
+            If None, files are downloaded to their destination directly
+        """
+        if max_per_host < 1:
+            raise ValueError(f"Invalid number of downloads per host ({max_per_host}). Must be >= 1")
+        self.session = session
+        self.max_per_host = max_per_host
+        self.chunk_size = chunk_size
+        self.retry_policy = retry_policy
+        self.store = store
+        self._init()
+
+    def _init(self):
+        self._hosts: Dict[str, threading.BoundedSemaphore] = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def _host_slot(self, url: str):
+        """Support function to wait until less than max_per_host downloads are in progress
+        towards the host of an url"""
+        host = urlsplit(url).netloc
+        with self._lock:
+            semaphore = self._hosts.get(host)
+            if semaphore is None:
+                semaphore = self._hosts[host] = threading.BoundedSemaphore(self.max_per_host)
+        with semaphore:
+            yield
+
+    def download(self, url: str, path: Path, size: Optional[int] = None, verbose: bool = False):
+        """Downloads a file, see download_image()
+
+        Parameters
+        ----------
+        url : str
+            Url of the file to download
+        path : Path
+            Destination of the file. Nothing is downloaded if it exists already
+        size : int
+            Expected size of the file, if known
+        verbose : bool
+            Flag for the logging level
+        """
+        if path.exists():
+            return
+        if self.store is not None:
+            self.store.fetch(
+                image_key(url), path, lambda object_path: self._download(url, object_path, size)
+            )
+        else:
+            self._download(url, path, size, verbose)
+
+    def _download(self, url: str, path: Path, size: Optional[int] = None, verbose: bool = False):
+        with self._host_slot(url):
+            download_image(
+                url,
+                path,
+                verbose=verbose,
+                session=self.session,
+                retry_policy=self.retry_policy,
+                chunk_size=self.chunk_size,
+                size=size,
+            )
+
+    def verify(self, url: str, path: Path) -> bool:
+        """Checks a file downloaded against the one of the server, see verify_image(). The file
+        is removed if it does not match, so that it is downloaded again
+
+        Parameters
+        ----------
+        url : str
+            Url of the file
+        path : Path
+            File downloaded
+
+        Returns
+        -------
+        bool
+            Whether the file matches. True if there is no such file
+        """
+        if not path.exists():
+            return True
+        with self._host_slot(url):
+            if verify_image(url, path, session=self.session, retry_policy=self.retry_policy):
+                return True
+        print(f"Removing {path} as it does not match the image on the server")
+        if self.store is not None:
+            self.store.unlink(path)
+            self.store.discard(image_key(url))
+        else:
+            path.unlink()
+        return False
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state["_hosts"]
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._init()
+
+
+class DownloadTask(NamedTuple):
+    """Image to download, as planned from its annotation by plan_downloads()"""
+
+    url: str
+    path: Path
+    size: Optional[int] = None
+
 
 def download_all_images_from_annotations(
     api_url: str,
@@ -16,6 +182,11 @@ def download_all_images_from_annotations(
     force_replace: bool = False,
     remove_extra: bool = False,
     annotation_format: str = "json",
+    session: Optional["requests.Session"] = None,
+    engine: Optional[DownloadEngine] = None,
+    executor: Optional[str] = None,
+    max_workers: Optional[int] = None,
+    store: Optional[ImageStore] = None,
 ):
     """Helper function: downloads the all images corresponding to a project.
 
@@ -33,6 +204,16 @@ def download_all_images_from_annotations(
         Removes existing images for which there is not corresponding annotation
     annotation_format : str
         Format of the annotations. Currently only JSON and xml are expected
+    session : requests.Session
+        Pooled session used for the downloads. If None, a new connection is opened per image
+    engine : DownloadEngine
+        Engine running the downloads. Defaults to one using session
+    executor : str
+        Backend parsing the annotations, see plan_downloads()
+    max_workers : int
+        Number of annotations parsed at the same time
+    store : ImageStore
+        Image store recording the extra images removed, if the images are linked to it
 
     Returns
     -------
@@ -41,52 +222,171 @@ def download_all_images_from_annotations(
     count : int
         The files count
     """
-    Path(images_path).mkdir(exist_ok=True)
-    if annotation_format not in ["json", "xml"]:
+    if annotation_format != "json":
         raise ValueError(f"Annotation format {annotation_format} not supported")
+    tasks = plan_downloads(
+        annotations_path,
+        images_path,
+        force_replace=force_replace,
+        remove_extra=remove_extra,
+        executor=executor,
+        max_workers=max_workers,
+        store=store,
+    )
+
+    if engine is None:
+        engine = DownloadEngine(session)
 
-    # Verify that there is not already image in the images folder
-    existing_images = {
-        image.stem: image
-        for image in images_path.glob(f"*")
-        if is_image_extension_allowed(image.suffix)
-    }
-    annotations_to_download_path = []
-    for annotation_path in annotations_path.glob(f"*.{annotation_format}"):
-        annotation = json.load(annotation_path.open())
-        if not force_replace:
-            # Check collisions on image filename, original_filename and json filename on the system
-            if Path(annotation["image"]["filename"]).stem in existing_images:
-                continue
-            if Path(annotation["image"]["original_filename"]).stem in existing_images:
-                continue
-            if annotation_path.stem in existing_images:
-                continue
-        annotations_to_download_path.append(annotation_path)
+    # Create the generator with the partial functions
+    generator = lambda: (functools.partial(engine.download, *task) for task in tasks)
+    return generator, len(tasks)
+
+
+def plan_downloads(
+    annotations_path: Path,
+    images_path: Path,
+    force_replace: bool = False,
+    remove_extra: bool = False,
+    existing: bool = False,
+    executor: Optional[str] = None,
+    max_workers: Optional[int] = None,
+    store: Optional[ImageStore] = None,
+) -> List[DownloadTask]:
+    """Lists the images of a project to download. Every JSON annotation is parsed exactly once,
+    in parallel, and the images already in images_path are looked up by name in a set.
+
+    Parameters
+    ----------
+    annotations_path : Path
+        Path where the annotations are located
+    images_path : Path
+        Path where the images are downloaded
+    force_replace: bool
+        Plans the images which exist already too
+    remove_extra: bool
+        Removes existing images for which there is not corresponding annotation
+    existing : bool
+        Plans only the images which exist already instead, e.g. to verify them
+    executor : str
+        Backend parsing the annotations: `thread`, `process` or `serial`. Defaults to `thread`.
+        Parsing is CPU bound, `process` scales with the number of cores
+    max_workers : int
+        Number of annotations parsed at the same time
+    store : ImageStore
+        Image store recording the extra images removed, if the images are linked to it
+
+    Returns
+    -------
+    list[DownloadTask]
+        Url, destination and size (if known) of the images to download
+    """
+    images_path.mkdir(exist_ok=True)
+    existing_images = {}
+    with os.scandir(images_path) as entries:
+        for entry in entries:
+            stem, suffix = os.path.splitext(entry.name)
+            if is_image_extension_allowed(suffix):
+                existing_images[stem] = entry.path
+
+    with os.scandir(annotations_path) as entries:
+        annotation_paths = [entry.path for entry in entries if entry.name.endswith(".json")]
+    with get_executor(executor or "thread", max_workers=max_workers) as pool:
+        chunksize = max(1, len(annotation_paths) // (4 * (max_workers or DEFAULT_MAX_WORKERS)))
+        annotations = list(pool.map(_read_annotation, annotation_paths, chunksize=chunksize))
+
+    tasks = []
+    for stem, filename_stem, original_stem, suffix, url, size in annotations:
+        # Check collisions on image filename, original_filename and json filename on the system
+        exists = (
+            filename_stem in existing_images
+            or original_stem in existing_images
+            or stem in existing_images
+        )
+        if exists if existing else (force_replace or not exists):
+            tasks.append(DownloadTask(url, images_path / (stem + suffix), size))
 
     if remove_extra:
         # Removes existing images for which there is not corresponding annotation
-        annotations_downloaded_stem = [
-            a.stem for a in annotations_path.glob(f"*.{annotation_format}")
-        ]
-        for existing_image in existing_images.values():
-            if existing_image.stem not in annotations_downloaded_stem:
-                print(f"Removing {existing_image} as there is no corresponding annotation")
-                existing_image.unlink()
+        annotation_stems = {annotation[0] for annotation in annotations}
+        for stem, image_path in existing_images.items():
+            if stem not in annotation_stems:
+                print(f"Removing {image_path} as there is no corresponding annotation")
+                if store is not None:
+                    store.unlink(Path(image_path))
+                else:
+                    os.unlink(image_path)
 
-    # Create the generator with the partial functions
-    count = len(annotations_to_download_path)
-    generator = lambda: (
-        functools.partial(
-            download_image_from_annotation, api_url, annotation_path, images_path, annotation_format
-        )
-        for annotation_path in annotations_to_download_path
+    return tasks
+
+
+def _read_annotation(annotation_path: str) -> Tuple[str, str, str, str, str, Optional[int]]:
+    """Support function to extract what plan_downloads() needs from an annotation
+
+    Returns
+    -------
+    stem, filename_stem, original_stem, suffix, url, size : str, str, str, str, str, int
+        Name of the annotation without extension, names of the image on the server and when
+        uploaded without extension, extension of the image when uploaded, url of the image and
+        its size if the annotation provides it
+    """
+    with open(annotation_path, "rb") as f:
+        image = json.loads(f.read())["image"]
+    original_stem, suffix = os.path.splitext(image["original_filename"])
+    return (
+        os.path.splitext(os.path.basename(annotation_path))[0],
+        os.path.splitext(image["filename"])[0],
+        original_stem,
+        suffix,
+        image["url"],
+        image.get("size"),
+    )
+
+
+def verify_all_images_from_annotations(
+    annotations_path: Path,
+    images_path: Path,
+    engine: DownloadEngine,
+    executor: Optional[str] = None,
+    max_workers: Optional[int] = None,
+):
+    """Helper function: checks the images already downloaded for a project against the ones of
+    the server. The ones which do not match are removed, to be downloaded again.
+    Only JSON annotations are supported
+
+    Parameters
+    ----------
+    annotations_path : Path
+        Path where the annotations are located
+    images_path : Path
+        Path where the images are downloaded
+    engine : DownloadEngine
+        Engine running the checks
+    executor : str
+        Backend parsing the annotations, see plan_downloads()
+    max_workers : int
+        Number of annotations parsed at the same time
+
+    Returns
+    -------
+    generator : function
+        Generator for doing the actual checks, each one returning whether the image matches
+    count : int
+        The files count
+    """
+    tasks = plan_downloads(
+        annotations_path, images_path, existing=True, executor=executor, max_workers=max_workers
     )
-    return generator, count
+    generator = lambda: (functools.partial(engine.verify, task.url, task.path) for task in tasks)
+    return generator, len(tasks)
 
 
 def download_image_from_annotation(
-    api_url: str, annotation_path: Path, images_path: str, annotation_format: str
+    api_url: str,
+    annotation_path: Path,
+    images_path: str,
+    annotation_format: str,
+    session: Optional["requests.Session"] = None,
+    engine: Optional[DownloadEngine] = None,
 ):
     """Helper function: dispatcher of functions to download an image given an annotation
 
@@ -100,16 +400,28 @@ def download_image_from_annotation(
         Path where to download the image
     annotation_format : str
         Format of the annotations. Currently only JSON is supported
+    session : requests.Session
+        Pooled session used for the download
+    engine : DownloadEngine
+        Engine running the download. Takes precedence over session
     """
     if annotation_format == "json":
-        download_image_from_json_annotation(api_url, annotation_path, images_path)
+        download_image_from_json_annotation(
+            api_url, annotation_path, images_path, session=session, engine=engine
+        )
     elif annotation_format == "xml":
         print("sorry can't let you do that dave")
         raise NotImplementedError
         # download_image_from_xml_annotation(annotation_path, images_path)
 
 
-def download_image_from_json_annotation(api_url: str, annotation_path: Path, image_path: str):
+def download_image_from_json_annotation(
+    api_url: str,
+    annotation_path: Path,
+    image_path: str,
+    session: Optional["requests.Session"] = None,
+    engine: Optional[DownloadEngine] = None,
+):
     """
     Helper function: downloads an image given a .json annotation path
     and renames the json after the image filename
@@ -122,19 +434,40 @@ def download_image_from_json_annotation(api_url: str, annotation_path: Path, ima
         Path where the annotation is located
     image_path : Path
         Path where to download the image
+    session : requests.Session
+        Pooled session used for the download
+    engine : DownloadEngine
+        Engine running the download. Takes precedence over session
     """
     Path(image_path).mkdir(exist_ok=True)
     annotation = json.load(annotation_path.open())
+    path = _image_path(annotation, annotation_path, image_path)
+    if engine is not None:
+        engine.download(annotation["image"]["url"], path)
+    else:
+        download_image(annotation["image"]["url"], path, session=session)
 
-    # Make the image file name match the one of the JSON annotation
-    original_filename_suffix = Path(annotation["image"]["original_filename"]).suffix
-    path = Path(image_path) / (annotation_path.stem + original_filename_suffix)
 
-    download_image(annotation["image"]["url"], path)
+def _image_path(annotation: Dict, annotation_path: Path, image_path: Path) -> Path:
+    """Make the image file name match the one of the JSON annotation"""
+    original_filename_suffix = Path(annotation["image"]["original_filename"]).suffix
+    return Path(image_path) / (annotation_path.stem + original_filename_suffix)
 
 
-def download_image(url: str, path: Path, verbose: Optional[bool] = False):
-    """Helper function: downloads one image from url.
+def download_image(
+    url: str,
+    path: Path,
+    verbose: Optional[bool] = False,
+    session: Optional["requests.Session"] = None,
+    retry_policy: Optional[RetryPolicy] = None,
+    chunk_size: int = DOWNLOAD_CHUNK_SIZE,
+    size: Optional[int] = None,
+):
+    """Helper function: downloads one image from url. The image is written to a `.part` file
+    next to its destination, which is resumed with a HTTP Range request if the download is
+    interrupted, here or in a previous run. The image is only renamed to its destination once
+    its size, and its MD5 digest if the server provides it, match the ones of the server, so
+    that a truncated or corrupted image is never taken for a complete one.
 
     Parameters
     ----------
@@ -144,25 +477,386 @@ def download_image(url: str, path: Path, verbose: Optional[bool] = False):
         Path where to download the image, with filename
     verbose : bool
         Flag for the logging level
+    session : requests.Session
+        Pooled session used for the download. If None, a new connection is opened
+    retry_policy : RetryPolicy
+        Policy used to retry failed downloads. Defaults to DOWNLOAD_RETRY_POLICY
+    chunk_size : int
+        Size of the blocks read from the network and written to disk
+    size : int
+        Expected size of the image, if known. Used when the server does not send it
+
+    Raises
+    ------
+    CorruptedDownload
+        The image downloaded does not match the one of the server
     """
     if path.exists():
         return
     if verbose:
         print(f"Dowloading {path.name}")
-    TIMEOUT = 60
-    start = time.time()
+    if retry_policy is None:
+        retry_policy = DOWNLOAD_RETRY_POLICY
+
+    part_path = path.with_name(f"{path.name}{PART_SUFFIX}")
+    interruptions = 0
     while True:
-        response = requests.get(url, stream=True)
-        # Correct status: download image
-        if response.status_code == 200:
-            with open(str(path), "wb") as file:
-                for chunk in response:
+        offset = part_path.stat().st_size if part_path.exists() else 0
+        try:
+            expected = _download_part(url, part_path, offset, session, retry_policy, chunk_size)
+        except _DownloadInterrupted:
+            # Resume from what was received
+            interruptions += 1
+            if interruptions >= MAX_DOWNLOAD_INTERRUPTIONS:
+                raise
+            continue
+        if expected is None:
+            # The part can not be resumed, e.g. the image changed on the server
+            part_path.unlink()
+            continue
+        expected_size, expected_md5 = expected
+        if _matches(part_path, expected_size or size, expected_md5):
+            os.replace(part_path, path)
+            return
+        part_path.unlink()
+        if offset == 0:
+            raise CorruptedDownload(path)
+        # A resumed download may mix two versions of the image, start over
+
+
+def verify_image(
+    url: str,
+    path: Path,
+    session: Optional["requests.Session"] = None,
+    retry_policy: Optional[RetryPolicy] = None,
+) -> bool:
+    """Checks that an image downloaded matches the one of the server: same size, and same MD5
+    digest if the server provides it. Only the first byte of the image is requested, so that
+    urls only signed for GET requests can be checked too.
+
+    Parameters
+    ----------
+    url : str
+        Url of the image
+    path : Path
+        Image downloaded
+    session : requests.Session
+        Pooled session used for the request. If None, a new connection is opened
+    retry_policy : RetryPolicy
+        Policy used to retry failed requests. Defaults to DOWNLOAD_RETRY_POLICY
+
+    Returns
+    -------
+    bool
+        Whether the image matches
+    """
+    import requests
+
+    if retry_policy is None:
+        retry_policy = DOWNLOAD_RETRY_POLICY
+    headers = {"Accept-Encoding": "identity", "Range": "bytes=0-0"}
+    with retry_policy.run(
+        lambda: (session or requests).get(url, stream=True, headers=headers)
+    ) as response:
+        if response.status_code == 206:
+            _, size = _parse_content_range(response.headers.get("Content-Range"))
+            md5 = _expected_md5(response.headers, partial=True)
+        elif response.status_code == 200:
+            # Ranges are not supported, the body is not read
+            size = _parse_int(response.headers.get("Content-Length"))
+            md5 = _expected_md5(response.headers)
+        else:
+            _raise_for_status(url, response)
+    return _matches(path, size, md5)
+
+
+def _download_part(
+    url: str,
+    part_path: Path,
+    offset: int,
+    session: Optional["requests.Session"],
+    retry_policy: RetryPolicy,
+    chunk_size: int,
+) -> Optional[Tuple[Optional[int], Optional[str]]]:
+    """Support function to download an image, or its end from offset, into a part file.
+    See download_image()
+
+    Returns
+    -------
+    size, md5 : int, str
+        Size and MD5 hexadecimal digest of the whole image, according to the server, if known.
+        None if the part can not be resumed from offset
+
+    Raises
+    ------
+    _DownloadInterrupted
+        The connection was lost while receiving the image
+    """
+    import requests
+
+    headers = {"Accept-Encoding": "identity"}
+    if offset:
+        headers["Range"] = f"bytes={offset}-"
+    with retry_policy.run(
+        lambda: (session or requests).get(url, stream=True, headers=headers)
+    ) as response:
+        if response.status_code == 206:
+            start, size = _parse_content_range(response.headers.get("Content-Range"))
+            if start != offset:
+                return None
+            md5 = _expected_md5(response.headers, partial=True)
+        elif response.status_code == 200:
+            # Sent whole, the range was ignored
+            offset = 0
+            size = _parse_int(response.headers.get("Content-Length"))
+            md5 = _expected_md5(response.headers)
+        elif response.status_code == 416 and offset:
+            return None
+        else:
+            _raise_for_status(url, response)
+        try:
+            with part_path.open("ab" if offset else "wb") as file:
+                for chunk in response.iter_content(chunk_size=chunk_size):
                     file.write(chunk)
+        except (requests.exceptions.ConnectionError, requests.exceptions.ChunkedEncodingError):
+            raise _DownloadInterrupted(url)
+    return size, md5
+
+
+class _DownloadInterrupted(Exception):
+    pass
+
+
+def _raise_for_status(url: str, response: "requests.Response"):
+    """Support function to fail on the unexpected status of a download"""
+    # Fatal-error status: fail
+    if 400 <= response.status_code <= 499:
+        # Object storages and CDNs answer their errors in XML or HTML
+        try:
+            body = response.json()
+        except ValueError:
+            body = response.text
+        raise Exception(response.status_code, body)
+    raise Exception(f"Url request ({url}) failed with status {response.status_code}.")
+
+
+def _matches(path: Path, size: Optional[int], md5: Optional[str]) -> bool:
+    """Support function to check a file against its expected size and MD5 hexadecimal digest,
+    each one being skipped if unknown"""
+    if size is not None and path.stat().st_size != size:
+        return False
+    if md5 is not None:
+        digest = hashlib.md5()
+        with path.open("rb") as f:
+            for block in iter(lambda: f.read(DOWNLOAD_CHUNK_SIZE), b""):
+                digest.update(block)
+        return digest.hexdigest() == md5
+    return True
+
+
+def _expected_md5(headers: Mapping[str, str], partial: bool = False) -> Optional[str]:
+    """Support function to find the MD5 digest of a whole file in the headers of a response.
+    Google Cloud Storage sends it in x-goog-hash. Content-MD5 is the digest of the body, hence
+    only of the whole file if the response is not partial. ETags are never used, even when they
+    look like a MD5 digest: the ones of S3 objects encrypted with SSE-KMS or SSE-C, and of many
+    CDNs and origins, are not the digest of the content.
+
+    Returns
+    -------
+    str
+        Hexadecimal MD5 digest, or None if the headers do not provide it
+    """
+    for value in headers.get("x-goog-hash", "").split(","):
+        name, _, digest = value.strip().partition("=")
+        if name == "md5":
+            return _base64_to_hex(digest)
+    if not partial and headers.get("Content-MD5"):
+        return _base64_to_hex(headers["Content-MD5"])
+    return None
+
+
+def _base64_to_hex(value: str) -> Optional[str]:
+    try:
+        return base64.b64decode(value).hex()
+    except ValueError:
+        return None
+
+
+def _parse_content_range(value: Optional[str]) -> Tuple[Optional[int], Optional[int]]:
+    """Support function to read the first byte and the total size from a Content-Range header,
+    e.g. `bytes 100-199/1000`. Unknown values are None"""
+    match = re.fullmatch(r"bytes (\d+)-\d+/(\d+|\*)", (value or "").strip())
+    if match is None:
+        return None, None
+    return int(match.group(1)), _parse_int(match.group(2))
+
+
+def _parse_int(value: Optional[str]) -> Optional[int]:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+async def download_all_images_from_annotations_async(
+    client: "AsyncClient",
+    annotations_path: Path,
+    images_path: Path,
+    force_replace: bool = False,
+    remove_extra: bool = False,
+    annotation_format: str = "json",
+    max_concurrency: int = 1000,
+    store: Optional[ImageStore] = None,
+) -> int:
+    """asyncio counterpart of download_all_images_from_annotations(). The images are
+    downloaded right away instead of returning a generator.
+
+    Parameters
+    ----------
+    client : AsyncClient
+        Client whose connections are used for the downloads
+    max_concurrency : int
+        Maximum number of images being downloaded at the same time
+    store : ImageStore
+        Image store recording the extra images removed, if the images are linked to it
+
+    Returns
+    -------
+    count : int
+        The files count
+    """
+    import asyncio
+
+    if annotation_format != "json":
+        raise ValueError(f"Annotation format {annotation_format} not supported")
+    # Planning is blocking, it runs in a thread to keep the event loop responsive
+    tasks = await asyncio.get_running_loop().run_in_executor(
+        None,
+        functools.partial(
+            plan_downloads,
+            annotations_path,
+            images_path,
+            force_replace=force_replace,
+            remove_extra=remove_extra,
+            store=store,
+        ),
+    )
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def download(task: DownloadTask):
+        async with semaphore:
+            await download_image_async(client, task.url, task.path, size=task.size)
+
+    await asyncio.gather(*(download(task) for task in tasks))
+    return len(tasks)
+
+
+async def download_image_async(
+    client: "AsyncClient",
+    url: str,
+    path: Path,
+    chunk_size: int = DOWNLOAD_CHUNK_SIZE,
+    size: Optional[int] = None,
+):
+    """asyncio counterpart of download_image(). The image is written to a `.part` file, resumed
+    with a HTTP Range request if the download is interrupted and only renamed to its destination
+    once it matches the image of the server
+
+    Parameters
+    ----------
+    client : AsyncClient
+        Client whose connections are used for the download
+    url : str
+        Url of the image to download
+    path : Path
+        Path where to download the image, with filename
+    chunk_size : int
+        Size of the blocks read from the network and written to disk
+    size : int
+        Expected size of the image, if known. Used when the server does not send it
+
+    Raises
+    ------
+    CorruptedDownload
+        The image downloaded does not match the one of the server
+    """
+    if path.exists():
+        return
+
+    part_path = path.with_name(f"{path.name}{PART_SUFFIX}")
+    interruptions = 0
+    while True:
+        offset = part_path.stat().st_size if part_path.exists() else 0
+        try:
+            expected = await _download_part_async(client, url, part_path, offset, chunk_size)
+        except _DownloadInterrupted:
+            # Resume from what was received
+            interruptions += 1
+            if interruptions >= MAX_DOWNLOAD_INTERRUPTIONS:
+                raise
+            continue
+        if expected is None:
+            # The part can not be resumed, e.g. the image changed on the server
+            part_path.unlink()
+            continue
+        expected_size, expected_md5 = expected
+        if _matches(part_path, expected_size or size, expected_md5):
+            os.replace(part_path, path)
             return
-        # Fatal-error status: fail
-        if 400 <= response.status_code <= 499:
-            raise Exception(response.status_code, response.json())
-        # Timeout
-        if time.time() - start > TIMEOUT:
-            raise Exception(f"Timeout url request ({url}) after {TIMEOUT} seconds.")
-        time.sleep(1)
+        part_path.unlink()
+        if offset == 0:
+            raise CorruptedDownload(path)
+        # A resumed download may mix two versions of the image, start over
+
+
+async def _download_part_async(
+    client: "AsyncClient", url: str, part_path: Path, offset: int, chunk_size: int
+) -> Optional[Tuple[Optional[int], Optional[str]]]:
+    """asyncio counterpart of _download_part()"""
+    import asyncio
+
+    import aiohttp
+
+    headers = {"Accept-Encoding": "identity"}
+    if offset:
+        headers["Range"] = f"bytes={offset}-"
+    expected = None
+
+    async def send():
+        nonlocal expected, offset
+        async with client.session.get(url, headers=headers) as response:
+            if response.status == 206:
+                start, size = _parse_content_range(response.headers.get("Content-Range"))
+                if start != offset:
+                    expected = None
+                    return response
+                expected = size, _expected_md5(response.headers, partial=True)
+            elif response.status == 200:
+                # Sent whole, the range was ignored
+                offset = 0
+                size = _parse_int(response.headers.get("Content-Length"))
+                expected = size, _expected_md5(response.headers)
+            else:
+                await response.read()
+                return response
+            try:
+                with part_path.open("ab" if offset else "wb") as file:
+                    async for chunk in response.content.iter_chunked(chunk_size):
+                        file.write(chunk)
+            except (
+                aiohttp.ClientPayloadError,
+                aiohttp.ClientConnectionError,
+                asyncio.TimeoutError,
+            ):
+                raise _DownloadInterrupted(url)
+            return response
+
+    response = await client.run(send, "get", url, "cdn")
+    if response.status in (200, 206):
+        return expected
+    if response.status == 416 and offset:
+        return None
+    # Fatal-error status: fail
+    if 400 <= response.status <= 499:
+        raise Exception(response.status, await response.text())
+    raise Exception(f"Url request ({url}) failed with status {response.status}.")
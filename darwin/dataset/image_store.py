@@ -0,0 +1,302 @@
+import errno
+import hashlib
+import json
+import os
+import shutil
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+# Ways of filling a dataset folder with the images of the store
+LINK_MODES = ["hardlink", "reflink", "symlink"]
+
+# Name of the store, in the datasets directory of a team
+STORE_DIRNAME = ".store"
+
+# ioctl cloning a file on copy-on-write filesystems (Btrfs, XFS) on Linux
+_FICLONE = 0x40049409
+
+
+def image_key(url: str) -> str:
+    """Identifies an image of the server by its url, without the query which holds signatures
+    and expiry dates varying from one release to another
+
+    Parameters
+    ----------
+    url : str
+        Url of the image
+
+    Returns
+    -------
+    str
+        Key of the image in the store
+    """
+    parts = urlsplit(url)
+    return hashlib.blake2b(f"{parts.netloc}{parts.path}".encode(), digest_size=20).hexdigest()
+
+
+class ImageStore:
+    def __init__(self, path: Path, link_mode: str = "hardlink"):
+        """Content-addressable store of the images downloaded, shared by all the datasets,
+        releases and subsets of a datasets directory. Every image is downloaded once into the
+        store, then linked in each dataset folder using it.
+
+        Every link made or removed is recorded in an append-only log of references. gc() removes
+        the images which are no longer referenced, e.g. after a dataset folder was deleted.
+        Several processes can fill the same store, each image is downloaded under a file lock.
+
+        Parameters
+        ----------
+        path : Path
+            Folder of the store
+        link_mode : str
+            How images are linked in the dataset folders, one of LINK_MODES. Hard links and
+            reflinks require the store and the datasets to be on the same filesystem, copies
+            are made otherwise. With hard links, editing an image in place edits it for every
+            dataset using it.
+        """
+        if link_mode not in LINK_MODES:
+            raise ValueError(f"Link mode {link_mode} not supported. Choose one of {LINK_MODES}")
+        self.path = path
+        self.link_mode = link_mode
+        self._init()
+
+    def _init(self):
+        self._log_lock = threading.Lock()
+        self._log_fd: Optional[int] = None
+
+    @property
+    def references_path(self) -> Path:
+        return self.path / "references.jsonl"
+
+    def object_path(self, key: str) -> Path:
+        """Path of an image in the store"""
+        return self.path / "objects" / key[:2] / key
+
+    def fetch(self, key: str, path: Path, download: Callable[[Path], None]):
+        """Links an image of the store to a path, downloading it into the store first if needed
+
+        Parameters
+        ----------
+        key : str
+            Key of the image, see image_key()
+        path : Path
+            Where the image is linked. It must not exist
+        download : Callable
+            Function downloading the image to the path it is given
+        """
+        object_path = self.object_path(key)
+        # The same image can be requested by several datasets, or pulls, at the same time
+        object_path.parent.mkdir(parents=True, exist_ok=True)
+        with _file_lock(object_path.with_name(f"{key}.lock")):
+            if not object_path.exists():
+                download(object_path)
+        mode = self._link(object_path, path)
+        stat = path.lstat()
+        self._log(
+            {
+                "key": key,
+                "path": str(path.absolute()),
+                "mode": mode,
+                "size": stat.st_size,
+                "mtime": stat.st_mtime_ns,
+            }
+        )
+
+    def unlink(self, path: Path):
+        """Removes an image from a dataset folder, recording that it no longer references the
+        store. Nothing happens if it does not exist
+
+        Parameters
+        ----------
+        path : Path
+            Image in a dataset folder
+        """
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            return
+        self._log({"path": str(path.absolute()), "removed": True})
+
+    def discard(self, key: str):
+        """Removes an image from the store, e.g. if it is corrupted. The links already made to it
+        are left untouched"""
+        object_path = self.object_path(key)
+        if object_path.exists():
+            object_path.unlink()
+
+    def _link(self, object_path: Path, path: Path) -> str:
+        """Support function to link an image of the store, atomically
+
+        Returns
+        -------
+        str
+            How the image was linked: the link mode of the store, or `copy` if it failed
+        """
+        tmp_path = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        mode = self.link_mode
+        try:
+            if mode == "hardlink":
+                os.link(object_path, tmp_path)
+            elif mode == "symlink":
+                os.symlink(object_path.absolute(), tmp_path)
+            else:
+                _reflink(object_path, tmp_path)
+        except OSError:
+            # Across filesystems, or on filesystems without reflinks
+            if tmp_path.exists():
+                tmp_path.unlink()
+            shutil.copyfile(object_path, tmp_path)
+            mode = "copy"
+        os.replace(tmp_path, path)
+        return mode
+
+    def _log(self, reference: Dict):
+        line = (json.dumps(reference) + "\n").encode()
+        with self._log_lock:
+            if self._log_fd is None:
+                self.path.mkdir(parents=True, exist_ok=True)
+                self._log_fd = os.open(
+                    self.references_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644
+                )
+            os.write(self._log_fd, line)
+
+    def close(self):
+        """Flushes the references logged to the disk"""
+        with self._log_lock:
+            if self._log_fd is not None:
+                os.fsync(self._log_fd)
+                os.close(self._log_fd)
+                self._log_fd = None
+
+    def references(self) -> Dict[str, Dict[str, Dict]]:
+        """Lists the links made to each image of the store which still exist
+
+        Returns
+        -------
+        dict
+            For each key, the reference logged for each path linked to the image
+        """
+        links: Dict[str, Dict] = {}
+        if self.references_path.exists():
+            with self.references_path.open() as f:
+                for line in f:
+                    try:
+                        reference = json.loads(line)
+                    except ValueError:
+                        continue
+                    if reference.get("removed"):
+                        links.pop(reference["path"], None)
+                    else:
+                        links[reference["path"]] = reference
+        references: Dict[str, Dict[str, Dict]] = {}
+        for path, reference in links.items():
+            if _is_linked(self.object_path(reference["key"]), Path(path), reference):
+                references.setdefault(reference["key"], {})[path] = reference
+        return references
+
+    def refcount(self, key: str) -> int:
+        """Number of links to an image of the store which still exist"""
+        return len(self.references().get(key, {}))
+
+    def gc(self) -> Tuple[int, int]:
+        """Removes the images of the store which are not linked anywhere anymore, and compacts
+        the log of references. Must not run while images are being pulled into the store
+
+        Returns
+        -------
+        removed, size : int, int
+            Number of images removed and the space they used, in bytes
+        """
+        self.close()
+        references = self.references()
+        removed = 0
+        size = 0
+        objects_path = self.path / "objects"
+        if objects_path.exists():
+            for object_path in objects_path.glob("*/*"):
+                if object_path.suffix or object_path.name in references:
+                    # Downloads in progress are kept, to be resumed
+                    continue
+                stat = object_path.stat()
+                # Hard links made outside of the store are references too
+                if stat.st_nlink > 1:
+                    continue
+                object_path.unlink()
+                removed += 1
+                size += stat.st_size
+            # Locks of the images removed
+            for lock_path in objects_path.glob("*/*.lock"):
+                if not lock_path.with_suffix("").exists():
+                    lock_path.unlink()
+
+        tmp_path = self.references_path.with_name(f"{self.references_path.name}.tmp")
+        with tmp_path.open("w") as f:
+            for paths in references.values():
+                for reference in paths.values():
+                    f.write(json.dumps(reference) + "\n")
+        os.replace(tmp_path, self.references_path)
+        return removed, size
+
+    def __getstate__(self):
+        return {"path": self.path, "link_mode": self.link_mode}
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._init()
+
+
+def _reflink(source: Path, destination: Path):
+    """Support function to clone a file without copying its data, on copy-on-write filesystems.
+    Raises OSError where it is not supported"""
+    try:
+        import fcntl
+    except ImportError:
+        raise OSError("Reflinks are not supported on this platform")
+    with source.open("rb") as src, destination.open("wb") as dst:
+        fcntl.ioctl(dst.fileno(), _FICLONE, src.fileno())
+
+
+@contextmanager
+def _file_lock(path: Path):
+    """Support function to hold an exclusive lock on a file, across threads and processes"""
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        try:
+            import fcntl
+        except ImportError:
+            import msvcrt
+
+            while True:
+                try:
+                    msvcrt.locking(fd, msvcrt.LK_LOCK, 1)
+                    break
+                except OSError as e:
+                    # LK_LOCK gives up after 10 seconds, the lock is then waited for again as
+                    # flock() would. Any other error is raised
+                    if e.errno != errno.EDEADLOCK:
+                        raise
+        else:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+        yield
+    finally:
+        # Closing the file releases the lock
+        os.close(fd)
+
+
+def _is_linked(object_path: Path, path: Path, reference: Dict) -> bool:
+    """Support function to check whether a path is still the one linked to an image of the
+    store, as logged in a reference"""
+    try:
+        if reference["mode"] == "symlink":
+            return path.is_symlink() and Path(os.readlink(path)) == object_path.absolute()
+        if reference["mode"] == "hardlink":
+            return os.path.samefile(object_path, path)
+        # Reflinks and copies are independent files, unchanged if their size and modification
+        # time are the ones they had once linked
+        stat = path.stat()
+        return (stat.st_size, stat.st_mtime_ns) == (reference["size"], reference["mtime"])
+    except (OSError, KeyError):
+        return False
@@ -0,0 +1,193 @@
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Set, Tuple
+
+# States a file goes through while being uploaded, in order
+REGISTERED = "registered"
+SIGNED = "signed"
+UPLOADED = "uploaded"
+CONFIRMED = "confirmed"
+STATES = [REGISTERED, SIGNED, UPLOADED, CONFIRMED]
+
+
+class UploadJournal:
+    def __init__(self, path: Path, fsync_every: int = 100, fsync_interval: float = 1.0):
+        """Append-only journal, in JSON Lines, of the state of the files being uploaded.
+        Each record is written to the file as soon as it is made, so it survives the process
+        crashing. Records are only flushed to the disk every fsync_every records or
+        fsync_interval seconds, whichever comes first, to survive the machine crashing without
+        paying for a fsync per record.
+
+        The journal can be shared by threads, and by processes as it is picklable: every record
+        is a single append to the file.
+
+        Parameters
+        ----------
+        path : Path
+            JSON Lines file the records are appended to
+        fsync_every : int
+            Maximum number of records not flushed to the disk
+        fsync_interval : float
+            Maximum number of seconds between two flushes to the disk
+        """
+        self.path = path
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+        self._init()
+
+    def _init(self):
+        self._fd: Optional[int] = None
+        self._closed = False
+        self._pending = 0
+        self._last_sync = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _open(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # A crash can leave the last record incomplete. Terminate it so that it does not corrupt
+        # the next one, it is then skipped by replay()
+        terminated = True
+        if self.path.exists() and self.path.stat().st_size > 0:
+            with self.path.open("rb") as f:
+                f.seek(-1, os.SEEK_END)
+                terminated = f.read(1) == b"\n"
+        self._fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        if not terminated:
+            os.write(self._fd, b"\n")
+
+    def record(self, file_path: Path, state: str, **fields):
+        """Appends the new state of a file to the journal
+
+        Parameters
+        ----------
+        file_path : Path
+            File whose state changed
+        state : str
+            New state of the file, one of STATES
+        fields
+            Details about the file to record with its state, e.g. its id
+        """
+        line = json.dumps({"file_path": str(file_path), "state": state, **fields}) + "\n"
+        with self._lock:
+            if self._fd is None:
+                self._open()
+            os.write(self._fd, line.encode())
+            self._pending += 1
+            now = time.monotonic()
+            if (
+                self._closed
+                or self._pending >= self.fsync_every
+                or now - self._last_sync >= self.fsync_interval
+            ):
+                self._sync(now)
+            if self._closed:
+                os.close(self._fd)
+                self._fd = None
+
+    def _sync(self, now: float):
+        os.fsync(self._fd)
+        self._pending = 0
+        self._last_sync = now
+
+    def close(self):
+        """Flushes the pending records to the disk and closes the journal. Records made once
+        closed, e.g. by jobs still running, are each flushed and closed right away, so that the
+        journal is never left open"""
+        with self._lock:
+            self._closed = True
+            if self._fd is not None:
+                self._sync(time.monotonic())
+                os.close(self._fd)
+                self._fd = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __getstate__(self):
+        return {
+            "path": self.path,
+            "fsync_every": self.fsync_every,
+            "fsync_interval": self.fsync_interval,
+        }
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._init()
+
+
+def read_journal(path: Path) -> Iterator[Dict]:
+    """Streams the records of a journal, see UploadJournal. Incomplete records are skipped
+
+    Parameters
+    ----------
+    path : Path
+        Journal to read
+
+    Returns
+    -------
+    Iterator[dict]
+        Records of the journal, in the order they were made
+    """
+    with path.open() as f:
+        for line in f:
+            try:
+                yield json.loads(line)
+            except ValueError:
+                continue
+
+
+def replay_journal(path: Path) -> Tuple[Dict[str, Dict], Set[str]]:
+    """Computes the latest state of every file of a journal, in a single pass over it.
+    The details recorded about a file are dropped once it is confirmed, as nothing is left to
+    resume for it: only its path is kept, to exclude it from the files to upload. Memory still
+    grows with the number of files journaled, by one path per file confirmed
+
+    Parameters
+    ----------
+    path : Path
+        Journal to read
+
+    Returns
+    -------
+    unfinished : dict
+        For each file path not confirmed yet, its latest state merged with all the details
+        recorded about it
+    confirmed : set[str]
+        Paths of the files confirmed
+    """
+    unfinished: Dict[str, Dict] = {}
+    confirmed: Set[str] = set()
+    for record in read_journal(path):
+        file_path = record["file_path"]
+        if record.get("state") == CONFIRMED:
+            unfinished.pop(file_path, None)
+            confirmed.add(file_path)
+        elif file_path not in confirmed:
+            unfinished.setdefault(file_path, {}).update(record)
+    return unfinished, confirmed
+
+
+def import_legacy_responses(legacy_path: Path, path: Path):
+    """Creates a journal from the responses saved by the pushes made before journals existed,
+    so that they can be resumed. The files uploaded to S3 are recorded as confirmed, the others
+    are left out to be uploaded again, as these pushes did
+
+    Parameters
+    ----------
+    legacy_path : Path
+        JSON file listing the responses of the uploads
+    path : Path
+        Journal to create
+    """
+    with legacy_path.open() as f:
+        responses = json.load(f)
+    with UploadJournal(path) as journal:
+        for response in responses:
+            if str(response.get("s3_response_status_code")).startswith("2"):
+                journal.record(Path(response["file_path"]), CONFIRMED, id=response.get("image_id"))
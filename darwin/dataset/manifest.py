@@ -0,0 +1,147 @@
+import json
+import os
+import shutil
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional
+
+from darwin.dataset.image_store import image_key
+
+# Name of the manifest of the release pulled, in the folder of a dataset or subset
+MANIFEST_FILENAME = ".release_manifest.json"
+
+
+class ManifestEntry(NamedTuple):
+    """Annotation of a release pulled, identified by the CRC-32 and size of its file in the
+    release zip, which the zip provides without decompressing it"""
+
+    crc: int
+    size: int
+    annotation: str
+    image: str
+    image_key: str
+
+
+def read_entry(annotation_path: Path, crc: int, size: int) -> ManifestEntry:
+    """Reads where an annotation of a release and its image are placed in the dataset folder
+
+    Parameters
+    ----------
+    annotation_path : Path
+        Annotation file, as extracted from the release zip
+    crc, size : int
+        CRC-32 and size of the file
+
+    Returns
+    -------
+    ManifestEntry
+        Entry of the annotation in the manifest
+    """
+    with annotation_path.open("rb") as f:
+        image = json.loads(f.read())["image"]
+    original_filename = Path(image["original_filename"])
+    # Annotations are renamed to have the image original filename, see RemoteDataset.pull()
+    stem = f"{Path(image['filename']).stem}_{original_filename.stem}"
+    return ManifestEntry(
+        crc=crc,
+        size=size,
+        annotation=stem + annotation_path.suffix,
+        image=stem + original_filename.suffix,
+        image_key=image_key(image["url"]),
+    )
+
+
+class ReleaseManifest:
+    def __init__(self, release: Dict, entries: Dict[str, ManifestEntry]):
+        """Lists the annotations of the release pulled in a dataset folder, so that the next pull
+        only writes the annotations, and downloads the images, which changed in between.
+
+        Parameters
+        ----------
+        release : dict
+            Identifies the release pulled, see release_fingerprint()
+        entries : dict
+            Entry of each annotation, by name of its file in the release zip
+        """
+        self.release = release
+        self.entries = entries
+
+    @classmethod
+    def load(cls, path: Path) -> Optional["ReleaseManifest"]:
+        """Reads a manifest, or returns None if there is none or it is corrupted"""
+        try:
+            with path.open() as f:
+                data = json.load(f)
+            entries = {name: ManifestEntry(*entry) for name, entry in data["entries"].items()}
+            return cls(data["release"], entries)
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def save(self, path: Path):
+        """Writes the manifest atomically"""
+        tmp_path = path.with_name(f"{path.name}.tmp")
+        with tmp_path.open("w") as f:
+            json.dump({"release": self.release, "entries": self.entries}, f)
+        os.replace(tmp_path, path)
+
+    def stale_images(self, manifest: "ReleaseManifest") -> List[str]:
+        """Lists the images of this release which another one no longer uses as is, as their
+        item was removed or now points to a different image
+
+        Parameters
+        ----------
+        manifest : ReleaseManifest
+            Manifest of the release replacing this one
+
+        Returns
+        -------
+        list[str]
+            Names of the images, in the images folder
+        """
+        images = {entry.image: entry.image_key for entry in manifest.entries.values()}
+        return [
+            entry.image
+            for entry in self.entries.values()
+            if images.get(entry.image) != entry.image_key
+        ]
+
+
+def release_fingerprint(release) -> Dict:
+    """Identifies a release: two releases with the same fingerprint have the same content"""
+    return {
+        "dataset": release.dataset_slug,
+        "name": release.name,
+        "version": release.version,
+        "export_date": release.export_date.isoformat(),
+    }
+
+
+def swap_directory(new_path: Path, path: Path):
+    """Replaces a folder with another one. The folder is renamed aside, then the new one is
+    renamed to it, so that it is complete as soon as it appears. See recover_swap()
+
+    Parameters
+    ----------
+    new_path : Path
+        Folder to move, on the same filesystem as path
+    path : Path
+        Folder to replace. It does not need to exist
+    """
+    old_path = path.with_name(f".{path.name}.old")
+    if old_path.exists():
+        shutil.rmtree(old_path)
+    if path.exists():
+        os.rename(path, old_path)
+    os.rename(new_path, path)
+    try:
+        shutil.rmtree(old_path)
+    except FileNotFoundError:
+        pass
+    except PermissionError:
+        print(f"Could not remove {old_path}. Permission denied.")
+
+
+def recover_swap(path: Path):
+    """Puts back a folder renamed aside by a swap_directory() which was interrupted"""
+    old_path = path.with_name(f".{path.name}.old")
+    if not path.exists() and old_path.exists():
+        os.rename(old_path, path)
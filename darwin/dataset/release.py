@@ -1,9 +1,12 @@
 import datetime
 import shutil
-
-import requests
+from typing import TYPE_CHECKING, Optional
 
 from darwin.dataset.identifier import DatasetIdentifier
+from darwin.retry import RetryPolicy
+
+if TYPE_CHECKING:
+    import requests
 
 
 class Release:
@@ -65,8 +68,34 @@ class Release:
             latest=payload["latest"],
         )
 
-    def download_zip(self, path):
-        with requests.get(self.url, stream=True) as r:
+    def download_zip(
+        self,
+        path,
+        session: Optional["requests.Session"] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+    ):
+        """Downloads the release zip file in the path provided
+
+        Parameters
+        ----------
+        path : Path
+            Destination of the zip file
+        session : requests.Session
+            Pooled session used for the download. If None, a new connection is opened
+        retry_policy : RetryPolicy
+            Policy used to retry a failed download. Defaults to RetryPolicy()
+
+        Returns
+        -------
+        Path
+            Path to the downloaded zip file
+        """
+        import requests
+
+        if retry_policy is None:
+            retry_policy = RetryPolicy()
+        with retry_policy.run(lambda: (session or requests).get(self.url, stream=True)) as r:
+            r.raise_for_status()
             with open(str(path), "wb") as f:
                 shutil.copyfileobj(r.raw, f)
         return path
@@ -1,15 +1,41 @@
-import json
+import functools
+import itertools
+import os
 import shutil
 import tempfile
 import zipfile
+import zlib
 from datetime import datetime
 from pathlib import Path
-from typing import TYPE_CHECKING, Callable, List, Optional
-
-from darwin.dataset.download_manager import download_all_images_from_annotations
+from typing import TYPE_CHECKING, Callable, Iterator, List, Optional
+
+from darwin.dataset.content_index import ContentIndex
+from darwin.dataset.download_manager import (
+    DEFAULT_MAX_PER_HOST,
+    DownloadEngine,
+    download_all_images_from_annotations,
+    download_all_images_from_annotations_async,
+    verify_all_images_from_annotations,
+)
 from darwin.dataset.identifier import DatasetIdentifier
+from darwin.dataset.image_store import STORE_DIRNAME, ImageStore
+from darwin.dataset.manifest import (
+    MANIFEST_FILENAME,
+    ManifestEntry,
+    ReleaseManifest,
+    read_entry,
+    recover_swap,
+    release_fingerprint,
+    swap_directory,
+)
+from darwin.dataset.journal import UploadJournal, import_legacy_responses, replay_journal
 from darwin.dataset.release import Release
-from darwin.dataset.upload_manager import add_files_to_dataset
+from darwin.dataset.stats import get_dataset_stats
+from darwin.dataset.upload_manager import (
+    add_files_to_dataset,
+    add_files_to_dataset_async,
+    resume_uploads,
+)
 from darwin.dataset.utils import (
     exhaust_generator,
     get_annotations,
@@ -18,7 +44,7 @@ from darwin.dataset.utils import (
     split_dataset,
 )
 from darwin.exceptions import NotFound
-from darwin.utils import find_files, urljoin
+from darwin.utils import find_files, iter_files, urljoin
 from darwin.validators import name_taken, validation_error
 
 if TYPE_CHECKING:
@@ -75,6 +101,10 @@ class RemoteDataset:
         fps: int = 1,
         files_to_exclude: Optional[List[str]] = None,
         resume: bool = False,
+        executor: Optional[str] = None,
+        max_workers: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        skip_duplicates: bool = False,
     ):
         """Uploads a local dataset (images ONLY) in the datasets directory.
 
@@ -85,26 +115,36 @@ class RemoteDataset:
         blocking : bool
             If False, the dataset is not uploaded and a generator function is returned instead
         multi_threaded : bool
-            Uses multiprocessing to upload the dataset in parallel.
-            If blocking is False this has no effect.
+            Uploads the dataset in parallel. If blocking is False this has no effect.
         files_to_exclude : list[str]
             List of files to exclude from the file scan (which is done only if files is None)
         fps : int
             Number of file per seconds to upload
         resume : bool
             Flag for signalling the resuming of a push
+        executor : str
+            Backend running the uploads: `thread`, `process` or `serial`. See exhaust_generator()
+        max_workers : int
+            Number of concurrent uploads
+        batch_size : int
+            Number of files signed and confirmed with a single request. See add_files_to_dataset()
+        skip_duplicates : bool
+            Skips the files whose content was already uploaded to the dataset from this machine,
+            even under another name, as well as the copies of a file within the files to upload.
+            Uploads are only recorded if blocking is True. See ContentIndex
 
         Returns
         -------
         generator : function
-            Generator for doing the actual uploads. This is None if blocking is True
+            Generator for doing the actual uploads, closing the upload journal once exhausted.
+            This is None if blocking is True
         count : int
-            The files count
+            The files count, None if the files are still being searched for while uploading
         """
 
-        # This is where the responses from the upload function will be saved/load for resume
+        # This is where the state of each file is journaled, to resume interrupted uploads
         self.local_path.parent.mkdir(exist_ok=True)
-        responses_path = self.local_path.parent / ".upload_responses.json"
+        journal_path = self.local_path.parent / f".{self.slug}.upload_journal.jsonl"
         # Init optional parameters
         if files_to_exclude is None:
             files_to_exclude = []
@@ -112,50 +152,96 @@ class RemoteDataset:
             raise NotFound("Dataset location not found. Check your path.")
 
         if resume:
-            if not responses_path.exists():
+            legacy_path = self.local_path.parent / ".upload_responses.json"
+            if not journal_path.exists() and legacy_path.exists():
+                # Push interrupted before the journals were introduced
+                import_legacy_responses(legacy_path, journal_path)
+            if not journal_path.exists():
                 raise NotFound("Dataset location not found. Check your path.")
-            with responses_path.open() as f:
-                logged_responses = json.load(f)
-            files_to_exclude.extend(
-                [
-                    response["file_path"]
-                    for response in logged_responses
-                    if response["s3_response_status_code"].startswith("2")
-                ]
-            )
+            unfinished_files, confirmed_files = replay_journal(journal_path)
+            # The list of the caller is left untouched
+            files_to_exclude = [*files_to_exclude, *unfinished_files, *confirmed_files]
+        else:
+            unfinished_files, confirmed_files = {}, set()
 
-        files_to_upload = find_files(
+        files_to_upload = iter_files(
             files=files_to_upload, recursive=True, files_to_exclude=files_to_exclude
         )
-
-        if not files_to_upload:
+        # Only the first file is looked for upfront, the others are found while uploading
+        first_file = next(files_to_upload, None)
+        if first_file is None and not unfinished_files and not confirmed_files:
             raise ValueError(
                 "No files to upload, check your path, exclusion filters and resume flag"
             )
-
-        progress, count = add_files_to_dataset(
-            client=self.client,
-            dataset_id=str(self.dataset_id),
-            filenames=files_to_upload,
-            fps=fps,
-            team=self.team,
+        files_to_upload = (
+            [] if first_file is None else itertools.chain([first_file], files_to_upload)
         )
 
+        if not resume and journal_path.exists():
+            journal_path.unlink()
+        journal = UploadJournal(journal_path)
+        resumed_jobs = resume_uploads(self.client, unfinished_files.values(), self.team, journal)
+        del unfinished_files, confirmed_files
+
+        if skip_duplicates:
+            content_index = ContentIndex(
+                self.local_path.parent / f".{self.slug}.content_index.json"
+            )
+            digests = content_index.hash_files(
+                (job.keywords["file_path"] for job in resumed_jobs), max_workers=max_workers
+            )
+            # Files are hashed and filtered as they are found, the index is saved once all are
+            files_to_upload = content_index.iter_new_files(
+                files_to_upload, digests, max_workers=max_workers
+            )
+            first_file = next(files_to_upload, None)
+            files_to_upload = (
+                [] if first_file is None else itertools.chain([first_file], files_to_upload)
+            )
+
+        if not files_to_upload and not resumed_jobs:
+            return None, 0
+
+        if files_to_upload:
+            progress, count = add_files_to_dataset(
+                client=self.client,
+                dataset_id=str(self.dataset_id),
+                filenames=files_to_upload,
+                fps=fps,
+                team=self.team,
+                batch_size=batch_size,
+                journal=journal,
+            )
+        else:
+            progress, count = [], 0
+        progress = itertools.chain(resumed_jobs, progress)
+        if count is not None:
+            count += len(resumed_jobs)
+
         # If blocking is selected, upload the dataset remotely
         if blocking:
-            responses = exhaust_generator(
-                progress=progress, count=count, multi_threaded=multi_threaded
-            )
-            # Log responses to file
-            if responses:
-                responses = [{k: str(v) for k, v in response.items()} for response in responses]
-                if resume:
-                    responses.extend(logged_responses)
-                with responses_path.open("w") as f:
-                    json.dump(responses, f)
+            try:
+                responses = exhaust_generator(
+                    progress=progress,
+                    count=count,
+                    multi_threaded=multi_threaded,
+                    executor=executor,
+                    max_workers=max_workers,
+                    concurrency=self.client.concurrency["s3"],
+                )
+            finally:
+                journal.close()
+            if skip_duplicates:
+                content_index.add_uploaded(
+                    digests[str(response["file_path"])]
+                    for response in responses
+                    if str(response["s3_response_status_code"]).startswith("2")
+                    and _is_confirmed(response.get("backend_response"))
+                )
+                content_index.save()
             return None, count
         else:
-            return progress, count
+            return _closing(progress, journal), count
 
     def pull(
         self,
@@ -168,8 +254,15 @@ class RemoteDataset:
         remove_extra: bool = True,
         subset_filter_annotations_function: Optional[Callable] = None,
         subset_folder_name: Optional[str] = None,
+        executor: Optional[str] = None,
+        max_workers: Optional[int] = None,
+        max_per_host: Optional[int] = None,
+        verify: bool = False,
+        link_mode: Optional[str] = None,
     ):
         """Downloads a remote project (images and annotations) in the datasets directory.
+        The images are downloaded over the pooled connections of the client. Pulling a dataset
+        again only applies what changed since the release pulled last.
 
         Parameters
         ----------
@@ -178,7 +271,7 @@ class RemoteDataset:
         blocking : bool
             If False, the dataset is not downloaded and a generator function is returned instead
         multi_threaded : bool
-            Uses multiprocessing to download the dataset in parallel. If blocking is False this has no effect.
+            Downloads the dataset in parallel. If blocking is False this has no effect.
         only_annotations: bool
             Download only the annotations and no corresponding images
         force_replace: bool
@@ -191,6 +284,21 @@ class RemoteDataset:
             If it needs to receive other parameters is advised to use functools.partial() for it.
         subset_folder_name: str
             Name of the folder with the subset of the dataset. If not provided a timestamp is used.
+        executor : str
+            Backend running the downloads: `thread`, `process` or `serial`. See exhaust_generator()
+        max_workers : int
+            Number of concurrent downloads
+        max_per_host : int
+            Maximum number of concurrent downloads from a single host. Defaults to
+            DEFAULT_MAX_PER_HOST, bounded by the connection pool size of the client
+        verify : bool
+            Checks the images already downloaded against the ones of the server, in parallel,
+            and downloads again the ones which do not match. Done before returning, even if not
+            blocking
+        link_mode : str
+            If set, the images are downloaded once into the image store shared by all the datasets
+            of the datasets directory, and linked in the dataset folder: `hardlink`, `reflink` or
+            `symlink`. See ImageStore
 
         Returns
         -------
@@ -202,66 +310,315 @@ class RemoteDataset:
         if release is None:
             release = self.get_release()
 
-        with tempfile.TemporaryDirectory() as tmp_dir:
+        # Images removed from a dataset linked to the image store are recorded in it, even if
+        # this pull does not link images
+        store_path = self.local_path.parent / STORE_DIRNAME
+        store = None
+        if link_mode is not None:
+            store = ImageStore(store_path, link_mode)
+        elif store_path.exists():
+            store = ImageStore(store_path)
+        try:
+            annotations_dir = self._pull_annotations(
+                release, subset_filter_annotations_function, subset_folder_name, store
+            )
+
+            if only_annotations:
+                # No images will be downloaded
+                return None, 0
+
+            # Create the generator with the download instructions
+            images_dir = annotations_dir.parent / "images"
+            if max_per_host is None:
+                max_per_host = min(DEFAULT_MAX_PER_HOST, self.client.pool_size)
+            engine = DownloadEngine(
+                self.client.get_session("cdn"),
+                max_per_host=max_per_host,
+                store=store if link_mode is not None else None,
+            )
+            if verify:
+                checks, count = verify_all_images_from_annotations(
+                    annotations_dir, images_dir, engine, executor=executor
+                )
+                exhaust_generator(
+                    progress=checks(),
+                    count=count,
+                    multi_threaded=multi_threaded,
+                    executor=executor,
+                    max_workers=max_workers,
+                    concurrency=self.client.concurrency["cdn"],
+                )
+            progress, count = download_all_images_from_annotations(
+                api_url=self.client.url,
+                annotations_path=annotations_dir,
+                images_path=images_dir,
+                force_replace=force_replace,
+                remove_extra=remove_extra,
+                engine=engine,
+                executor=executor,
+                store=store,
+            )
+            if count == 0:
+                get_dataset_stats(self.local_path)
+                return None, count
+
+            # If blocking is selected, download the dataset on the file system
+            if blocking:
+                exhaust_generator(
+                    progress=progress(),
+                    count=count,
+                    multi_threaded=multi_threaded,
+                    executor=executor,
+                    max_workers=max_workers,
+                    concurrency=self.client.concurrency["cdn"],
+                )
+                get_dataset_stats(self.local_path)
+                return None, count
+            elif store is not None:
+                # The store is closed by the generator, once exhausted
+                progress = functools.partial(_closing_generator, progress, store)
+                store = None
+            return progress, count
+        finally:
+            if store is not None:
+                store.close()
+
+    def _pull_annotations(
+        self,
+        release: Release,
+        subset_filter_annotations_function: Optional[Callable] = None,
+        subset_folder_name: Optional[str] = None,
+        store: Optional[ImageStore] = None,
+    ) -> Path:
+        """Downloads the annotations of a release and places them in the dataset folder.
+        See pull()
+
+        The release pulled is recorded in a manifest, so that the next pull only extracts the
+        annotations which changed since, reuses the others, and removes the images of the items
+        which were removed or changed image. The annotations folder is built aside and swapped
+        in once complete. Nothing is downloaded if the release is the one pulled already.
+
+        Returns
+        -------
+        Path
+            Folder containing the annotations
+        """
+        if subset_filter_annotations_function is not None and subset_folder_name is None:
+            subset_folder_name = datetime.now().strftime("%m/%d/%Y_%H:%M:%S")
+        subset_path = self.local_path / (subset_folder_name or "")
+        annotations_dir = subset_path / "annotations"
+        manifest_path = subset_path / MANIFEST_FILENAME
+        recover_swap(annotations_dir)
+        previous = ReleaseManifest.load(manifest_path) if annotations_dir.exists() else None
+        fingerprint = release_fingerprint(release)
+        if (
+            previous is not None
+            and previous.release == fingerprint
+            and subset_filter_annotations_function is None
+        ):
+            print(f"Annotations of {release.identifier} are up to date")
+            return annotations_dir
+
+        def reusable(name: str, crc: int, size: int) -> Optional[ManifestEntry]:
+            """Entry of an annotation already in the annotations folder, if it did not change"""
+            entry = previous.entries.get(name) if previous is not None else None
+            if entry is None or (entry.crc, entry.size) != (crc, size):
+                return None
+            return entry if (annotations_dir / entry.annotation).exists() else None
+
+        subset_path.mkdir(parents=True, exist_ok=True)
+        # Extracted next to the dataset so that the annotations are moved, not copied
+        with tempfile.TemporaryDirectory(dir=subset_path, prefix=".pull") as tmp_dir:
             tmp_dir = Path(tmp_dir)
             # Download the release from Darwin
-            zip_file_path = release.download_zip(tmp_dir / "dataset.zip")
+            zip_file_path = release.download_zip(
+                tmp_dir / "dataset.zip",
+                session=self.client.get_session("cdn"),
+                retry_policy=self.client.retry_policy,
+            )
             with zipfile.ZipFile(zip_file_path) as z:
-                # Extract annotations
-                z.extractall(tmp_dir)
-                # If a filtering function is provided, apply it
-                if subset_filter_annotations_function is not None:
+                if subset_filter_annotations_function is None:
+                    # The zip provides the CRC-32 of each file, only the changed ones are extracted
+                    files = {
+                        info.filename: (info.CRC, info.file_size)
+                        for info in z.infolist()
+                        if "/" not in info.filename and info.filename.endswith(".json")
+                    }
+                    for name, (crc, size) in files.items():
+                        if reusable(name, crc, size) is None:
+                            z.extract(name, tmp_dir)
+                else:
+                    # The filtering function works on the extracted annotations
+                    z.extractall(tmp_dir)
                     subset_filter_annotations_function(tmp_dir)
-                    if subset_folder_name is None:
-                        subset_folder_name = datetime.now().strftime("%m/%d/%Y_%H:%M:%S")
-                annotations_dir = self.local_path / (subset_folder_name or "") / "annotations"
-                # Remove existing annotations if necessary
-                if annotations_dir.exists():
+                    files = {}
+                    for annotation_path in tmp_dir.glob("*.json"):
+                        data = annotation_path.read_bytes()
+                        files[annotation_path.name] = (zlib.crc32(data), len(data))
+
+            # Build the new annotations folder: unchanged annotations are linked from the
+            # current one, the others are moved from the release
+            new_annotations_dir = annotations_dir.with_name(f".{annotations_dir.name}.new")
+            if new_annotations_dir.exists():
+                shutil.rmtree(new_annotations_dir)
+            new_annotations_dir.mkdir()
+            entries = {}
+            reused = 0
+            for name, (crc, size) in files.items():
+                entry = reusable(name, crc, size)
+                if entry is not None:
+                    destination = new_annotations_dir / entry.annotation
+                    try:
+                        os.link(annotations_dir / entry.annotation, destination)
+                    except OSError:
+                        shutil.copy2(annotations_dir / entry.annotation, destination)
+                    reused += 1
+                else:
+                    entry = read_entry(tmp_dir / name, crc, size)
+                    os.replace(tmp_dir / name, new_annotations_dir / entry.annotation)
+                entries[name] = entry
+            swap_directory(new_annotations_dir, annotations_dir)
+
+        manifest = ReleaseManifest(fingerprint, entries)
+        if previous is not None:
+            images_dir = subset_path / "images"
+            for image in previous.stale_images(manifest):
+                if store is not None:
+                    store.unlink(images_dir / image)
+                else:
                     try:
-                        shutil.rmtree(annotations_dir)
-                    except PermissionError:
-                        print(f"Could not remove dataset in {annotations_dir}. Permission denied.")
-                annotations_dir.mkdir(parents=True, exist_ok=False)
-                # Move the annotations into the right folder and rename them to have the image
-                # original filename as contained in the json
-                for annotation_path in tmp_dir.glob(f"*.json"):
-                    annotation = json.load(annotation_path.open())
-                    original_filename = Path(annotation["image"]["original_filename"])
-                    filename = Path(annotation["image"]["filename"]).stem
-                    destination_name = annotations_dir / (
-                        filename + "_" + original_filename.stem + annotation_path.suffix
-                    )
-                    shutil.move(str(annotation_path), str(destination_name))
+                        (images_dir / image).unlink()
+                    except FileNotFoundError:
+                        pass
+            removed = len(previous.entries.keys() - entries.keys())
+            print(
+                f"{len(entries) - reused} annotations added or changed, {reused} unchanged, "
+                f"{removed} removed"
+            )
+        manifest.save(manifest_path)
 
         # Extract the list of classes and create the text files
         make_class_lists(self.local_path)
 
-        if only_annotations:
-            # No images will be downloaded
-            return None, 0
+        return annotations_dir
+
+    async def push_async(
+        self,
+        files_to_upload: List[str],
+        fps: int = 1,
+        files_to_exclude: Optional[List[str]] = None,
+        max_concurrency: int = 1000,
+    ):
+        """asyncio counterpart of push(). Uploads a local dataset (images ONLY) with many
+        requests in flight at the same time. Requires aiohttp.
 
-        # Create the generator with the download instructions
-        images_dir = annotations_dir.parent / "images"
-        progress, count = download_all_images_from_annotations(
-            api_url=self.client.url,
-            annotations_path=annotations_dir,
-            images_path=images_dir,
-            force_replace=force_replace,
-            remove_extra=remove_extra,
+        Parameters
+        ----------
+        files_to_upload : list[Path]
+            List of files to upload. It can be a folder.
+        fps : int
+            Number of file per seconds to upload
+        files_to_exclude : list[str]
+            List of files to exclude from the file scan
+        max_concurrency : int
+            Maximum number of files being uploaded at the same time
+
+        Returns
+        -------
+        list[dict]
+            Responses of all the files, see add_files_to_dataset_async(). Files which failed
+            have no backend_response, and the exception which made them fail as their error
+        """
+        from darwin.async_client import AsyncClient
+
+        if files_to_upload is None:
+            raise NotFound("Dataset location not found. Check your path.")
+        files_to_upload = find_files(
+            files=files_to_upload, recursive=True, files_to_exclude=files_to_exclude or []
         )
-        if count == 0:
-            return None, count
+        if not files_to_upload:
+            raise ValueError("No files to upload, check your path and exclusion filters")
+
+        async with AsyncClient(self.client, max_concurrency=max_concurrency) as client:
+            return await add_files_to_dataset_async(
+                client=client,
+                dataset_id=str(self.dataset_id),
+                filenames=files_to_upload,
+                fps=fps,
+                team=self.team,
+                max_concurrency=max_concurrency,
+            )
 
-        # If blocking is selected, download the dataset on the file system
-        if blocking:
-            exhaust_generator(progress=progress(), count=count, multi_threaded=multi_threaded)
-            return None, count
-        else:
-            return progress, count
+    async def pull_async(
+        self,
+        *,
+        release: Optional[Release] = None,
+        only_annotations: bool = False,
+        force_replace: bool = False,
+        remove_extra: bool = True,
+        subset_filter_annotations_function: Optional[Callable] = None,
+        subset_folder_name: Optional[str] = None,
+        max_concurrency: int = 1000,
+    ) -> int:
+        """asyncio counterpart of pull(). The release and its annotations are fetched in a
+        background thread, then the images are downloaded with many requests in flight at the
+        same time. Requires aiohttp.
+
+        Parameters
+        ----------
+        max_concurrency : int
+            Maximum number of images being downloaded at the same time
+        See pull() for the other parameters
+
+        Returns
+        -------
+        count : int
+            The files count
+        """
+        import asyncio
+
+        from darwin.async_client import AsyncClient
+
+        loop = asyncio.get_running_loop()
+        if release is None:
+            release = await loop.run_in_executor(None, self.get_release)
+        # Images removed from a dataset linked to the image store are recorded in it, see pull()
+        store_path = self.local_path.parent / STORE_DIRNAME
+        store = ImageStore(store_path) if store_path.exists() else None
+        try:
+            annotations_dir = await loop.run_in_executor(
+                None,
+                self._pull_annotations,
+                release,
+                subset_filter_annotations_function,
+                subset_folder_name,
+                store,
+            )
+            if only_annotations:
+                return 0
+
+            async with AsyncClient(self.client, max_concurrency=max_concurrency) as client:
+                count = await download_all_images_from_annotations_async(
+                    client=client,
+                    annotations_path=annotations_dir,
+                    images_path=annotations_dir.parent / "images",
+                    force_replace=force_replace,
+                    remove_extra=remove_extra,
+                    max_concurrency=max_concurrency,
+                    store=store,
+                )
+        finally:
+            if store is not None:
+                store.close()
+        await loop.run_in_executor(None, get_dataset_stats, self.local_path)
+        return count
 
     def remove_remote(self):
         """Archives (soft-deletion) the remote dataset"""
-        self.client.put(f"datasets/{self.dataset_id}/archive", payload={}, team=self.team)
+        self.client.put(
+            f"datasets/{self.dataset_id}/archive", payload={}, team=self.team, retry=True
+        )
+        self.client.dataset_index.remove(self.team, self.slug)
 
     def export(self, name: str, annotation_class_ids: Optional[List[str]] = None):
         """Create a new release for the dataset
@@ -290,6 +647,25 @@ class RemoteDataset:
             raw=True,
         ).text
 
+    def iter_releases(self) -> Iterator[Release]:
+        """Lazily lists the available releases of this dataset, in the order of the server,
+        page by page
+
+        Returns
+        -------
+        Iterator[Release]
+            Available releases
+        """
+        try:
+            for payload in self.client.get_paginated(
+                f"/datasets/{self.dataset_id}/exports", team=self.team
+            ):
+                release = Release.parse_json(self.slug, self.team, payload)
+                if release.available:
+                    yield release
+        except NotFound:
+            return
+
     def get_releases(self):
         """Get a sorted list of releases with the most recent first
 
@@ -300,17 +676,10 @@ class RemoteDataset:
         Raises
         ------
         """
-        try:
-            releases_json = self.client.get(f"/datasets/{self.dataset_id}/exports", team=self.team)
-        except NotFound:
-            return []
-        releases = [Release.parse_json(self.slug, self.team, payload) for payload in releases_json]
-        return sorted(
-            filter(lambda x: x.available, releases), key=lambda x: x.version, reverse=True
-        )
+        return sorted(self.iter_releases(), key=lambda x: x.version, reverse=True)
 
     def get_release(self, name: str = "latest"):
-        """Get a specific release for this dataset
+        """Get a specific release for this dataset. Releases are listed until it is found
 
         Parameters
         ----------
@@ -327,15 +696,8 @@ class RemoteDataset:
         NotFound
             The selected release does not exists
         """
-        releases = self.get_releases()
-        if not releases:
-            raise NotFound(self.identifier)
-
-        if name == "latest":
-            return next((release for release in releases if release.latest))
-
-        for release in releases:
-            if str(release.name) == name:
+        for release in self.iter_releases():
+            if release.latest if name == "latest" else str(release.name) == name:
                 return release
         raise NotFound(self.identifier)
 
@@ -375,6 +737,7 @@ class RemoteDataset:
             split_seed=split_seed,
             make_default_split=make_default_split,
         )
+        get_dataset_stats(self.local_path)
 
     def classes(self, annotation_type: str):
         """
@@ -444,3 +807,26 @@ class RemoteDataset:
     @property
     def identifier(self) -> DatasetIdentifier:
         return DatasetIdentifier(team_slug=self.team, dataset_slug=self.slug)
+
+
+def _closing(progress: Iterator, journal: UploadJournal) -> Iterator:
+    """Support function to close a journal once the jobs recording in it have all been handed
+    out, or the generator is closed. Records of the jobs still running are then written one at
+    a time, see UploadJournal.close()"""
+    with journal:
+        yield from progress
+
+
+def _closing_generator(progress: Callable[[], Iterator], store: ImageStore) -> Iterator:
+    """Support function to close an image store once the jobs downloading into it have all been
+    handed out, or the generator is closed. References logged by the jobs still running reopen
+    its log"""
+    try:
+        yield from progress()
+    finally:
+        store.close()
+
+
+def _is_confirmed(backend_response) -> bool:
+    """Support function to check that the server confirmed the upload of a file"""
+    return isinstance(backend_response, dict) and "errors" not in backend_response
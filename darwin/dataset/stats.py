@@ -0,0 +1,120 @@
+import json
+import os
+import threading
+from concurrent.futures import FIRST_COMPLETED, wait
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from darwin.executor import get_executor
+from darwin.utils import is_extension_allowed
+
+# Name of the manifest holding the statistics of a local dataset, next to its folder. It is not
+# stored inside, as writing it would change the modification time of the folder
+STATS_FILENAME = ".{}.stats.json"
+
+
+def get_dataset_stats(
+    dataset_path: Path, refresh: bool = False, max_workers: Optional[int] = None
+) -> Tuple[int, int]:
+    """Computes the number of images of a local dataset and their total size.
+
+    The statistics of every folder of the dataset are kept in a manifest, along with the
+    modification time of the folder. Only the folders whose modification time changed since,
+    i.e. where files were added, removed or renamed, are scanned again, in parallel.
+    The manifest is updated accordingly.
+
+    Parameters
+    ----------
+    dataset_path : Path
+        Folder of the dataset
+    refresh : bool
+        Ignores the manifest and scans all the folders of the dataset again
+    max_workers : int
+        Number of folders scanned at the same time
+
+    Returns
+    -------
+    images, size : int, int
+        Number of images and their total size in bytes
+    """
+    manifest_path = dataset_path.parent / STATS_FILENAME.format(dataset_path.name)
+    folders = {} if refresh else _load_manifest(manifest_path)
+
+    stale = []
+    if not folders:
+        stale.append(dataset_path)
+    for name, (mtime, _, _) in list(folders.items()):
+        try:
+            if (dataset_path / name).stat().st_mtime_ns != mtime:
+                stale.append(dataset_path / name)
+        except FileNotFoundError:
+            del folders[name]
+
+    if stale:
+        with get_executor("thread", max_workers=max_workers) as executor:
+            pending = {executor.submit(_scan_folder, folder) for folder in stale}
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    folder, mtime, images, size, subfolders = future.result()
+                    folders[str(folder.relative_to(dataset_path))] = [mtime, images, size]
+                    for subfolder in subfolders:
+                        if str(subfolder.relative_to(dataset_path)) not in folders:
+                            pending.add(executor.submit(_scan_folder, subfolder))
+        _save_manifest(manifest_path, folders)
+
+    return (
+        sum(images for _, images, _ in folders.values()),
+        sum(size for _, _, size in folders.values()),
+    )
+
+
+def _scan_folder(folder: Path) -> Tuple[Path, int, int, int, List[Path]]:
+    """Support function to count the images of a folder (not recursively) and sum their size
+
+    Returns
+    -------
+    folder, mtime, images, size, subfolders : Path, int, int, int, list[Path]
+        The folder, its modification time in nanoseconds (taken before the scan, so that changes
+        made during it are caught by the next one), number of images, their total size in bytes
+        and the subfolders found
+    """
+    images = 0
+    size = 0
+    subfolders = []
+    try:
+        mtime = folder.stat().st_mtime_ns
+        with os.scandir(folder) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        subfolders.append(Path(entry.path))
+                    elif is_extension_allowed(os.path.splitext(entry.name)[1]):
+                        size += entry.stat().st_size
+                        images += 1
+                except OSError:
+                    continue
+    except FileNotFoundError:
+        # Removed while being scanned, it is dropped from the manifest by the next scan
+        return folder, 0, 0, 0, []
+    return folder, mtime, images, size, subfolders
+
+
+def _load_manifest(manifest_path: Path) -> Dict[str, List[int]]:
+    """Support function to read the statistics of each folder from the manifest, if any"""
+    try:
+        with manifest_path.open() as f:
+            return json.load(f)["folders"]
+    except (OSError, ValueError, KeyError, TypeError):
+        return {}
+
+
+def _save_manifest(manifest_path: Path, folders: Dict[str, List[int]]):
+    """Support function to write the manifest atomically. Each writer has its own temporary
+    file, the last one to replace the manifest wins"""
+    tmp_path = manifest_path.with_name(
+        f"{manifest_path.name}.{os.getpid()}.{threading.get_ident()}.tmp"
+    )
+    with tmp_path.open("w") as f:
+        json.dump({"folders": folders}, f)
+    os.replace(tmp_path, manifest_path)
@@ -0,0 +1,166 @@
+import mmap
+import uuid
+from pathlib import Path
+from typing import Dict, Optional, Union
+
+# Size of the blocks read from disk and handed to the socket
+CHUNK_SIZE = 1024 * 1024
+
+
+class FileSlice:
+    def __init__(
+        self,
+        file_path: Path,
+        start: int = 0,
+        length: Optional[int] = None,
+        chunk_size: int = CHUNK_SIZE,
+    ):
+        """Read-only, file-like view over a range of bytes of a file, used as a streaming request
+        body. The file is memory mapped and handed out as memoryviews over the mapping, so the
+        bytes go from the page cache to the socket without being copied in between. Memory usage
+        is bounded regardless of the size of the file.
+
+        Parameters
+        ----------
+        file_path : Path
+            File to read
+        start : int
+            Offset of the first byte of the range
+        length : int
+            Number of bytes in the range. Defaults to the rest of the file
+        chunk_size : int
+            Maximum number of bytes returned by each read
+        """
+        self.file_path = file_path
+        self.start = start
+        size = file_path.stat().st_size
+        self.length = size - start if length is None else min(length, size - start)
+        self.chunk_size = chunk_size
+        self._position = 0
+        self._file = None
+        self._mmap = None
+
+    def _open(self):
+        if self._file is None:
+            self._file = self.file_path.open("rb")
+            # Empty files can not be mapped
+            if self.length > 0:
+                self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def read(self, size: int = -1) -> Union[bytes, memoryview]:
+        remaining = self.length - self._position
+        if remaining <= 0:
+            return b""
+        self._open()
+        if size is None or size < 0 or size > self.chunk_size:
+            size = self.chunk_size
+        size = min(size, remaining)
+        offset = self.start + self._position
+        self._position += size
+        return memoryview(self._mmap)[offset : offset + size]
+
+    def __iter__(self):
+        while True:
+            chunk = self.read()
+            if not chunk:
+                return
+            yield chunk
+
+    def __len__(self) -> int:
+        return self.length
+
+    def close(self):
+        if self._mmap is not None:
+            try:
+                self._mmap.close()
+            except BufferError:
+                # Views handed out are still referenced, the mapping is released with them
+                pass
+            self._mmap = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class MultipartFileBody:
+    def __init__(
+        self,
+        fields: Dict[str, str],
+        file_path: Path,
+        file_field: str = "file",
+        chunk_size: int = CHUNK_SIZE,
+    ):
+        """Streaming multipart/form-data request body made of some form fields followed by the
+        content of a file, as expected by S3 presigned POST uploads. Only the small headers of
+        the parts are held in memory, the file is streamed from disk (see FileSlice).
+        Its length is known upfront, so it is sent with a Content-Length and not chunked.
+
+        Parameters
+        ----------
+        fields : dict
+            Form fields sent before the file
+        file_path : Path
+            File to send
+        file_field : str
+            Name of the form field of the file
+        chunk_size : int
+            Maximum number of bytes returned by each read
+        """
+        boundary = uuid.uuid4().hex
+        self.content_type = f"multipart/form-data; boundary={boundary}"
+        preamble = b""
+        for name, value in fields.items():
+            preamble += (
+                f"--{boundary}\r\n"
+                f'Content-Disposition: form-data; name="{name}"\r\n\r\n'
+                f"{value}\r\n"
+            ).encode()
+        preamble += (
+            f"--{boundary}\r\n"
+            f'Content-Disposition: form-data; name="{file_field}"; filename="{file_path.name}"\r\n'
+            f"Content-Type: application/octet-stream\r\n\r\n"
+        ).encode()
+        self._parts = [preamble, FileSlice(file_path, chunk_size=chunk_size)]
+        self._parts.append(f"\r\n--{boundary}--\r\n".encode())
+        self._current = 0
+        self._offset = 0
+
+    def read(self, size: int = -1) -> Union[bytes, memoryview]:
+        while self._current < len(self._parts):
+            part = self._parts[self._current]
+            if isinstance(part, FileSlice):
+                chunk = part.read(size)
+            else:
+                end = len(part) if size is None or size < 0 else self._offset + size
+                chunk = part[self._offset : end]
+                self._offset += len(chunk)
+            if chunk:
+                return chunk
+            self._current += 1
+            self._offset = 0
+        return b""
+
+    def __iter__(self):
+        while True:
+            chunk = self.read(CHUNK_SIZE)
+            if not chunk:
+                return
+            yield chunk
+
+    def __len__(self) -> int:
+        return sum(len(part) for part in self._parts)
+
+    def close(self):
+        self._parts[1].close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
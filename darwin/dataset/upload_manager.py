@@ -1,88 +1,282 @@
 import csv
 import functools
-import itertools
 import json
+import queue
 import re
+import threading
+from collections import defaultdict
 from pathlib import Path
-from typing import TYPE_CHECKING, Any, Dict, List, Optional
-
-import requests
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    Generator,
+    Iterable,
+    List,
+    Optional,
+    Sized,
+)
 
+from darwin.dataset.journal import CONFIRMED, REGISTERED, SIGNED, UPLOADED, UploadJournal
+from darwin.dataset.streaming import FileSlice, MultipartFileBody
 from darwin.dataset.utils import exhaust_generator
-from darwin.exceptions import UnsupportedFileType
+from darwin.exceptions import MultipartUploadNotAborted, NotFound, UnsupportedFileType
+from darwin.executor import get_executor
 from darwin.utils import is_image_extension_allowed, is_video_extension_allowed
+from darwin.validators import not_found
 
 if TYPE_CHECKING:
-    from darwin.client import Client
+    import asyncio
 
-if TYPE_CHECKING:
+    import requests
+
+    from darwin.async_client import AsyncClient
     from darwin.client import Client
 
+# Videos of at least this many bytes are uploaded to S3 in several parts sent in parallel
+MULTIPART_THRESHOLD = 64 * 1024 * 1024
+# Size in bytes of each part of a multipart upload
+MULTIPART_PART_SIZE = 16 * 1024 * 1024
+# Number of parts of a file uploaded at the same time
+MULTIPART_CONCURRENCY = 4
+# Number of chunks of files registered at the same time by add_files_to_dataset_async()
+MAX_REGISTRATIONS_IN_FLIGHT = 4
+
 
 def add_files_to_dataset(
-    client: "Client", dataset_id: str, filenames: List[Path], team: str, fps: Optional[int] = 1
+    client: "Client",
+    dataset_id: str,
+    filenames: Iterable[Path],
+    team: str,
+    fps: Optional[int] = 1,
+    max_queued_chunks: int = 4,
+    batch_size: Optional[int] = None,
+    journal: Optional[UploadJournal] = None,
 ):
     """Helper function: upload images to an existing remote dataset
 
+    The upload is a pipeline: the files are registered on the server chunk by chunk in a
+    background thread, while the jobs uploading the files of the chunks already registered are
+    handed out by the generator returned. At most max_queued_chunks registered chunks wait to be
+    consumed, so registration runs ahead of the uploads without outpacing them.
+
     Parameters
     ----------
     client : Client
         The client to use to communicate with the server
     dataset_id : str
         ID of the dataset to add the files to
-    filenames : list[Path]
-        List of filenames to upload
+    filenames : Iterable[Path]
+        Filenames to upload. Can be a generator, in which case it is consumed while uploading
+    team : str
+        Team against which the client will make the requests
     fps : int
         Frame rate to split videos in.
+    max_queued_chunks : int
+        Number of registered chunks of files waiting to be uploaded
+    batch_size : int
+        If provided, each job uploads a batch of files, signing and confirming all of them with
+        a single request each. See _delayed_upload_batch_function()
+    journal : UploadJournal
+        If provided, the state of each file is recorded in it as it is registered, signed,
+        uploaded and confirmed
+
     Returns
     -------
-
+    generator : Generator
+        Generator of the jobs uploading each file, see _delayed_upload_function(),
+        or each batch of files if batch_size is provided
+    count : int
+        The files count, None if filenames is a generator
     """
-    if not filenames:
-        raise ValueError(f"Invalid list of file names ({filenames}")
+    if isinstance(filenames, Sized):
+        if not filenames:
+            raise ValueError(f"Invalid list of file names ({filenames}")
+        count = len(filenames)
+    else:
+        count = None
 
-    generators = []
-    for filenames_chunk in _chunk_filenames(filenames, 100):
-        images, videos = _split_on_file_type(filenames_chunk)
-        data = client.put(
-            endpoint=f"/datasets/{dataset_id}/data",
-            payload={
-                "image_filenames": [image.name for image in images],
-                "videos": [{"fps": fps, "original_filename": video.name} for video in videos],
-            },
-            team=team,
+    chunks = (
+        functools.partial(
+            _register_chunk, client, dataset_id, filenames_chunk, team, fps, batch_size, journal
         )
-        if "errors" in data:
-            raise ValueError(f"There are errors in the put request: {data['errors']['detail']}")
-        if images:
-            g = lambda images: (
+        for filenames_chunk in _chunk_filenames(filenames, 100)
+    )
+    return _prefetch(chunks, max_queued_chunks), count
+
+
+def _register_chunk(
+    client: "Client",
+    dataset_id: str,
+    filenames_chunk: List[Path],
+    team: str,
+    fps: Optional[int],
+    batch_size: Optional[int] = None,
+    journal: Optional[UploadJournal] = None,
+) -> List[functools.partial]:
+    """Registers a chunk of files on the dataset
+
+    Returns
+    -------
+    list[functools.partial]
+        Jobs uploading each file of the chunk, see _delayed_upload_function(),
+        or each batch of batch_size files, see _delayed_upload_batch_function()
+    """
+    images, videos = _split_on_file_type(filenames_chunk)
+    data = client.put(
+        endpoint=f"/datasets/{dataset_id}/data",
+        payload={
+            "image_filenames": [image.name for image in images],
+            "videos": [{"fps": fps, "original_filename": video.name} for video in videos],
+        },
+        team=team,
+        # Registering the files again would add them twice to the dataset
+        retry=False,
+    )
+    if "errors" in data:
+        raise ValueError(f"There are errors in the put request: {data['errors']['detail']}")
+
+    jobs = []
+    for files, files_path, endpoint_prefix in [
+        (data.get("image_data", []), images, "dataset_images"),
+        (data.get("video_data", []), videos, "dataset_videos"),
+    ]:
+        paths = _resolve_paths(files, files_path)
+        for file, file_path in zip(files, paths):
+            _record(
+                journal,
+                file_path,
+                REGISTERED,
+                id=file["id"],
+                key=file["key"],
+                endpoint_prefix=endpoint_prefix,
+            )
+        if batch_size:
+            for i in range(0, len(files), batch_size):
+                jobs.append(
+                    functools.partial(
+                        _delayed_upload_batch_function,
+                        client=client,
+                        files=files[i : i + batch_size],
+                        files_path=paths[i : i + batch_size],
+                        endpoint_prefix=endpoint_prefix,
+                        team=team,
+                        journal=journal,
+                    )
+                )
+            continue
+        for file, file_path in zip(files, paths):
+            jobs.append(
                 functools.partial(
                     _delayed_upload_function,
                     client=client,
-                    file=image_file,
-                    files_path=images,
-                    endpoint_prefix="dataset_images",
+                    file=file,
+                    file_path=file_path,
+                    endpoint_prefix=endpoint_prefix,
                     team=team,
+                    journal=journal,
                 )
-                for image_file in data["image_data"]
             )
-            generators.append(g(images))
+    return jobs
 
-        if videos:
-            g = lambda videos: (
-                functools.partial(
-                    _delayed_upload_function,
-                    client=client,
-                    file=video_file,
-                    files_path=videos,
-                    endpoint_prefix="dataset_videos",
-                )
-                for video_file in data["video_data"]
-            )
-            generators.append(g(videos))
 
-    assert generators
-    return itertools.chain(*generators), len(filenames)
+def resume_uploads(
+    client: "Client", entries: Iterable[Dict[str, Any]], team: str, journal: UploadJournal
+) -> List[functools.partial]:
+    """Creates the jobs finishing the uploads interrupted after the registration of the files,
+    from their latest state in a journal. Files are not registered again, files already on S3
+    are only confirmed and files already confirmed are skipped.
+
+    Parameters
+    ----------
+    client: Client
+        Client to use to authenticate the uploads
+    entries: Iterable[dict]
+        Latest state of each file, see replay_journal()
+    team: str
+        Team against which the client will make the requests
+    journal: UploadJournal
+        Journal to keep recording the state of the files in
+
+    Returns
+    -------
+    list[functools.partial]
+        Jobs uploading each file, see _delayed_upload_function()
+    """
+    return [
+        functools.partial(
+            _delayed_upload_function,
+            client=client,
+            file={"id": entry["id"], "key": entry["key"]},
+            file_path=Path(entry["file_path"]),
+            endpoint_prefix=entry["endpoint_prefix"],
+            team=team,
+            journal=journal,
+            uploaded=entry["state"] == UPLOADED,
+        )
+        for entry in entries
+        if entry["state"] in [REGISTERED, SIGNED, UPLOADED]
+    ]
+
+
+def _record(journal: Optional[UploadJournal], file_path: Path, state: str, **fields):
+    """Support function to record the state of a file in the journal, if any"""
+    if journal is not None:
+        journal.record(file_path, state, **fields)
+
+
+def _prefetch(stages: Iterable[Callable[[], List]], max_queued: int) -> Generator:
+    """Runs each stage in a background thread, ahead of the consumer, and yields the elements
+    of the lists they return. At most max_queued results wait in the queue; the thread stops as
+    soon as the generator is closed. Exceptions are re-raised in the consumer.
+
+    Parameters
+    ----------
+    stages : Iterable[Callable]
+        Functions returning a list of elements to yield
+    max_queued : int
+        Maximum number of results computed and not consumed yet
+
+    Returns
+    -------
+    Generator
+        Generator over the elements of the results of all stages, in order
+    """
+    results = queue.Queue(maxsize=max_queued)
+    done = object()
+    stopped = threading.Event()
+
+    def put(item):
+        while not stopped.is_set():
+            try:
+                results.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def produce():
+        try:
+            for stage in stages:
+                if not put(stage()):
+                    return
+        except Exception as e:
+            put(e)
+        put(done)
+
+    thread = threading.Thread(target=produce, daemon=True)
+    thread.start()
+    try:
+        while True:
+            item = results.get()
+            if item is done:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield from item
+    finally:
+        stopped.set()
 
 
 def _split_on_file_type(files: List[Path]):
@@ -111,15 +305,19 @@ def _split_on_file_type(files: List[Path]):
     return images, videos
 
 
-def _chunk_filenames(files: List[Path], size: int):
+def _chunk_filenames(files: Iterable[Path], size: int):
     """ Chunks paths in batches of size.
     No batch has any duplicates with regards to file name.
     This is needed due to a limitation in the upload api.
 
+    The n-th file sharing a given name goes in the n-th round of chunks, hence each round
+    holds each name at most once. Files are processed once, in linear time, and the chunks of
+    the first round are emitted as soon as they are full.
+
     Parameters
     ----------
-    files : list[Path]
-        List of files to chunk
+    files : Iterable[Path]
+        Files to chunk
     size : int
         Chunk size
 
@@ -127,48 +325,58 @@ def _chunk_filenames(files: List[Path], size: int):
     -------
         Chunk of the list with the next `size` elements from `files`
     """
-    current_list = []
-    current_names = set()
-    left_over = []
+    occurrences = defaultdict(int)
+    rounds = []
     for file in files:
-        if file.name in current_names:
-            left_over.append(file)
-        else:
-            current_list.append(file)
-            current_names.add(file.name)
-        if len(current_list) >= size:
-            yield current_list
-            current_list = []
-            current_names = set()
-    if left_over:
-        yield from _chunk_filenames(left_over, size)
-    if current_list:
-        yield current_list
+        n = occurrences[file.name]
+        occurrences[file.name] += 1
+        if n == len(rounds):
+            rounds.append([])
+        rounds[n].append(file)
+        if len(rounds[n]) >= size:
+            yield rounds[n]
+            rounds[n] = []
+    for chunk in rounds:
+        if chunk:
+            yield chunk
 
 
-def _resolve_path(file_name: str, files_path: List[Path]):
-    """Support function to resolve the path of a file given its basename and the list of paths
+def _resolve_paths(files: List[Dict[str, Any]], files_path: List[Path]) -> List[Path]:
+    """Support function to resolve the path of the files returned by the server given their
+    basename and the list of paths. Names are unique within a chunk, hence looked up in an index.
 
     Parameters
     ----------
-    file_name: str
-        The file name of the file
+    files: list[dict]
+        The files as a response from the client.put() operation
     files_path: list[Path]
         List of paths of the chunk of files being handled
 
     Returns
     -------
-    Path
-        path to the file
+    list[Path]
+        path to each file
     """
-    for p in files_path:
-        if p.name == file_name:
-            return p
-    raise ValueError(f"File name ({file_name}) not found in the list provided")
+    paths = {path.name: path for path in files_path}
+    resolved = []
+    for file in files:
+        try:
+            resolved.append(paths[file["original_filename"]])
+        except KeyError:
+            raise ValueError(
+                f"File name ({file['original_filename']}) not found in the list provided"
+            )
+    return resolved
 
 
 def _delayed_upload_function(
-    client: "Client", file: Dict[str, Any], files_path: List[Path], endpoint_prefix: str, team: str
+    client: "Client",
+    file: Dict[str, Any],
+    file_path: Path,
+    endpoint_prefix: str,
+    team: str,
+    journal: Optional[UploadJournal] = None,
+    uploaded: bool = False,
 ):
     """
     This is a wrapper function which will be executed only once the generator is
@@ -181,33 +389,61 @@ def _delayed_upload_function(
         Client to use to authenticate the upload
     file: dict
         The file as a response from the client.put() operation
-    files_path: list[Path]
-        List of paths of the chunk of files being handled
+    file_path: Path
+        Path to the file on the file system
     endpoint_prefix: str
         String to prepend to the endpoint. It varies from images to videos.
+    journal: UploadJournal
+        Journal to record the state of the file in
+    uploaded: bool
+        The file is already on S3 and only needs to be confirmed
 
     Returns
     -------
     dict
-        Dictionary which contains the server response from client.put
+        Dictionary which contains the server response from client.put. Files whose multipart
+        upload failed and could not be aborted are not confirmed, and have the
+        MultipartUploadNotAborted raised as their error
     """
-    file_path = _resolve_path(file["original_filename"], files_path)
-    s3_response = upload_file_to_s3(client, file, file_path, team)
     image_id = file["id"]
+    if uploaded:
+        s3_status_code = 200
+    else:
+        try:
+            s3_status_code = upload_file_to_s3(client, file, file_path, team, journal).status_code
+        except MultipartUploadNotAborted as e:
+            return {
+                "file_path": file_path,
+                "image_id": image_id,
+                "s3_response_status_code": e.status_code,
+                "backend_response": None,
+                "error": e,
+            }
+        if 200 <= s3_status_code < 300:
+            _record(journal, file_path, UPLOADED)
     backend_response = client.put(
-        endpoint=f"/{endpoint_prefix}/{image_id}/confirm_upload", payload={}, team=team
+        endpoint=f"/{endpoint_prefix}/{image_id}/confirm_upload",
+        payload={},
+        team=team,
+        retry=True,
     )
+    if 200 <= s3_status_code < 300 and "errors" not in backend_response:
+        _record(journal, file_path, CONFIRMED)
     return {
         "file_path": file_path,
         "image_id": image_id,
-        "s3_response_status_code": s3_response.status_code,
+        "s3_response_status_code": s3_status_code,
         "backend_response": backend_response,  # This should be the dataset_id
     }
 
 
 def upload_file_to_s3(
-    client: "Client", file: Dict[str, Any], file_path: Path, team: str
-) -> requests.Response:
+    client: "Client",
+    file: Dict[str, Any],
+    file_path: Path,
+    team: str,
+    journal: Optional[UploadJournal] = None,
+) -> "requests.Response":
     """Helper function: upload data to AWS S3
 
     Parameters
@@ -218,6 +454,8 @@ def upload_file_to_s3(
         The file as a response from the client.put() operation
     file_path: Path
         Path to the file to upload on the file system
+    journal: UploadJournal
+        Journal to record the signature of the file in
 
     Returns
     -------
@@ -226,10 +464,405 @@ def upload_file_to_s3(
     """
     key = file["key"]
     image_id = file["id"]
+    if (
+        is_video_extension_allowed(file_path.suffix)
+        and file_path.stat().st_size >= MULTIPART_THRESHOLD
+        and MULTIPART_UPLOAD_ENDPOINTS not in client.unsupported_endpoints
+    ):
+        try:
+            return upload_file_to_s3_multipart(
+                client, image_id, key, file_path, team, journal=journal
+            )
+        except NotFound:
+            client.unsupported_endpoints.add(MULTIPART_UPLOAD_ENDPOINTS)
     response = sign_upload(client, image_id, key, file_path, team)
-    signature = response["signature"]
-    end_point = response["postEndpoint"]
-    return requests.post("http:" + end_point, data=signature, files={"file": file_path.open("rb")})
+    _record(journal, file_path, SIGNED)
+    return _post_to_s3(client, response, file_path)
+
+
+def _post_to_s3(client: "Client", sign_response: Dict[str, Any], file_path: Path):
+    """Support function to upload a file to S3 with the signature obtained from sign_upload().
+    The body is streamed from disk, see MultipartFileBody
+
+    Returns
+    -------
+    requests.Response
+        s3 response
+    """
+    signature = sign_response["signature"]
+    end_point = sign_response["postEndpoint"]
+
+    def send():
+        with MultipartFileBody(signature, file_path) as body:
+            return client.get_session("s3").post(
+                _s3_url(end_point), data=body, headers={"Content-Type": body.content_type}
+            )
+
+    return client.retry_policy.run(send)
+
+
+# Name under which the lack of the multipart sign_upload endpoint is recorded in
+# Client.unsupported_endpoints
+MULTIPART_UPLOAD_ENDPOINTS = "multipart_upload"
+
+
+def upload_file_to_s3_multipart(
+    client: "Client",
+    image_id: int,
+    key: str,
+    file_path: Path,
+    team: str,
+    part_size: int = MULTIPART_PART_SIZE,
+    max_workers: int = MULTIPART_CONCURRENCY,
+    journal: Optional[UploadJournal] = None,
+) -> "requests.Response":
+    """Uploads a large file to S3 as a multipart upload: the file is split in parts of
+    part_size bytes which are streamed from disk and sent in parallel, each one retried on its
+    own, then the upload is completed with the ETag of every part. The upload is aborted if it
+    fails once initiated, so that S3 does not keep the parts received
+
+    Parameters
+    ----------
+    client: Client
+        Client to use to authenticate the upload
+    image_id: int
+        Id of the file to upload
+    key: str
+        Path in the s3 bucket
+    file_path: Path
+        Path to the file to upload on the file system
+    team: str
+        Team against which the client will make the requests
+    part_size: int
+        Size in bytes of each part, but the last one
+    max_workers: int
+        Number of parts uploaded at the same time
+    journal: UploadJournal
+        Journal to record the signature of the file in
+
+    Returns
+    -------
+    requests.Response
+        s3 response of the completion of the upload, or of the first part which failed. A
+        completion which failed despite a 200 status has its status set to 500
+
+    Raises
+    ------
+    NotFound
+        The server does not support multipart uploads
+    MultipartUploadNotAborted
+        The upload failed and could not be aborted, S3 keeps the parts received
+    """
+    size = file_path.stat().st_size
+    parts = max(1, -(-size // part_size))
+    response = sign_multipart_upload(client, image_id, key, file_path, team, parts)
+    _record(journal, file_path, SIGNED)
+    part_urls = response["partUrls"]
+    if len(part_urls) != parts:
+        raise ValueError(f"Expected {parts} signed parts, got {len(part_urls)}")
+
+    session = client.get_session("s3")
+
+    def put_part(part_number: int) -> "requests.Response":
+        start = (part_number - 1) * part_size
+
+        def send():
+            with FileSlice(file_path, start, part_size) as body:
+                return session.put(_s3_url(part_urls[part_number - 1]), data=body)
+
+        return client.retry_policy.run(send)
+
+    def abort(status_code: Optional[int] = None):
+        if "abortUrl" not in response:
+            return
+        try:
+            abort_response = client.retry_policy.run(
+                lambda: session.delete(_s3_url(response["abortUrl"]))
+            )
+        except Exception as e:
+            raise MultipartUploadNotAborted(file_path, status_code) from e
+        if not 200 <= abort_response.status_code < 300:
+            raise MultipartUploadNotAborted(file_path, status_code)
+
+    try:
+        with get_executor("thread", max_workers=max_workers) as executor:
+            part_responses = list(executor.map(put_part, range(1, parts + 1)))
+
+        for part_response in part_responses:
+            if not 200 <= part_response.status_code < 300:
+                abort(part_response.status_code)
+                return part_response
+
+        completion = "<CompleteMultipartUpload>"
+        for part_number, part_response in enumerate(part_responses, start=1):
+            etag = part_response.headers["ETag"]
+            completion += f"<Part><PartNumber>{part_number}</PartNumber><ETag>{etag}</ETag></Part>"
+        completion += "</CompleteMultipartUpload>"
+        completion_response = client.retry_policy.run(
+            lambda: session.post(_s3_url(response["completeUrl"]), data=completion.encode())
+        )
+        if 200 <= completion_response.status_code < 300 and _is_s3_error(
+            completion_response.content
+        ):
+            # S3 reports the failures happening while it assembles the parts in the body of a
+            # 200 response, sent before it starts
+            completion_response.status_code = 500
+        if not 200 <= completion_response.status_code < 300:
+            abort(completion_response.status_code)
+        return completion_response
+    except MultipartUploadNotAborted:
+        raise
+    except Exception:
+        # An abort which fails is raised chained to the exception which led to it
+        abort()
+        raise
+
+
+def _is_s3_error(body: bytes) -> bool:
+    """Support function to check whether the body of a S3 response is an `<Error>` document"""
+    import xml.etree.ElementTree as ElementTree
+
+    try:
+        return ElementTree.fromstring(body).tag.rsplit("}", 1)[-1] == "Error"
+    except ElementTree.ParseError:
+        return False
+
+
+def sign_multipart_upload(
+    client: "Client", image_id: int, key: str, file_path: Path, team: str, parts: int
+) -> Dict[str, Any]:
+    """Obtains from the back the signed URLs of every part of a multipart upload
+
+    Parameters
+    ----------
+    client: Client
+        Client authenticated to the team where the request will be made
+    image_id: int
+        Id of the video to upload
+    key: str
+        Path in the s3 bucket
+    file_path: Path
+        Path to the file to upload on the file system
+    team: str
+        Team against which the client will make the requests
+    parts: int
+        Number of parts the file is split in
+
+    Returns
+    -------
+    dict
+        Dictionary which contains the signed URL of each part (`partUrls`), of the completion
+        of the upload (`completeUrl`) and optionally of its cancellation (`abortUrl`)
+
+    Raises
+    ------
+    NotFound
+        The server does not support multipart uploads
+    """
+    return client.post(
+        endpoint=f"/dataset_videos/{image_id}/sign_multipart_upload?key={key}",
+        payload={
+            "filePath": str(file_path),
+            "contentType": f"video/{file_path.suffix}",
+            "parts": parts,
+        },
+        team=team,
+        retry=True,
+        error_handlers=[not_found],
+    )
+
+
+def _s3_url(end_point: str) -> str:
+    """Support function to turn the protocol relative URLs signed by the server into URLs"""
+    return "http:" + end_point if end_point.startswith("//") else end_point
+
+
+def _delayed_upload_batch_function(
+    client: "Client",
+    files: List[Dict[str, Any]],
+    files_path: List[Path],
+    endpoint_prefix: str,
+    team: str,
+    journal: Optional[UploadJournal] = None,
+):
+    """Batched counterpart of _delayed_upload_function(). All the files are signed with a
+    single request, uploaded to S3 one after the other, then confirmed with a single request.
+
+    Parameters
+    ----------
+    client: Client
+        Client to use to authenticate the upload
+    files: list[dict]
+        The files as a response from the client.put() operation
+    files_path: list[Path]
+        Path to each file on the file system
+    endpoint_prefix: str
+        String to prepend to the endpoint. It varies from images to videos.
+    team: str
+        Team against which the client will make the requests
+    journal: UploadJournal
+        Journal to record the state of the files in
+
+    Returns
+    -------
+    list[dict]
+        One dictionary per file, see _delayed_upload_function().
+        Files which failed to be signed or uploaded are not confirmed and have no
+        backend_response, files not signed have no s3_response_status_code either
+    """
+    files_path = {file["id"]: file_path for file, file_path in zip(files, files_path)}
+    sign_responses = sign_uploads(client, files, files_path, endpoint_prefix, team)
+    s3_responses = {}
+    for file in files:
+        sign_response = sign_responses[file["id"]]
+        if not isinstance(sign_response, dict) or "signature" not in sign_response:
+            # Not signed, the file is reported as failed
+            continue
+        _record(journal, files_path[file["id"]], SIGNED)
+        s3_responses[file["id"]] = _post_to_s3(client, sign_response, files_path[file["id"]])
+    uploaded_ids = [
+        image_id for image_id, response in s3_responses.items() if 200 <= response.status_code < 300
+    ]
+    for image_id in uploaded_ids:
+        _record(journal, files_path[image_id], UPLOADED)
+    backend_responses = confirm_uploads(client, uploaded_ids, endpoint_prefix, team)
+    for image_id in uploaded_ids:
+        if "errors" not in backend_responses[image_id]:
+            _record(journal, files_path[image_id], CONFIRMED)
+    return [
+        {
+            "file_path": files_path[file["id"]],
+            "image_id": file["id"],
+            "s3_response_status_code": (
+                s3_responses[file["id"]].status_code if file["id"] in s3_responses else None
+            ),
+            "backend_response": backend_responses.get(file["id"]),
+        }
+        for file in files
+    ]
+
+
+# Name under which the lack of the batch sign_upload and confirm_upload endpoints is recorded in
+# Client.unsupported_endpoints
+BATCH_UPLOAD_ENDPOINTS = "batch_upload"
+
+
+def sign_uploads(
+    client: "Client",
+    files: List[Dict[str, Any]],
+    files_path: Dict[int, Path],
+    endpoint_prefix: str,
+    team: str,
+) -> Dict[int, Dict]:
+    """Obtains the signed URLs of several files with a single request. Falls back to one
+    sign_upload() request per file if the server does not support batching, and for the files
+    the batch request did not sign.
+
+    Parameters
+    ----------
+    client: Client
+        Client authenticated to the team where the request will be made
+    files: list[dict]
+        The files as a response from the client.put() operation
+    files_path: dict
+        Path of each file to upload on the file system, by id
+    endpoint_prefix: str
+        String to prepend to the endpoint. It varies from images to videos.
+    team: str
+        Team against which the client will make the requests
+
+    Returns
+    -------
+    dict
+        Server response of each file, by id. See sign_upload()
+    """
+    signatures = {}
+    if BATCH_UPLOAD_ENDPOINTS not in client.unsupported_endpoints:
+        payload = {"files": []}
+        for file in files:
+            _, file_payload = _sign_upload_request(file["id"], file["key"], files_path[file["id"]])
+            payload["files"].append({"id": file["id"], "key": file["key"], **file_payload})
+        try:
+            response = client.post(
+                endpoint=f"/{endpoint_prefix}/sign_upload",
+                payload=payload,
+                team=team,
+                retry=True,
+                error_handlers=[not_found],
+            )
+            # On failure the response is a single error for the whole batch
+            if isinstance(response, list):
+                signatures = {
+                    signature["id"]: signature
+                    for signature in response
+                    if isinstance(signature, dict) and "id" in signature
+                }
+        except NotFound:
+            client.unsupported_endpoints.add(BATCH_UPLOAD_ENDPOINTS)
+    for file in files:
+        if file["id"] not in signatures:
+            signatures[file["id"]] = sign_upload(
+                client, file["id"], file["key"], files_path[file["id"]], team
+            )
+    return signatures
+
+
+def confirm_uploads(
+    client: "Client", image_ids: List[int], endpoint_prefix: str, team: str
+) -> Dict[int, Dict]:
+    """Confirms the upload of several files with a single request. Falls back to one
+    confirm_upload request per file if the server does not support batching, and for the files
+    the batch request did not confirm, so that the outcome of each file is known.
+
+    Parameters
+    ----------
+    client: Client
+        Client authenticated to the team where the request will be made
+    image_ids: list[int]
+        Ids of the files uploaded
+    endpoint_prefix: str
+        String to prepend to the endpoint. It varies from images to videos.
+    team: str
+        Team against which the client will make the requests
+
+    Returns
+    -------
+    dict
+        Server response of each file, by id. It holds `errors` if the file was not confirmed
+    """
+    if not image_ids:
+        return {}
+    confirmations = {}
+    if BATCH_UPLOAD_ENDPOINTS not in client.unsupported_endpoints:
+        try:
+            response = client.put(
+                endpoint=f"/{endpoint_prefix}/confirm_upload",
+                payload={"ids": image_ids},
+                team=team,
+                retry=True,
+                error_handlers=[not_found],
+            )
+            if isinstance(response, list):
+                # Outcome of each file
+                confirmations = {
+                    confirmation["id"]: confirmation
+                    for confirmation in response
+                    if isinstance(confirmation, dict) and "id" in confirmation
+                }
+            elif isinstance(response, dict) and "errors" not in response:
+                # All the files were confirmed
+                confirmations = {image_id: {"id": image_id} for image_id in image_ids}
+        except NotFound:
+            client.unsupported_endpoints.add(BATCH_UPLOAD_ENDPOINTS)
+    for image_id in image_ids:
+        if image_id not in confirmations:
+            confirmations[image_id] = client.put(
+                endpoint=f"/{endpoint_prefix}/{image_id}/confirm_upload",
+                payload={},
+                team=team,
+                retry=True,
+            )
+    return confirmations
 
 
 def sign_upload(client: "Client", image_id: int, key: str, file_path: Path, team: str):
@@ -252,21 +885,201 @@ def sign_upload(client: "Client", image_id: int, key: str, file_path: Path, team
     dict
         Dictionary which contains the server response
     """
+    request = _sign_upload_request(image_id, key, file_path)
+    if request is not None:
+        endpoint, payload = request
+        return client.post(endpoint=endpoint, payload=payload, team=team, retry=True)
+
+
+def _sign_upload_request(image_id: int, key: str, file_path: Path):
+    """Support function to compose the endpoint and the payload of a sign_upload request
+
+    Returns
+    -------
+    endpoint, payload: str, dict
+        Endpoint and payload of the request, or None if the file type is not supported
+    """
     file_format = file_path.suffix
     if is_image_extension_allowed(file_format):
-        return client.post(
-            endpoint=f"/dataset_images/{image_id}/sign_upload?key={key}",
-            payload={"filePath": str(file_path), "contentType": f"image/{file_format}"},
-            team=team,
+        return (
+            f"/dataset_images/{image_id}/sign_upload?key={key}",
+            {"filePath": str(file_path), "contentType": f"image/{file_format}"},
         )
     elif is_video_extension_allowed(file_format):
-        return client.post(
-            endpoint=f"/dataset_videos/{image_id}/sign_upload?key={key}",
-            payload={"filePath": str(file_path), "contentType": f"video/{file_format}"},
-            team=team,
+        return (
+            f"/dataset_videos/{image_id}/sign_upload?key={key}",
+            {"filePath": str(file_path), "contentType": f"video/{file_format}"},
         )
 
 
+async def add_files_to_dataset_async(
+    client: "AsyncClient",
+    dataset_id: str,
+    filenames: List[Path],
+    team: str,
+    fps: Optional[int] = 1,
+    max_concurrency: int = 1000,
+):
+    """asyncio counterpart of add_files_to_dataset(). Up to MAX_REGISTRATIONS_IN_FLIGHT chunks
+    of files are registered at the same time, and the upload of each file (signing, S3 upload
+    and confirmation) starts as soon as its chunk is registered. Registration stays at most
+    max_concurrency files ahead of the uploads.
+
+    Parameters
+    ----------
+    client : AsyncClient
+        The client to use to communicate with the server
+    dataset_id : str
+        ID of the dataset to add the files to
+    filenames : list[Path]
+        List of filenames to upload
+    team : str
+        Team against which the client will make the requests
+    fps : int
+        Frame rate to split videos in.
+    max_concurrency : int
+        Maximum number of files being uploaded at the same time
+
+    Returns
+    -------
+    list[dict]
+        Responses of all the files registered, in order, see _upload_function_async()
+    """
+    import asyncio
+
+    if not filenames:
+        raise ValueError(f"Invalid list of file names ({filenames}")
+
+    chunks = enumerate(_chunk_filenames(filenames, 100))
+    registered: "asyncio.Queue" = asyncio.Queue(maxsize=max_concurrency)
+    # Responses by position of the file in the registrations, as chunks complete in any order
+    responses = {}
+
+    async def register():
+        for index, filenames_chunk in chunks:
+            images, videos = _split_on_file_type(filenames_chunk)
+            data = await client.put(
+                endpoint=f"/datasets/{dataset_id}/data",
+                payload={
+                    "image_filenames": [image.name for image in images],
+                    "videos": [{"fps": fps, "original_filename": video.name} for video in videos],
+                },
+                team=team,
+                # Registering the files again would add them twice to the dataset
+                retry=False,
+            )
+            if "errors" in data:
+                raise ValueError(f"There are errors in the put request: {data['errors']['detail']}")
+            position = 0
+            for files, files_path, endpoint_prefix in [
+                (data.get("image_data", []), images, "dataset_images"),
+                (data.get("video_data", []), videos, "dataset_videos"),
+            ]:
+                for file, file_path in zip(files, _resolve_paths(files, files_path)):
+                    await registered.put(((index, position), file, file_path, endpoint_prefix))
+                    position += 1
+
+    async def upload():
+        while True:
+            item = await registered.get()
+            if item is None:
+                return
+            key, file, file_path, endpoint_prefix = item
+            responses[key] = await _upload_function_async(
+                client, file, file_path, endpoint_prefix, team
+            )
+
+    registrations = [
+        asyncio.ensure_future(register()) for _ in range(MAX_REGISTRATIONS_IN_FLIGHT)
+    ]
+    uploads = [
+        asyncio.ensure_future(upload()) for _ in range(min(max_concurrency, len(filenames)))
+    ]
+    try:
+        await asyncio.gather(*registrations)
+        for _ in uploads:
+            await registered.put(None)
+        await asyncio.gather(*uploads)
+    finally:
+        for task in registrations + uploads:
+            task.cancel()
+        await asyncio.gather(*registrations, *uploads, return_exceptions=True)
+    return [responses[key] for key in sorted(responses)]
+
+
+async def _upload_function_async(
+    client: "AsyncClient",
+    file: Dict[str, Any],
+    file_path: Path,
+    endpoint_prefix: str,
+    team: str,
+):
+    """asyncio counterpart of _delayed_upload_function(). Files which failed to be uploaded to
+    S3 are not confirmed and have no backend_response, files not signed have no
+    s3_response_status_code either. The exception which made a file fail, if any, is
+    returned as its error"""
+    image_id = file["id"]
+    result = {
+        "file_path": file_path,
+        "image_id": image_id,
+        "s3_response_status_code": None,
+        "backend_response": None,
+    }
+    try:
+        endpoint, payload = _sign_upload_request(image_id, file["key"], file_path)
+        response = await client.post(endpoint=endpoint, payload=payload, team=team, retry=True)
+        result["s3_response_status_code"] = await upload_file_to_s3_async(
+            client, response["signature"], response["postEndpoint"], file_path
+        )
+        if 200 <= result["s3_response_status_code"] < 300:
+            result["backend_response"] = await client.put(
+                endpoint=f"/{endpoint_prefix}/{image_id}/confirm_upload",
+                payload={},
+                team=team,
+                retry=True,
+            )
+    except Exception as e:
+        result["error"] = e
+    return result
+
+
+async def upload_file_to_s3_async(
+    client: "AsyncClient", signature: Dict[str, Any], end_point: str, file_path: Path
+) -> int:
+    """asyncio counterpart of upload_file_to_s3()
+
+    Parameters
+    ----------
+    client: AsyncClient
+        Client whose connections are used for the upload
+    signature: dict
+        Signed form fields, as returned by sign_upload()
+    end_point: str
+        S3 endpoint, as returned by sign_upload()
+    file_path: Path
+        Path to the file to upload on the file system
+
+    Returns
+    -------
+    int
+        s3 response status code
+    """
+    import aiohttp
+
+    async def send():
+        with file_path.open("rb") as file:
+            form = aiohttp.FormData()
+            for field, value in signature.items():
+                form.add_field(field, str(value))
+            form.add_field("file", file, filename=file_path.name)
+            async with client.session.post(url, data=form) as response:
+                return response
+
+    url = _s3_url(end_point)
+    response = await client.run(send, "post", url, "s3")
+    return response.status
+
+
 def upload_annotations(
     client: "Client",
     team: str,
@@ -275,6 +1088,8 @@ def upload_annotations(
     class_mapping: Path,
     dataset_id: Optional[int] = None,
     multi_threaded: bool = True,
+    executor: Optional[str] = None,
+    max_workers: Optional[int] = None,
 ):
     """Experimental feature to upload annotations from the front end
 
@@ -297,7 +1112,11 @@ def upload_annotations(
         Dataset ID where to upload the annotations. This is required if class_mapping is None
         or if a class present in the annotations is missing on Darwin
     multi_threaded : bool
-        Uses multiprocessing to upload the dataset in parallel.
+        Uploads the annotations in parallel.
+    executor : str
+        Backend running the uploads: `thread`, `process` or `serial`. See exhaust_generator()
+    max_workers : int
+        Number of concurrent uploads
     Notes
     -----
         This function is experimental and the json files `image_mapping` and `class_mapping` can
@@ -386,7 +1205,11 @@ def upload_annotations(
     )
 
     responses = exhaust_generator(
-        progress=generator, count=len(files_to_upload), multi_threaded=multi_threaded
+        progress=generator,
+        count=len(files_to_upload),
+        multi_threaded=multi_threaded,
+        executor=executor,
+        max_workers=max_workers,
     )
     # Log responses to file
     if responses:
@@ -460,7 +1283,7 @@ def _upload_annotation(
         with open(str(output_file_path), "a+") as file:
             writer = csv.writer(file, delimiter=",", quotechar='"', quoting=csv.QUOTE_MINIMAL)
             writer.writerow([payload, response])
-    return [payload, response]
+    return payload, response
 
 
 def create_new_class(
@@ -530,7 +1353,8 @@ def create_new_class(
     }
 
     endpoint = "annotation_classes"
-    response = client.post(endpoint=endpoint, payload=payload, team=team, retry=True)
+    # Creating the class again would add it twice
+    response = client.post(endpoint=endpoint, payload=payload, team=team, retry=False)
     if "errors" in response:
         raise ValueError(f"Response error: {response['errors']}")
     return response
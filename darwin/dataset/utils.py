@@ -1,17 +1,20 @@
 import itertools
 import json
-import multiprocessing as mp
 import os
 from collections import defaultdict
+from concurrent.futures import FIRST_COMPLETED, Future, wait
 from pathlib import Path
-from typing import Generator, Iterable, List, Optional
-
-import numpy as np
-from sklearn.model_selection import train_test_split
-from tqdm import tqdm
+from typing import TYPE_CHECKING, Dict, Generator, Iterable, List, Optional, Tuple
 
+from darwin.executor import DEFAULT_MAX_WORKERS, get_executor
 from darwin.utils import SUPPORTED_IMAGE_EXTENSIONS, is_image_extension_allowed
 
+# numpy, scikit-learn and tqdm are slow to import, hence only imported by the functions using them
+if TYPE_CHECKING:
+    import numpy as np
+
+    from darwin.throttle import AdaptiveConcurrency
+
 
 def extract_classes(annotations_path: Path, annotation_type: str):
     """
@@ -128,7 +131,9 @@ def _write_to_file(annotation_files: List, file_path: Path, split_idx: Iterable)
             f.write(f"{annotation_files[i].stem}\n")
 
 
-def remove_cross_contamination(X_a: np.ndarray, X_b: np.ndarray, y_a: np.ndarray, y_b: np.ndarray):
+def remove_cross_contamination(
+    X_a: "np.ndarray", X_b: "np.ndarray", y_a: "np.ndarray", y_b: "np.ndarray"
+):
     """
     Remove cross contamination present in X_a and X_b by selecting one or the other on a flip coin decision.
 
@@ -153,6 +158,8 @@ def remove_cross_contamination(X_a: np.ndarray, X_b: np.ndarray, y_a: np.ndarray
     X_a, X_b, y_a, y_b : ndarray
         All input parameters filtered by removing cross contamination across A and B
     """
+    import numpy as np
+
     for a in X_a:
         if a in X_b:
             # Remove from A or B based on random chance
@@ -189,6 +196,8 @@ def _stratify_samples(idx_to_classes, split_seed, test_percentage, val_percentag
     X_train, X_val, X_test : list
         List of indices of the images for each split
     """
+    import numpy as np
+    from sklearn.model_selection import train_test_split
 
     # Expand the list of files with all the classes
     expanded_list = [(k, c) for k, v in idx_to_classes.items() for c in v]
@@ -274,6 +283,8 @@ def split_dataset(
     splits : dict
         Keys are the different splits (random, tags, ...) and values are the relative file names
     """
+    import numpy as np
+
     assert dataset is not None
     if isinstance(dataset, Path) or isinstance(dataset, str):
         dataset_path = Path(dataset)
@@ -390,7 +401,15 @@ def _f(x):
         return x()
 
 
-def exhaust_generator(progress: Generator, count: int, multi_threaded: bool):
+def exhaust_generator(
+    progress: Generator,
+    count: int,
+    multi_threaded: bool,
+    executor: Optional[str] = None,
+    max_workers: Optional[int] = None,
+    max_in_flight: Optional[int] = None,
+    concurrency: Optional["AdaptiveConcurrency"] = None,
+):
     """Exhausts the generator passed as parameter. Can be done multi threaded if desired
 
     Parameters
@@ -400,32 +419,95 @@ def exhaust_generator(progress: Generator, count: int, multi_threaded: bool):
     count : int
         Size of the generator
     multi_threaded : bool
-        Flag for multi-threaded enabled operations
+        Flag for multi-threaded enabled operations. Ignored if executor is provided
+    executor : str
+        Backend running the jobs: `thread`, `process` or `serial`.
+        Defaults to `thread` if multi_threaded, `serial` otherwise
+    max_workers : int
+        Number of concurrent workers. Defaults to DEFAULT_MAX_WORKERS
+    max_in_flight : int
+        Maximum number of jobs submitted and not completed yet. The generator is consumed
+        lazily so that no more than this amount of jobs is held in memory.
+        Defaults to 4 times the number of workers
+    concurrency : AdaptiveConcurrency
+        Controller of the endpoint class the jobs spend most of their time on, e.g. `s3` for
+        uploads, adjusting the number of jobs in flight to the health of its requests.
+        Only used with the `thread` executor, where it bounds max_in_flight. The requests
+        themselves are limited by the sessions of the client, whatever the executor
 
     Returns
     -------
     List[dict]
-        List of responses from the generator execution
+        List of responses from the generator execution, in the order of the jobs. Jobs
+        returning a list contribute each element of the list
     """
+    from tqdm import tqdm
+
+    if executor is None:
+        executor = "thread" if multi_threaded else "serial"
+    if executor != "thread":
+        # Controllers can not observe requests made from other processes
+        concurrency = None
+    if max_workers is None:
+        max_workers = DEFAULT_MAX_WORKERS
+    if max_in_flight is None:
+        max_in_flight = max_workers if concurrency else 4 * max_workers
+
     responses = []
-    if multi_threaded:
-        pbar = tqdm(total=count)
 
-        def update(*a):
-            pbar.update()
+    def add(response):
+        # Batch jobs return a list with the response of each of their elements
+        if isinstance(response, list):
+            responses.extend(response)
+        else:
+            responses.append(response)
+
+    def size(response) -> int:
+        return len(response) if isinstance(response, list) else 1
 
-        with mp.Pool(mp.cpu_count()) as pool:
+    if executor == "serial":
+        with tqdm(total=count, desc="Progress") as pbar:
             for f in progress:
-                responses.append(pool.apply_async(_f, args=(f,), callback=update))
-            pool.close()
-            pool.join()
-        responses = [response.get() for response in responses if response.successful()]
-    else:
-        for f in tqdm(progress, total=count, desc="Progress"):
-            responses.append(_f(f))
+                response = _f(f)
+                add(response)
+                pbar.update(size(response))
+        return responses
+
+    pbar = tqdm(total=count)
+    # Jobs complete in any order, their responses are kept by index until all are done
+    results = {}
+
+    def collect(futures):
+        for future in futures:
+            index, job_size = in_flight.pop(future)
+            # Failed jobs are discarded, as done by multiprocessing.Pool
+            if future.exception() is None:
+                results[index] = future.result()
+                pbar.update(size(results[index]))
+            else:
+                pbar.update(job_size)
+
+    with get_executor(executor, max_workers) as pool:
+        in_flight: Dict[Future, Tuple[int, int]] = {}
+        for index, f in enumerate(progress):
+            limit = min(max_in_flight, concurrency.limit) if concurrency else max_in_flight
+            while len(in_flight) >= limit:
+                collect(wait(in_flight, return_when=FIRST_COMPLETED).done)
+            in_flight[pool.submit(_f, f)] = (index, _job_size(f))
+        collect(wait(in_flight).done)
+    pbar.close()
+    for index in sorted(results):
+        add(results[index])
     return responses
 
 
+def _job_size(job) -> int:
+    """Support function to get the number of elements a job of exhaust_generator() processes:
+    the files of a batch upload, see _delayed_upload_batch_function(), or one"""
+    files = getattr(job, "keywords", {}).get("files")
+    return len(files) if isinstance(files, list) else 1
+
+
 def get_annotations(
     dataset,
     partition: str,
@@ -454,6 +536,8 @@ def get_annotations(
     dict
         Dictionary containing all the annotations of the dataset
     """
+    import numpy as np
+
     assert dataset is not None
     if isinstance(dataset, Path) or isinstance(dataset, str):
         dataset_path = Path(dataset)
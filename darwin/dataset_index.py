@@ -0,0 +1,100 @@
+import json
+import os
+import re
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+# Number of seconds the datasets of a team are looked up in the index before being listed again
+DEFAULT_DATASET_INDEX_TTL = 600
+
+
+class DatasetIndex:
+    def __init__(self, path: Optional[Path] = None, ttl: float = DEFAULT_DATASET_INDEX_TTL):
+        """Index of the remote datasets of each team by slug, so that a dataset can be resolved
+        without listing all the datasets of its team. The datasets of a team are indexed when
+        they are listed and expire ttl seconds later, while datasets created or removed by the
+        client update the index straight away.
+
+        Parameters
+        ----------
+        path : Path
+            Folder where the index of each team is stored. If None the index is in memory only
+        ttl : float
+            Number of seconds before the index of a team expires. Disabled if 0
+        """
+        self.path = path
+        self.ttl = ttl
+        self._teams: Dict[str, Dict] = {}
+
+    def get(self, team: str, slug: str) -> Optional[Dict]:
+        """Looks up a dataset of a team
+
+        Parameters
+        ----------
+        team : str
+            Slug of the team
+        slug : str
+            Slug of the dataset
+
+        Returns
+        -------
+        dict
+            Dataset, as listed by the server, or None if it is not indexed or the index expired
+        """
+        index = self._load(team)
+        if index is None or time.time() - index["updated"] > self.ttl:
+            return None
+        return index["datasets"].get(slug)
+
+    def update(self, team: str, datasets: List[Dict]):
+        """Replaces the index of a team with a full listing of its datasets"""
+        self._save(team, {"updated": time.time(), "datasets": {d["slug"]: d for d in datasets}})
+
+    def add(self, team: str, dataset: Dict):
+        """Indexes a dataset just created, if the index of its team is still valid"""
+        index = self._load(team)
+        if index is not None:
+            index["datasets"][dataset["slug"]] = dataset
+            self._save(team, index)
+
+    def remove(self, team: str, slug: str):
+        """Removes a dataset from the index of its team"""
+        index = self._load(team)
+        if index is not None and index["datasets"].pop(slug, None) is not None:
+            self._save(team, index)
+
+    def remove_id(self, team: str, dataset_id: int):
+        """Removes a dataset from the index of its team by id, e.g. once renamed or archived"""
+        index = self._load(team)
+        if index is None:
+            return
+        slugs = [slug for slug, d in index["datasets"].items() if d.get("id") == dataset_id]
+        for slug in slugs:
+            del index["datasets"][slug]
+        if slugs:
+            self._save(team, index)
+
+    def _team_path(self, team: str) -> Path:
+        return self.path / f"{re.sub('[^a-zA-Z0-9_-]', '_', team)}.json"
+
+    def _load(self, team: str) -> Optional[Dict]:
+        if team in self._teams or self.path is None:
+            return self._teams.get(team)
+        try:
+            with self._team_path(team).open() as f:
+                self._teams[team] = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return self._teams[team]
+
+    def _save(self, team: str, index: Dict):
+        self._teams[team] = index
+        if self.path is None:
+            return
+        self.path.mkdir(parents=True, exist_ok=True)
+        team_path = self._team_path(team)
+        tmp_path = team_path.with_name(f"{team_path.name}.{os.getpid()}.tmp")
+        with tmp_path.open("w") as f:
+            json.dump(index, f)
+        os.replace(tmp_path, team_path)
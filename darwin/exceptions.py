@@ -39,3 +39,17 @@ class ValidationError(Exception):
 
 class Unauthorized(Exception):
     pass
+
+
+class CorruptedDownload(Exception):
+    def __init__(self, path):
+        super().__init__(path)
+        self.path = path
+
+
+class MultipartUploadNotAborted(Exception):
+    def __init__(self, path, status_code=None):
+        super().__init__(path, status_code)
+        self.path = path
+        # Status of the failure which led to the abort, None if it was an exception
+        self.status_code = status_code
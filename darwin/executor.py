@@ -0,0 +1,51 @@
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from typing import Optional
+
+# Names of the available backends to run I/O bound jobs
+EXECUTORS = ["thread", "process", "serial"]
+
+# Number of workers used by default. Jobs are network bound, hence independent of the core count
+DEFAULT_MAX_WORKERS = 16
+
+
+class SerialExecutor(Executor):
+    """Executor which runs every job in the calling thread, as soon as it is submitted"""
+
+    def submit(self, fn, *args, **kwargs) -> Future:
+        future = Future()
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except BaseException as e:
+            future.set_exception(e)
+        return future
+
+
+def get_executor(executor: str = "thread", max_workers: Optional[int] = None) -> Executor:
+    """Creates the executor matching the backend name provided
+
+    Parameters
+    ----------
+    executor : str
+        Name of the backend, one of `thread`, `process` or `serial`
+    max_workers : int
+        Number of concurrent workers. Defaults to DEFAULT_MAX_WORKERS
+
+    Returns
+    -------
+    Executor
+        The executor, to be used as a context manager
+    """
+    if max_workers is None:
+        max_workers = DEFAULT_MAX_WORKERS
+    if max_workers < 1:
+        raise ValueError(f"Invalid number of workers ({max_workers}). Must be >= 1")
+    if executor == "thread":
+        return ThreadPoolExecutor(max_workers=max_workers)
+    if executor == "process":
+        # Only imported when needed, as it pulls in multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+
+        return ProcessPoolExecutor(max_workers=max_workers)
+    if executor == "serial":
+        return SerialExecutor()
+    raise ValueError(f"Executor {executor} not supported. Choose one of {EXECUTORS}")
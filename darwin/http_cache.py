@@ -0,0 +1,297 @@
+import fnmatch
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+# Maximum total size of the responses kept in the cache, in bytes
+DEFAULT_HTTP_CACHE_SIZE = 64 * 1024 * 1024
+
+# Number of seconds a response is used without asking the server whether it changed, by pattern
+# of endpoint. Responses of the other endpoints are revalidated every time they are used
+DEFAULT_ENDPOINT_TTLS = {"datasets": 60, "datasets/*/exports": 60}
+
+
+class CachedResponse:
+    def __init__(self, meta: Dict, body: bytes):
+        """Response of the server kept in a HttpCache
+
+        Parameters
+        ----------
+        meta : dict
+            Details about the response: its url, validators, next page and when it was validated
+        body : bytes
+            Body of the response
+        """
+        self.meta = meta
+        self.body = body
+
+    @property
+    def next_page(self) -> Optional[str]:
+        """Url of the next page, as given by the `Link` header of the response"""
+        return self.meta.get("next_page")
+
+    @property
+    def validators(self) -> Dict[str, str]:
+        """Headers asking the server for the response only if it changed since it was cached"""
+        headers = {}
+        if self.meta.get("etag"):
+            headers["If-None-Match"] = self.meta["etag"]
+        if self.meta.get("last_modified"):
+            headers["If-Modified-Since"] = self.meta["last_modified"]
+        return headers
+
+    def is_fresh(self, ttl: float) -> bool:
+        """Whether the response was validated less than ttl seconds ago"""
+        return time.time() - self.meta["validated"] < ttl
+
+
+class HttpCache:
+    def __init__(
+        self,
+        path: Path,
+        max_size: int = DEFAULT_HTTP_CACHE_SIZE,
+        ttls: Optional[Dict[str, float]] = None,
+    ):
+        """On disk cache of the responses of the darwin API, keyed by url and team. Responses are
+        stored in a folder hierarchy following the path of their url, so that a change made to a
+        resource only drops the responses it may affect.
+
+        A response is used as is for the TTL of its endpoint, then revalidated with a conditional
+        request (`If-None-Match` / `If-Modified-Since`) so that the server only sends it again if
+        it changed. The least recently used responses are evicted once the cache exceeds its size.
+
+        Parameters
+        ----------
+        path : Path
+            Folder where the responses are stored, one subfolder per team
+        max_size : int
+            Maximum total size of the responses kept, in bytes
+        ttls : dict
+            Number of seconds a response is used without revalidation, by glob pattern of
+            endpoint (relative to the API, without the query). The first pattern matching is used.
+            Defaults to DEFAULT_ENDPOINT_TTLS
+        """
+        self.path = path
+        self.max_size = max_size
+        self.ttls = DEFAULT_ENDPOINT_TTLS if ttls is None else ttls
+        self._init()
+
+    def _init(self):
+        # Total size of the cache, computed on the first write
+        self._size: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def ttl(self, endpoint: str) -> float:
+        """Number of seconds a response of an endpoint is used without revalidation
+
+        Parameters
+        ----------
+        endpoint : str
+            Endpoint relative to the API, with or without its query
+
+        Returns
+        -------
+        float
+            TTL of the first pattern matching the endpoint, 0 if none does
+        """
+        endpoint = endpoint.split("?", 1)[0].strip("/")
+        for pattern, ttl in self.ttls.items():
+            if fnmatch.fnmatchcase(endpoint, pattern):
+                return ttl
+        return 0
+
+    def get(self, team: str, url: str) -> Optional[CachedResponse]:
+        """Looks up the response to a request. Its entry is marked as recently used
+
+        Parameters
+        ----------
+        team : str
+            Team the request is authenticated against
+        url : str
+            Url of the request
+
+        Returns
+        -------
+        CachedResponse
+            The response cached, or None if there is none
+        """
+        entry_path = self._entry_path(team, url)
+        try:
+            with entry_path.open("rb") as f:
+                meta = json.loads(f.readline())
+                body = f.read()
+            os.utime(entry_path)
+        except (OSError, ValueError):
+            return None
+        if meta.get("url") != url:
+            return None
+        return CachedResponse(meta, body)
+
+    def put(
+        self,
+        team: str,
+        url: str,
+        body: bytes,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+        next_page: Optional[str] = None,
+    ):
+        """Stores the response to a request, evicting the least recently used responses if the
+        cache is full
+
+        Parameters
+        ----------
+        team : str
+            Team the request is authenticated against
+        url : str
+            Url of the request
+        body : bytes
+            Body of the response
+        etag, last_modified : str
+            Values of the `ETag` and `Last-Modified` headers of the response, if any
+        next_page : str
+            Url of the next page, if any
+        """
+        meta = {
+            "url": url,
+            "etag": etag,
+            "last_modified": last_modified,
+            "next_page": next_page,
+            "validated": time.time(),
+        }
+        self._write(team, url, meta, body)
+
+    def record(
+        self,
+        team: str,
+        url: str,
+        chunks: Iterable[bytes],
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+        next_page: Optional[str] = None,
+    ) -> Iterator[bytes]:
+        """Passes the chunks of a response body through, storing the response once they have all
+        been consumed. See put()"""
+        received = []
+        for chunk in chunks:
+            received.append(chunk)
+            yield chunk
+        self.put(team, url, b"".join(received), etag, last_modified, next_page)
+
+    def revalidate(self, team: str, cached: CachedResponse):
+        """Records that the server confirmed a response is still up to date"""
+        cached.meta["validated"] = time.time()
+        self._write(team, cached.meta["url"], cached.meta, cached.body)
+
+    def invalidate(self, team: str, url: Optional[str] = None):
+        """Drops the responses a change made on the server by a team may affect: the ones of the
+        resource changed and of its sub-resources, and the listings of its parent resources
+
+        Parameters
+        ----------
+        team : str
+            Team which changed something
+        url : str
+            Url of the request which made the change. All the responses of the team are dropped
+            if None
+        """
+        team_path = self._team_path(team)
+        path = self._resource_path(team, url) if url is not None else team_path
+        # Most changes, e.g. the confirmation of each upload, are made to resources nothing was
+        # cached under: only the folders which exist are walked
+        entry_paths = list(path.rglob("*.bin")) if path.is_dir() else []
+        while path != team_path:
+            path = path.parent
+            if path.is_dir():
+                entry_paths.extend(path.glob("*.bin"))
+
+        size = 0
+        for entry_path in entry_paths:
+            try:
+                size += entry_path.stat().st_size
+                entry_path.unlink()
+            except FileNotFoundError:
+                pass
+        with self._lock:
+            if self._size is not None:
+                self._size -= size
+
+    def _team_path(self, team: str) -> Path:
+        return self.path / _safe_name(team)
+
+    def _resource_path(self, team: str, url: str) -> Path:
+        """Support function to get the folder of the responses of a resource, by path of url"""
+        return self._team_path(team).joinpath(
+            *(_safe_name(segment) for segment in urlsplit(url).path.split("/") if segment)
+        )
+
+    def _entry_path(self, team: str, url: str) -> Path:
+        return self._resource_path(team, url) / f"{hashlib.sha256(url.encode()).hexdigest()}.bin"
+
+    def _write(self, team: str, url: str, meta: Dict, body: bytes):
+        """Support function to write an entry atomically, then evict entries if needed"""
+        entry_path = self._entry_path(team, url)
+        entry_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = entry_path.with_name(f"{entry_path.name}.{os.getpid()}.tmp")
+        data = json.dumps(meta).encode() + b"\n" + body
+        with tmp_path.open("wb") as f:
+            f.write(data)
+        try:
+            replaced = entry_path.stat().st_size
+        except FileNotFoundError:
+            replaced = 0
+        os.replace(tmp_path, entry_path)
+
+        with self._lock:
+            if self._size is None:
+                self._size = sum(size for _, size, _ in self._entries())
+            else:
+                self._size += len(data) - replaced
+            if self._size > self.max_size:
+                self._evict()
+
+    def _entries(self) -> List[Tuple[float, int, Path]]:
+        """Support function to list the entries with their last use time and size"""
+        entries = []
+        for entry_path in self.path.rglob("*.bin"):
+            try:
+                stat = entry_path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry_path))
+        return entries
+
+    def _evict(self):
+        """Support function to remove the least recently used entries, until the cache is at
+        most 90% full so that evictions do not happen on every write. Called under the lock"""
+        entries = sorted(self._entries())
+        size = sum(entry_size for _, entry_size, _ in entries)
+        for _, entry_size, entry_path in entries:
+            if size <= 0.9 * self.max_size:
+                break
+            try:
+                entry_path.unlink()
+            except FileNotFoundError:
+                pass
+            size -= entry_size
+        self._size = size
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+
+def _safe_name(name: str) -> str:
+    """Support function to turn a team or a segment of url path into a folder name"""
+    return re.sub("[^a-zA-Z0-9_-]", "_", name)
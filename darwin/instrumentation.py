@@ -0,0 +1,357 @@
+import json
+import math
+import os
+import random
+import re
+import threading
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional
+from urllib.parse import urlsplit
+
+# Number of durations kept per endpoint to estimate the percentiles
+DEFAULT_RESERVOIR_SIZE = 10000
+
+# Percentiles reported for the duration of the requests
+PERCENTILES = [50, 95, 99]
+
+# Segments of a path which identify a resource rather than an endpoint: numbers, UUIDs and hashes
+_ID_SEGMENT = re.compile(r"^(\d+|[0-9a-fA-F-]{16,})$")
+
+# State of the request being sent by the current thread, e.g. the attempt set by RetryPolicy
+_context = threading.local()
+
+
+class RequestRecord:
+    def __init__(
+        self,
+        method: str,
+        url: str,
+        endpoint_class: str,
+        start: float,
+        status: Optional[int] = None,
+        error: Optional[str] = None,
+        attempt: int = 1,
+        connect: float = 0.0,
+        ttfb: float = 0.0,
+        transfer: float = 0.0,
+        bytes_sent: int = 0,
+        bytes_received: int = 0,
+    ):
+        """Timings and outcome of a HTTP request, as reported to the hooks of an Instrumentation.
+        Durations are in seconds.
+
+        Parameters
+        ----------
+        method : str
+            HTTP method of the request
+        url : str
+            Url of the request
+        endpoint_class : str
+            Class of the endpoint the request was sent to, see Client.get_session()
+        start : float
+            Time the request was sent at, in seconds since the epoch
+        status : int
+            Status code of the response, None if no response was received
+        error : str
+            Error which prevented receiving a response, if any
+        attempt : int
+            Attempt of the request, greater than 1 when the request is retried
+        connect : float
+            Time spent opening a new connection: DNS resolution, TCP and TLS handshakes.
+            0 if a connection of the pool was reused
+        ttfb : float
+            Time between sending the request and receiving the headers of the response, including
+            the time spent connecting
+        transfer : float
+            Time spent receiving the body of the response
+        bytes_sent, bytes_received : int
+            Size of the bodies of the request and of the response
+        """
+        self.method = method
+        self.url = url
+        self.endpoint_class = endpoint_class
+        self.endpoint = endpoint_template(url, endpoint_class)
+        self.start = start
+        self.status = status
+        self.error = error
+        self.attempt = attempt
+        self.connect = connect
+        self.ttfb = ttfb
+        self.transfer = transfer
+        self.bytes_sent = bytes_sent
+        self.bytes_received = bytes_received
+
+    @property
+    def total(self) -> float:
+        """Total duration of the request, from sending it to receiving the end of its response"""
+        return self.ttfb + self.transfer
+
+    def to_dict(self) -> Dict:
+        return {**self.__dict__, "total": self.total}
+
+
+def endpoint_template(url: str, endpoint_class: str = "api") -> str:
+    """Groups the urls of the requests by endpoint: the identifiers in the path of the darwin
+    API urls are replaced with {id}, e.g. /api/datasets/{id}/exports. The storage and the CDN
+    urls point to individual files, hence are grouped by host.
+
+    Parameters
+    ----------
+    url : str
+        Url of a request
+    endpoint_class : str
+        Class of the endpoint the request was sent to
+
+    Returns
+    -------
+    str
+        Template of the endpoint
+    """
+    parts = urlsplit(url)
+    if endpoint_class != "api":
+        return parts.netloc
+    return "/".join("{id}" if _ID_SEGMENT.match(part) else part for part in parts.path.split("/"))
+
+
+def current_attempt() -> int:
+    """Attempt of the request being sent by the current thread"""
+    return getattr(_context, "attempt", 1)
+
+
+def set_attempt(attempt: int):
+    """Sets the attempt of the requests sent by the current thread, see RetryPolicy.run()"""
+    _context.attempt = attempt
+
+
+class Instrumentation:
+    def __init__(self, hooks: Optional[Iterable[Callable[[RequestRecord], None]]] = None):
+        """Reports every request sent by the sessions of a client to a list of hooks, e.g. a
+        RequestStats or a JsonLinesExporter. Hooks are called from the thread which sent the
+        request, so they must be thread safe.
+
+        Parameters
+        ----------
+        hooks : Iterable[Callable]
+            Functions called with the RequestRecord of every request
+        """
+        self.hooks = list(hooks or [])
+
+    def add_hook(self, hook: Callable[[RequestRecord], None]):
+        """Calls a function with the RequestRecord of every request from now on"""
+        self.hooks.append(hook)
+
+    def emit(self, record: RequestRecord):
+        """Reports a request to all the hooks"""
+        for hook in self.hooks:
+            hook(record)
+
+    def close(self):
+        """Closes the hooks which hold resources, e.g. files"""
+        for hook in self.hooks:
+            if hasattr(hook, "close"):
+                hook.close()
+
+
+class RequestStats:
+    def __init__(self, reservoir_size: int = DEFAULT_RESERVOIR_SIZE):
+        """Hook aggregating the requests in memory, per method and endpoint. The percentiles of
+        the durations are estimated from a uniform sample of at most reservoir_size requests per
+        endpoint, so that memory stays bounded however many requests are sent.
+
+        Parameters
+        ----------
+        reservoir_size : int
+            Maximum number of durations kept per endpoint
+        """
+        self.reservoir_size = reservoir_size
+        self._endpoints: Dict[tuple, Dict] = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, record: RequestRecord):
+        key = (record.endpoint_class, record.method, record.endpoint)
+        with self._lock:
+            stats = self._endpoints.get(key)
+            if stats is None:
+                stats = self._endpoints[key] = {
+                    "count": 0,
+                    "errors": 0,
+                    "retries": 0,
+                    "statuses": {},
+                    "connect": 0.0,
+                    "ttfb": 0.0,
+                    "transfer": 0.0,
+                    "total": 0.0,
+                    "bytes_sent": 0,
+                    "bytes_received": 0,
+                    "durations": [],
+                }
+            stats["count"] += 1
+            if record.status is None or record.status >= 400:
+                stats["errors"] += 1
+            if record.attempt > 1:
+                stats["retries"] += 1
+            status = str(record.status or "error")
+            stats["statuses"][status] = stats["statuses"].get(status, 0) + 1
+            for field in ["connect", "ttfb", "transfer", "total", "bytes_sent", "bytes_received"]:
+                stats[field] += getattr(record, field)
+            # Reservoir sampling (algorithm R) of the durations
+            durations = stats["durations"]
+            if len(durations) < self.reservoir_size:
+                durations.append(record.total)
+            else:
+                i = random.randrange(stats["count"])
+                if i < self.reservoir_size:
+                    durations[i] = record.total
+
+    def summary(self) -> List[Dict]:
+        """Aggregates the requests of each endpoint
+
+        Returns
+        -------
+        list[dict]
+            For each endpoint class, method and endpoint, sorted by total time spent: number of
+            requests, errors and retries, count of each status, percentiles of the duration and
+            mean of each phase, in seconds, and bytes sent and received
+        """
+        rows = []
+        with self._lock:
+            for (endpoint_class, method, endpoint), stats in self._endpoints.items():
+                count = stats["count"]
+                durations = sorted(stats["durations"])
+                row = {
+                    "endpoint_class": endpoint_class,
+                    "method": method,
+                    "endpoint": endpoint,
+                    "count": count,
+                    "errors": stats["errors"],
+                    "retries": stats["retries"],
+                    "statuses": dict(stats["statuses"]),
+                    "total": stats["total"],
+                }
+                for p in PERCENTILES:
+                    row[f"p{p}"] = _percentile(durations, p)
+                for field in ["connect", "ttfb", "transfer"]:
+                    row[f"mean_{field}"] = stats[field] / count
+                row["bytes_sent"] = stats["bytes_sent"]
+                row["bytes_received"] = stats["bytes_received"]
+                rows.append(row)
+        return sorted(rows, key=lambda row: row["total"], reverse=True)
+
+    def format_summary(self) -> str:
+        """Formats the summary as a table, with the durations in milliseconds"""
+        from humanize import naturalsize
+
+        from darwin.table import Table
+
+        columns = ["endpoint", "count", "errors", "retries"]
+        columns += [f"p{p} ms" for p in PERCENTILES]
+        columns += ["ttfb ms", "received"]
+        table = Table(columns, [Table.L] + [Table.R] * (len(columns) - 1))
+        for row in self.summary():
+            values = [f"{row['method']} {row['endpoint']}", row["count"], row["errors"]]
+            values += [row["retries"]]
+            values += [f"{row[f'p{p}'] * 1000:.1f}" for p in PERCENTILES]
+            values += [f"{row['mean_ttfb'] * 1000:.1f}", naturalsize(row["bytes_received"])]
+            table.add_row(dict(zip(columns, values)))
+        return str(table)
+
+    def write_prometheus(self, path: Path):
+        """Writes the summary to a file in the Prometheus text exposition format, e.g. for the
+        textfile collector of the node exporter. The file is replaced atomically
+
+        Parameters
+        ----------
+        path : Path
+            File to write
+        """
+        lines = [
+            "# HELP darwin_request_duration_seconds Duration of the requests",
+            "# TYPE darwin_request_duration_seconds summary",
+        ]
+        counters = {
+            "requests": [],
+            "request_retries": [],
+            "request_sent_bytes": [],
+            "request_received_bytes": [],
+        }
+        for row in self.summary():
+            labels = (
+                f'endpoint_class="{row["endpoint_class"]}",method="{row["method"]}",'
+                f'endpoint="{_escape_label(row["endpoint"])}"'
+            )
+            for p in PERCENTILES:
+                lines.append(
+                    f'darwin_request_duration_seconds{{{labels},quantile="{p / 100}"}} '
+                    f"{row[f'p{p}']}"
+                )
+            lines.append(f"darwin_request_duration_seconds_sum{{{labels}}} {row['total']}")
+            lines.append(f"darwin_request_duration_seconds_count{{{labels}}} {row['count']}")
+            for status, count in sorted(row["statuses"].items()):
+                counters["requests"].append(f'{{{labels},status="{status}"}} {count}')
+            counters["request_retries"].append(f"{{{labels}}} {row['retries']}")
+            counters["request_sent_bytes"].append(f"{{{labels}}} {row['bytes_sent']}")
+            counters["request_received_bytes"].append(f"{{{labels}}} {row['bytes_received']}")
+        for name, samples in counters.items():
+            lines.append(f"# TYPE darwin_{name}_total counter")
+            lines.extend(f"darwin_{name}_total{sample}" for sample in samples)
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.tmp")
+        tmp_path.write_text("\n".join(lines) + "\n")
+        os.replace(tmp_path, path)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+
+class JsonLinesExporter:
+    def __init__(self, path: Path):
+        """Hook appending every request to a JSON Lines file, as it is reported. Each record is a
+        single append to the file, so the exporter can be shared by threads and processes.
+
+        Parameters
+        ----------
+        path : Path
+            File the records are appended to
+        """
+        self.path = path
+        self._fd: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def __call__(self, record: RequestRecord):
+        line = (json.dumps(record.to_dict()) + "\n").encode()
+        with self._lock:
+            if self._fd is None:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                self._fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            os.write(self._fd, line)
+
+    def close(self):
+        with self._lock:
+            if self._fd is not None:
+                os.close(self._fd)
+                self._fd = None
+
+    def __getstate__(self):
+        return {"path": self.path}
+
+    def __setstate__(self, state):
+        self.__init__(state["path"])
+
+
+def _percentile(values: List[float], p: float) -> float:
+    """Support function to compute a percentile of sorted values, by the nearest rank method"""
+    if not values:
+        return 0.0
+    return values[max(0, math.ceil(p / 100 * len(values)) - 1)]
+
+
+def _escape_label(value: str) -> str:
+    """Support function to escape the value of a Prometheus label"""
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
@@ -1,7 +1,9 @@
 import argparse
+import os
 import sys
+from pathlib import Path
 
-import argcomplete
+from darwin.dataset.image_store import LINK_MODES
 
 
 class Options(object):
@@ -10,6 +12,17 @@ class Options(object):
         self.parser = argparse.ArgumentParser(
             description="Commandline tool to create/upload/download datasets on darwin."
         )
+        self.parser.add_argument(
+            "--profile",
+            action="store_true",
+            help="Print the percentiles of the duration of the requests of each endpoint. ",
+        )
+        self.parser.add_argument(
+            "--profile-dir",
+            type=Path,
+            help="Also export every request to requests.jsonl and their summary to requests.prom "
+            "(Prometheus text format) in this folder. Implies --profile. ",
+        )
 
         subparsers = self.parser.add_subparsers(dest="command")
         subparsers.add_parser("help", help="Show this help message and exit.")
@@ -42,9 +55,19 @@ class Options(object):
         parser_remote.add_argument(
             "-a", "--all", action="store_true", help="List datasets for all teams"
         )
+        parser_remote.add_argument(
+            "--stream",
+            action="store_true",
+            help="Print each dataset as soon as it is received, in columns of fixed sizes",
+        )
 
         # Local
-        dataset_action.add_parser("local", help="List downloaded datasets")
+        parser_local = dataset_action.add_parser("local", help="List downloaded datasets")
+        parser_local.add_argument(
+            "--refresh",
+            action="store_true",
+            help="Recomputes the statistics of the datasets instead of using the cached ones.",
+        )
 
         # Create
         parser_create = dataset_action.add_parser("create", help="Creates a new dataset on darwin")
@@ -84,6 +107,11 @@ class Options(object):
             default="1",
             help="Frames per second for video split (recommended: 1).",
         )
+        parser_push.add_argument(
+            "--skip-duplicates",
+            action="store_true",
+            help="Skips the files whose content was already uploaded to the dataset.",
+        )
 
         # Remove
         parser_remove = dataset_action.add_parser(
@@ -126,6 +154,23 @@ class Options(object):
         parser_dataset_version.add_argument(
             "dataset", type=str, help="Remote dataset name to download."
         )
+        parser_dataset_version.add_argument(
+            "--verify",
+            action="store_true",
+            help="Check the images already downloaded against the server and download again "
+            "the ones which do not match. ",
+        )
+        parser_dataset_version.add_argument(
+            "--link",
+            choices=LINK_MODES,
+            help="Download each image once in the image store shared by all the local datasets, "
+            "and link it in the dataset folder. ",
+        )
+
+        # Garbage collection
+        dataset_action.add_parser(
+            "gc", help="Remove the images of the store no longer used by any local dataset."
+        )
 
         # Help
         dataset_action.add_parser("help", help="Show this help message and exit.")
@@ -133,7 +178,11 @@ class Options(object):
         # VERSION
         subparsers.add_parser("version", help="Check current version of the repository. ")
 
-        argcomplete.autocomplete(self.parser)
+        # argcomplete only acts when the shell asks for completions, and is slow to import
+        if "_ARGCOMPLETE" in os.environ:
+            import argcomplete
+
+            argcomplete.autocomplete(self.parser)
 
     def parse_args(self):
         args = self.parser.parse_args()
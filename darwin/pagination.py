@@ -0,0 +1,102 @@
+import codecs
+import json
+from typing import Any, Iterable, Iterator, Optional
+
+# Number of items requested per page from the list endpoints
+DEFAULT_PAGE_SIZE = 500
+
+# Size of the blocks read from the body of a response while parsing it
+STREAM_CHUNK_SIZE = 64 * 1024
+
+_WHITESPACE = " \t\n\r"
+# Characters which can follow an item of an array
+_DELIMITERS = _WHITESPACE + ",]"
+
+
+def iter_json_array(chunks: Iterable[bytes]) -> Iterator[Any]:
+    """Parses a JSON array incrementally, yielding each of its items as soon as it is fully
+    received. Only the item being parsed is held in memory, not the whole array.
+
+    Parameters
+    ----------
+    chunks : Iterable[bytes]
+        Consecutive blocks of the UTF-8 encoded document, e.g. the body of a streamed response
+
+    Returns
+    -------
+    Iterator
+        Items of the array, decoded, in order
+
+    Raises
+    ------
+    ValueError
+        The document is not a JSON array, or is malformed
+    """
+    decoder = json.JSONDecoder()
+    utf8 = codecs.getincrementaldecoder("utf-8")()
+    chunks = iter(chunks)
+    buffer = ""
+    position = 0
+    eof = False
+
+    def fill() -> bool:
+        """Reads the next chunk into the buffer, dropping what has been parsed already"""
+        nonlocal buffer, position, eof
+        if eof:
+            return False
+        chunk = next(chunks, None)
+        if chunk is None:
+            eof = True
+            buffer = buffer[position:] + utf8.decode(b"", final=True)
+        else:
+            buffer = buffer[position:] + utf8.decode(chunk)
+        position = 0
+        return True
+
+    def next_token() -> Optional[str]:
+        """Skips whitespace and returns the next character, without consuming it"""
+        nonlocal position
+        while True:
+            while position < len(buffer) and buffer[position] in _WHITESPACE:
+                position += 1
+            if position < len(buffer):
+                return buffer[position]
+            if not fill():
+                return None
+
+    if next_token() != "[":
+        raise ValueError("Expected a JSON array")
+    position += 1
+    expect_item = True
+    empty = True
+    while True:
+        token = next_token()
+        if token is None:
+            raise ValueError("Unterminated JSON array")
+        if token == "]" and (not expect_item or empty):
+            # The document is read to its end, to be sure that nothing follows the array
+            position += 1
+            if next_token() is not None:
+                raise ValueError("Unexpected data after JSON array")
+            return
+        if not expect_item:
+            if token != ",":
+                raise ValueError(f"Expected ',' or ']' in JSON array, got {token!r}")
+            position += 1
+            expect_item = True
+            continue
+        # An item can only be decoded once it is followed by a delimiter, otherwise a number or a
+        # literal cut by the end of the chunk would be decoded partially, e.g. `0` out of `0.5`
+        while True:
+            try:
+                item, end = decoder.raw_decode(buffer, position)
+            except ValueError:
+                item, end = None, None
+            if end is not None and (eof or (end < len(buffer) and buffer[end] in _DELIMITERS)):
+                break
+            if not fill():
+                raise ValueError(f"Malformed JSON array near {buffer[position:position + 50]!r}")
+        position = end
+        expect_item = False
+        empty = False
+        yield item
@@ -0,0 +1,185 @@
+import random
+import time
+from typing import TYPE_CHECKING, Callable, Dict, Mapping, Optional
+
+from darwin.instrumentation import set_attempt
+
+if TYPE_CHECKING:
+    from requests import Response
+
+# Whether a status code is worth retrying. Rules are looked up by exact code first (e.g. "429"),
+# then by class (e.g. "5xx"). Status codes not covered are never retried.
+DEFAULT_STATUS_RULES = {"408": True, "429": True, "5xx": True}
+
+
+class RetryPolicy:
+    def __init__(
+        self,
+        max_attempts: int = 5,
+        backoff_factor: float = 0.5,
+        max_backoff: float = 60.0,
+        jitter: bool = True,
+        max_elapsed: Optional[float] = None,
+        status_rules: Optional[Dict[str, bool]] = None,
+    ):
+        """Describes when and how long to wait before re-sending a failed request.
+        The delay grows exponentially with the number of attempts (backoff_factor * 2^(n-1)),
+        capped at max_backoff and randomised with full jitter. A `Retry-After` header sent by the
+        server takes precedence over the computed delay, within max_backoff too.
+
+        Parameters
+        ----------
+        max_attempts : int
+            Maximum number of times a request is sent, including the first one
+        backoff_factor : float
+            Delay in seconds before the first retry
+        max_backoff : float
+            Upper bound of the delay in seconds between two attempts, including the ones asked
+            by the server
+        jitter : bool
+            Randomise the delays to avoid synchronized retries across workers
+        max_elapsed : float
+            Budget in seconds after which no more attempts are made. Unlimited if None
+        status_rules : dict
+            Mapping from status code ("429") or class ("5xx") to whether it should be retried.
+            Defaults to DEFAULT_STATUS_RULES
+        """
+        if max_attempts < 1:
+            raise ValueError(f"Invalid number of attempts ({max_attempts}). Must be >= 1")
+        self.max_attempts = max_attempts
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+        self.max_elapsed = max_elapsed
+        self.status_rules = DEFAULT_STATUS_RULES if status_rules is None else status_rules
+
+    def is_retryable(self, status_code: int) -> bool:
+        """Whether a response with this status code is worth retrying"""
+        rule = self.status_rules.get(str(status_code))
+        if rule is None:
+            rule = self.status_rules.get(f"{status_code // 100}xx", False)
+        return rule
+
+    def next_delay(
+        self,
+        attempt: int,
+        elapsed: float = 0.0,
+        status_code: Optional[int] = None,
+        headers: Optional[Mapping[str, str]] = None,
+    ) -> Optional[float]:
+        """Computes how long to wait before the next attempt
+
+        Parameters
+        ----------
+        attempt : int
+            Number of attempts made so far
+        elapsed : float
+            Seconds elapsed since the first attempt
+        status_code : int
+            Status code of the last response. None if the request failed to connect
+        headers : Mapping
+            Headers of the last response, looked up for `Retry-After`
+
+        Returns
+        -------
+        float
+            Delay in seconds, or None if the request should not be retried
+        """
+        if attempt >= self.max_attempts:
+            return None
+        if status_code is not None and not self.is_retryable(status_code):
+            return None
+
+        delay = min(self.max_backoff, self.backoff_factor * 2 ** (attempt - 1))
+        if self.jitter:
+            delay = random.uniform(0, delay)
+        retry_after = _parse_retry_after(headers)
+        if retry_after is not None:
+            # A server, or a proxy, must not be able to stall the client for hours
+            delay = min(retry_after, self.max_backoff)
+
+        if self.max_elapsed is not None and elapsed + delay > self.max_elapsed:
+            return None
+        return delay
+
+    def run(
+        self,
+        send: Callable[[], "Response"],
+        is_fatal: Optional[Callable[["Response"], bool]] = None,
+    ) -> "Response":
+        """Sends a request until it succeeds or the policy gives up
+
+        Parameters
+        ----------
+        send : Callable
+            Function sending the request and returning its response
+        is_fatal : Callable
+            Optional predicate on a response, preventing any further attempt when True
+
+        Returns
+        -------
+        requests.Response
+            The last response received
+
+        Raises
+        ------
+        requests.exceptions.ConnectionError, requests.exceptions.Timeout
+            The request could not reach the server within the attempts allowed
+        """
+        import requests
+
+        start = time.time()
+        attempt = 0
+        try:
+            while True:
+                attempt += 1
+                set_attempt(attempt)
+                try:
+                    response = send()
+                except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                    delay = self.next_delay(attempt, time.time() - start)
+                    if delay is None:
+                        raise
+                    time.sleep(delay)
+                    continue
+                if response.status_code < 400 or (is_fatal is not None and is_fatal(response)):
+                    return response
+                delay = self.next_delay(
+                    attempt, time.time() - start, response.status_code, response.headers
+                )
+                if delay is None:
+                    return response
+                response.close()
+                time.sleep(delay)
+        finally:
+            # Requests sent without a policy are first attempts
+            set_attempt(1)
+
+
+def _parse_retry_after(headers: Optional[Mapping[str, str]]) -> Optional[float]:
+    """Support function to read the delay, in seconds, from a `Retry-After` header.
+    The header can either contain a number of seconds or a HTTP date."""
+    from datetime import timezone
+    from email.utils import parsedate_to_datetime
+
+    if not headers:
+        return None
+    value = headers.get("Retry-After")
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        date = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if date.tzinfo is None:
+        # HTTP dates are in GMT, "-0000" is parsed as a naive datetime
+        date = date.replace(tzinfo=timezone.utc)
+    return max(0.0, date.timestamp() - time.time())
+
+
+# Policy used for operations which must be attempted only once
+NO_RETRY = RetryPolicy(max_attempts=1)
@@ -0,0 +1,202 @@
+import threading
+import time
+from typing import Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+from darwin.instrumentation import Instrumentation, RequestRecord, current_attempt
+from darwin.throttle import AdaptiveConcurrency, TokenBucket
+
+# Time spent opening connections by the request being sent by the current thread
+_connect_time = threading.local()
+
+
+class ThrottledSession(requests.Session):
+    def __init__(
+        self,
+        rate_limiter: Optional[TokenBucket] = None,
+        concurrency: Optional[AdaptiveConcurrency] = None,
+        instrumentation: Optional[Instrumentation] = None,
+        endpoint_class: str = "api",
+    ):
+        """HTTP session which waits for the rate limiter and for a slot of the concurrency
+        controller before sending each request, reports the outcome of each request to the
+        controller, and its timings to the instrumentation. The slot is held until the response
+        headers are received, the body of streamed responses is read outside of it
+
+        Parameters
+        ----------
+        rate_limiter : TokenBucket
+            Rate limiter of the requests sent through this session
+        concurrency : AdaptiveConcurrency
+            Controller limiting the number of requests in flight, informed of the latency and
+            status of every request
+        instrumentation : Instrumentation
+            Hooks called with the RequestRecord of every request. Requires the connections to be
+            opened by a TimedHTTPAdapter to time them
+        endpoint_class : str
+            Class of the endpoints the session sends requests to, see Client.get_session()
+        """
+        super().__init__()
+        self.rate_limiter = rate_limiter
+        self.concurrency = concurrency
+        self.instrumentation = instrumentation
+        self.endpoint_class = endpoint_class
+
+    def request(self, method, url, *args, **kwargs):
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire()
+        if self.concurrency is not None:
+            with self.concurrency.slot():
+                return self._request(method, url, *args, **kwargs)
+        return self._request(method, url, *args, **kwargs)
+
+    def _request(self, method, url, *args, **kwargs):
+        _connect_time.value = 0.0
+        wall_start = time.time()
+        start = time.monotonic()
+        try:
+            response = super().request(method, url, *args, **kwargs)
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+            if self.concurrency is not None:
+                self.concurrency.record(time.monotonic() - start, None)
+            if self.instrumentation is not None:
+                record = self._record(method, url, wall_start, error=type(e).__name__)
+                record.ttfb = time.monotonic() - start
+                self.instrumentation.emit(record)
+            raise
+        if self.concurrency is not None:
+            self.concurrency.record(time.monotonic() - start, response.status_code)
+        if self.instrumentation is not None:
+            self._instrument(response, method, url, wall_start, start, kwargs.get("stream"))
+        return response
+
+    def _record(self, method: str, url: str, start: float, **fields) -> RequestRecord:
+        return RequestRecord(
+            method.upper(),
+            url,
+            self.endpoint_class,
+            start,
+            attempt=current_attempt(),
+            connect=getattr(_connect_time, "value", 0.0),
+            **fields,
+        )
+
+    def _instrument(
+        self,
+        response: requests.Response,
+        method: str,
+        url: str,
+        wall_start: float,
+        start: float,
+        stream: bool,
+    ):
+        """Reports a request to the instrumentation once its response has been received. The
+        body of a streamed response is received after request() returns, so its reads are
+        watched to report the request once the body has been read entirely, or closed."""
+        record = self._record(
+            method,
+            url,
+            wall_start,
+            status=response.status_code,
+            ttfb=response.elapsed.total_seconds(),
+            bytes_sent=_body_size(response.request.body),
+        )
+        if not stream:
+            record.transfer = max(0.0, time.monotonic() - start - record.ttfb)
+            record.bytes_received = len(response.content)
+            self.instrumentation.emit(record)
+            return
+
+        raw = response.raw
+        headers_received = start + record.ttfb
+        reported = False
+
+        def report():
+            nonlocal reported
+            if reported:
+                return
+            reported = True
+            record.transfer = max(0.0, time.monotonic() - headers_received)
+            try:
+                record.bytes_received = raw.tell()
+            except Exception:
+                pass
+            self.instrumentation.emit(record)
+
+        read = raw.read
+        read_chunked = raw.read_chunked
+        close = response.close
+
+        def timed_read(*args, **kwargs):
+            data = read(*args, **kwargs)
+            if not data or raw.closed:
+                report()
+            return data
+
+        def timed_read_chunked(*args, **kwargs):
+            yield from read_chunked(*args, **kwargs)
+            report()
+
+        def timed_close():
+            close()
+            report()
+
+        raw.read = timed_read
+        raw.read_chunked = timed_read_chunked
+        response.close = timed_close
+
+    def __getstate__(self):
+        state = super().__getstate__()
+        state["rate_limiter"] = self.rate_limiter
+        state["concurrency"] = self.concurrency
+        state["instrumentation"] = self.instrumentation
+        state["endpoint_class"] = self.endpoint_class
+        return state
+
+
+class _TimedHTTPConnection(HTTPConnection):
+    def connect(self):
+        start = time.monotonic()
+        super().connect()
+        _connect_time.value = getattr(_connect_time, "value", 0.0) + time.monotonic() - start
+
+
+class _TimedHTTPSConnection(HTTPSConnection):
+    def connect(self):
+        start = time.monotonic()
+        super().connect()
+        _connect_time.value = getattr(_connect_time, "value", 0.0) + time.monotonic() - start
+
+
+class _TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _TimedHTTPConnection
+
+
+class _TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _TimedHTTPSConnection
+
+
+class TimedHTTPAdapter(HTTPAdapter):
+    """HTTP adapter timing the opening of its connections (DNS resolution, TCP and TLS
+    handshakes), for the instrumentation of a ThrottledSession"""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _TimedHTTPConnectionPool,
+            "https": _TimedHTTPSConnectionPool,
+        }
+
+
+def _body_size(body) -> int:
+    """Support function to get the size of the body of a request, 0 if it is unknown"""
+    if body is None:
+        return 0
+    try:
+        return len(body)
+    except TypeError:
+        return 0
@@ -1,4 +1,4 @@
-from typing import Dict, List
+from typing import Dict, Iterable, Iterator, List, Optional
 
 
 class Table(object):
@@ -25,6 +25,23 @@ class Table(object):
         for column, value in row.items():
             self.table[str(column)].append(str(value))
 
+    def stream(
+        self, rows: Iterable[Dict], column_sizes: Optional[List[int]] = None
+    ) -> Iterator[str]:
+        """Appends rows to table and formats each one as soon as it is available. The header is
+        formatted before the first row, nothing is formatted if there are no rows. The columns
+        can not fit the rows to come, hence have fixed sizes (default_size if not specified)."""
+
+        if column_sizes is None:
+            column_sizes = [self.default_size] * len(self.table)
+        for i, row in enumerate(rows):
+            self.add_row(row)
+            if i == 0:
+                yield self._build_header(column_sizes)
+            yield self._build_row(
+                {column: str(value) for column, value in row.items()}, column_sizes
+            )
+
     def _build_header(self, sizes: List[int]) -> str:
         header = ""
         for column, size, alignment in zip(self.table.keys(), sizes, self.alignments):
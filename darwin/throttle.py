@@ -0,0 +1,182 @@
+import threading
+import time
+from contextlib import contextmanager
+from typing import Optional
+
+
+class TokenBucket:
+    def __init__(self, rate: Optional[float] = None, capacity: Optional[float] = None):
+        """Thread safe token bucket limiting the rate of requests sent
+
+        Parameters
+        ----------
+        rate : float
+            Number of requests per second allowed in the long run. Unlimited if None
+        capacity : float
+            Maximum burst of requests allowed at once. Defaults to one second worth of tokens
+        """
+        if rate is not None and rate <= 0:
+            raise ValueError(f"Invalid rate ({rate}). Must be > 0")
+        self.rate = rate
+        self.capacity = capacity or max(1.0, rate or 1.0)
+        self._tokens = self.capacity
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens: float = 1):
+        """Blocks until enough tokens are available, then consumes them"""
+        while True:
+            wait = self._take(tokens)
+            if not wait:
+                return
+            time.sleep(wait)
+
+    async def acquire_async(self, tokens: float = 1):
+        """asyncio counterpart of acquire(), which waits without blocking the event loop"""
+        import asyncio
+
+        while True:
+            wait = self._take(tokens)
+            if not wait:
+                return
+            await asyncio.sleep(wait)
+
+    def _take(self, tokens: float) -> float:
+        """Support function to consume tokens if enough are available
+
+        Returns
+        -------
+        float
+            0 if the tokens were consumed, otherwise the number of seconds to wait for them
+        """
+        if self.rate is None:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+            self._last = now
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return 0.0
+            return (tokens - self._tokens) / self.rate
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+
+class AdaptiveConcurrency:
+    def __init__(
+        self,
+        initial: int = 8,
+        minimum: int = 1,
+        maximum: int = 64,
+        decrease_factor: float = 0.5,
+        latency_tolerance: Optional[float] = 2.0,
+        cooldown: float = 1.0,
+    ):
+        """Additive increase / multiplicative decrease (AIMD) controller of the number of
+        requests in flight. The limit grows by one every `limit` healthy responses and is
+        cut by decrease_factor on throttling (429), server errors (5xx) and connection errors.
+        Requests wait for a slot() before being sent, so that the limit holds whatever the
+        number of threads sending them.
+
+        Parameters
+        ----------
+        initial : int
+            Starting limit
+        minimum : int
+            Lower bound of the limit
+        maximum : int
+            Upper bound of the limit
+        decrease_factor : float
+            Factor applied to the limit on errors
+        latency_tolerance : float
+            Responses slower than this many times the average latency stop the growth of the
+            limit. Latency is ignored if None
+        cooldown : float
+            Minimum number of seconds between two decreases, so that a burst of errors caused
+            by the same limit is only accounted once
+        """
+        if not 1 <= minimum <= initial <= maximum:
+            raise ValueError(f"Invalid limits, expected 1 <= {minimum} <= {initial} <= {maximum}")
+        self.minimum = minimum
+        self.maximum = maximum
+        self.decrease_factor = decrease_factor
+        self.latency_tolerance = latency_tolerance
+        self.cooldown = cooldown
+        self._limit = float(initial)
+        self._latency: Optional[float] = None
+        self._last_decrease = 0.0
+        self._init()
+
+    def _init(self):
+        self._lock = threading.Condition()
+        self._in_flight = 0
+
+    @property
+    def limit(self) -> int:
+        """Number of requests currently allowed in flight"""
+        return int(self._limit)
+
+    @contextmanager
+    def slot(self):
+        """Waits until less than limit requests are in flight, and counts one more until exit"""
+        with self._lock:
+            while self._in_flight >= self.limit:
+                self._lock.wait()
+            self._in_flight += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+                self._lock.notify()
+
+    def record(self, latency: float, status_code: Optional[int] = None):
+        """Updates the limit with the outcome of a request
+
+        Parameters
+        ----------
+        latency : float
+            Duration of the request in seconds
+        status_code : int
+            Status code of the response. None if the request failed to connect
+        """
+        with self._lock:
+            if status_code is None or status_code == 429 or status_code >= 500:
+                now = time.monotonic()
+                if now - self._last_decrease >= self.cooldown:
+                    self._limit = max(self.minimum, self._limit * self.decrease_factor)
+                    self._last_decrease = now
+                return
+
+            healthy = (
+                self.latency_tolerance is None
+                or self._latency is None
+                or latency <= self.latency_tolerance * self._latency
+            )
+            self._latency = (
+                latency if self._latency is None else 0.9 * self._latency + 0.1 * latency
+            )
+            if healthy:
+                limit = self.limit
+                self._limit = min(self.maximum, self._limit + 1 / self._limit)
+                if self.limit > limit:
+                    self._lock.notify()
+
+    def __getstate__(self):
+        # Requests in flight belong to the process sending them
+        state = self.__dict__.copy()
+        del state["_lock"]
+        del state["_in_flight"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._init()
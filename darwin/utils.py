@@ -1,11 +1,15 @@
+import os
+from concurrent.futures import FIRST_COMPLETED, wait
 from pathlib import Path
-from typing import TYPE_CHECKING, List, Optional, Union
+from typing import TYPE_CHECKING, Iterable, Iterator, List, Optional, Tuple, Union
 
 from darwin.config import Config
+from darwin.executor import get_executor
 
 SUPPORTED_IMAGE_EXTENSIONS = [".png", ".jpeg", ".jpg", ".jfif"]
 SUPPORTED_VIDEO_EXTENSIONS = [".bpm", ".mov", ".mp4"]
 SUPPORTED_EXTENSIONS = SUPPORTED_IMAGE_EXTENSIONS + SUPPORTED_VIDEO_EXTENSIONS
+_SUPPORTED_EXTENSIONS_SET = set(SUPPORTED_EXTENSIONS)
 
 
 def is_extension_allowed(extension):
@@ -76,7 +80,7 @@ def find_files(
     files_to_exclude: List[Union[str, Path]] = [],
 ) -> List[Path]:
     """Retrieve a list of all files belonging to supported extensions. The exploration can be made
-    recursive and a list of files can be excluded if desired.
+    recursive and a list of files can be excluded if desired. See iter_files()
 
     Parameters
     ----------
@@ -92,27 +96,95 @@ def find_files(
     list[Path]
     List of all files belonging to supported extensions. Can't return None.
     """
+    return list(iter_files(files, recursive=recursive, files_to_exclude=files_to_exclude))
 
-    # Init the return value
-    found_files = []
-    base = "**/*" if recursive else "*"
-    pattern = [
-        base + extension
-        for extension in SUPPORTED_EXTENSIONS
-        + list(map(lambda ext: ext.upper(), SUPPORTED_EXTENSIONS))
-    ]
 
+def iter_files(
+    files: Iterable[Union[str, Path]] = [],
+    recursive: bool = True,
+    files_to_exclude: Iterable[Union[str, Path]] = [],
+    max_workers: Optional[int] = None,
+) -> Iterator[Path]:
+    """Streams all the files belonging to supported extensions. Directories are walked in a single
+    pass, several of them being scanned at the same time, and files are yielded as soon as their
+    directory has been scanned, in no particular order. Directory symlinks are followed, and every
+    directory is scanned once even if it can be reached through several paths.
+
+    Parameters
+    ----------
+    files: Iterable[Union[str, Path]]
+        Files that will be filtered with the supported file extensions, and directories to walk
+    recursive : bool
+        Flag for recursive search
+    files_to_exclude : Iterable[Union[str, Path]]
+        Names or paths of the files to exclude from the search
+    max_workers : int
+        Number of directories scanned at the same time. Defaults to DEFAULT_MAX_WORKERS
+
+    Returns
+    -------
+    Iterator[Path]
+    Iterator over all files belonging to supported extensions
+    """
+    files_to_exclude = set(map(str, files_to_exclude))
+
+    def is_excluded(path: Path) -> bool:
+        return path.name in files_to_exclude or str(path) in files_to_exclude
+
+    directories = []
     for path in map(Path, files):
         if path.is_dir():
-            found_files.extend([f for p in pattern for f in path.glob(p)])
-        elif is_extension_allowed(path.suffix):
-            found_files.append(path)
-
-    # Filter the list and return it
-    files_to_exclude = set(files_to_exclude)
-    return [
-        f for f in found_files if f.name not in files_to_exclude and str(f) not in files_to_exclude
-    ]
+            directories.append(path)
+        elif is_extension_allowed(path.suffix) and not is_excluded(path):
+            yield path
+    if not directories:
+        return
+
+    visited = set()
+    for directory in directories:
+        stat = directory.stat()
+        visited.add((stat.st_dev, stat.st_ino))
+    with get_executor("thread", max_workers=max_workers) as executor:
+        pending = {executor.submit(_scan_directory, directory) for directory in directories}
+        try:
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    found, subdirectories = future.result()
+                    for path in found:
+                        if not is_excluded(path):
+                            yield path
+                    if not recursive:
+                        continue
+                    for directory, key in subdirectories:
+                        if key in visited:
+                            continue
+                        visited.add(key)
+                        pending.add(executor.submit(_scan_directory, directory))
+        finally:
+            for future in pending:
+                future.cancel()
+
+
+def _scan_directory(directory: Path) -> Tuple[List[Path], List[Tuple[Path, Tuple[int, int]]]]:
+    """Support function to list the files of a directory belonging to supported extensions, as well
+    as its subdirectories with their (device, inode) identifier. Unreadable entries are skipped"""
+    found = []
+    subdirectories = []
+    try:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir():
+                        stat = entry.stat()
+                        subdirectories.append((Path(entry.path), (stat.st_dev, stat.st_ino)))
+                    elif os.path.splitext(entry.name)[1].lower() in _SUPPORTED_EXTENSIONS_SET:
+                        found.append(Path(entry.path))
+                except OSError:
+                    continue
+    except OSError:
+        pass
+    return found, subdirectories
 
 
 def secure_continue_request() -> bool:
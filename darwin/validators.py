@@ -1,4 +1,4 @@
-from darwin.exceptions import NameTaken, ValidationError
+from darwin.exceptions import NameTaken, NotFound, ValidationError
 
 
 def name_taken(code, body):
@@ -9,3 +9,8 @@ def name_taken(code, body):
 def validation_error(code, body):
     if code == 422:
         raise ValidationError(body)
+
+
+def not_found(code, body):
+    if code in [404, 405]:
+        raise NotFound(body)
@@ -23,8 +23,9 @@ setuptools.setup(
         "sh",
         "tqdm",
     ],
+    extras_require={"async": ["aiohttp"]},
     packages=setuptools.find_packages(),
     entry_points={"console_scripts": ["darwin=darwin.cli:main"]},
     classifiers=["Programming Language :: Python :: 3", "License :: OSI Approved :: MIT License"],
-    python_requires=">=3.6",
+    python_requires=">=3.7",
 )
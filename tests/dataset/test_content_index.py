@@ -0,0 +1,24 @@
+from darwin.dataset.content_index import ContentIndex
+
+
+def test_new_files_are_yielded_while_the_others_are_still_being_found(tmp_path):
+    found = []
+
+    def find_files():
+        for i in range(1000):
+            file = tmp_path / f"{i}.jpg"
+            file.write_bytes(str(i % 500).encode())
+            found.append(file)
+            yield file
+
+    index = ContentIndex(tmp_path / "index.json")
+    digests = {}
+    files = index.iter_new_files(find_files(), digests, max_workers=2)
+    assert next(files) == tmp_path / "0.jpg"
+    assert len(found) < 1000
+    assert list(files) == [tmp_path / f"{i}.jpg" for i in range(1, 500)]
+    assert len(digests) == 500
+
+    index.add_uploaded(digests.values())
+    index.save()
+    assert list(ContentIndex(tmp_path / "index.json").iter_new_files(found, {})) == []
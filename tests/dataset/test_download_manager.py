@@ -0,0 +1,120 @@
+import asyncio
+import hashlib
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("aiohttp")
+
+from darwin.async_client import AsyncClient
+from darwin.dataset.download_manager import (
+    PART_SUFFIX,
+    _expected_md5,
+    _raise_for_status,
+    download_image_async,
+)
+from darwin.retry import RetryPolicy
+from darwin.throttle import TokenBucket
+
+IMAGE = bytes(range(256)) * 4096
+
+
+def serve(cut_every_response: bool, etag: str = hashlib.md5(IMAGE).hexdigest()):
+    """Serves IMAGE with Range support. The first response, or every response if
+    cut_every_response, is cut in the middle of the body"""
+    ranges = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            ranges.append(self.headers.get("Range"))
+            start = 0
+            if self.headers.get("Range"):
+                start = int(self.headers["Range"][len("bytes=") : -1])
+                self.send_response(206)
+                self.send_header("Content-Range", f"bytes {start}-{len(IMAGE) - 1}/{len(IMAGE)}")
+            else:
+                self.send_response(200)
+            body = IMAGE[start:]
+            self.send_header("Content-Length", str(len(body)))
+            self.send_header("ETag", f'"{etag}"')
+            self.end_headers()
+            if cut_every_response or len(ranges) == 1:
+                self.wfile.write(body[: len(body) // 2])
+                self.wfile.flush()
+                self.close_connection = True
+                return
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}/image.jpg", ranges
+
+
+def download(url, path):
+    client = SimpleNamespace(
+        url="http://127.0.0.1/api/",
+        base_url="http://127.0.0.1",
+        default_team=None,
+        retry_policy=RetryPolicy(max_attempts=1),
+        rate_limiters={"cdn": TokenBucket()},
+        instrumentation=None,
+    )
+
+    async def main():
+        async with AsyncClient(client) as async_client:
+            await download_image_async(async_client, url, path)
+
+    asyncio.run(main())
+
+
+def test_interrupted_async_download_is_resumed(tmp_path):
+    server, url, ranges = serve(cut_every_response=False)
+    path = tmp_path / "image.jpg"
+    try:
+        download(url, path)
+    finally:
+        server.shutdown()
+    assert path.read_bytes() == IMAGE
+    assert ranges == [None, f"bytes={len(IMAGE) // 2}-"]
+    assert not (tmp_path / f"image.jpg{PART_SUFFIX}").exists()
+
+
+def test_interrupted_async_download_never_leaves_a_truncated_image(tmp_path):
+    server, url, _ = serve(cut_every_response=True)
+    path = tmp_path / "image.jpg"
+    try:
+        with pytest.raises(Exception):
+            download(url, path)
+    finally:
+        server.shutdown()
+    assert not path.exists()
+    assert (tmp_path / f"image.jpg{PART_SUFFIX}").exists()
+
+
+def test_errors_not_encoded_in_json_keep_their_status():
+    def json():
+        raise ValueError("Expecting value")
+
+    xml = "<Error><Code>AccessDenied</Code></Error>"
+    response = SimpleNamespace(status_code=403, json=json, text=xml)
+    with pytest.raises(Exception) as error:
+        _raise_for_status("http://127.0.0.1/image.jpg", response)
+    assert error.value.args == (403, xml)
+
+
+def test_etags_are_not_taken_for_the_md5_of_the_image(tmp_path):
+    # e.g. the ETag of a S3 object encrypted with SSE-KMS
+    etag = hashlib.md5(b"not the image").hexdigest()
+    assert _expected_md5({"ETag": f'"{etag}"'}) is None
+    server, url, _ = serve(cut_every_response=False, etag=etag)
+    path = tmp_path / "image.jpg"
+    try:
+        download(url, path)
+    finally:
+        server.shutdown()
+    assert path.read_bytes() == IMAGE
@@ -0,0 +1,39 @@
+from pathlib import Path
+
+from darwin.dataset.journal import (
+    CONFIRMED,
+    REGISTERED,
+    UPLOADED,
+    UploadJournal,
+    replay_journal,
+)
+
+
+def test_replay_only_keeps_the_details_of_the_files_not_confirmed(tmp_path):
+    path = tmp_path / "journal.jsonl"
+    with UploadJournal(path) as journal:
+        journal.record(Path("a.jpg"), REGISTERED, id=1, key="a", endpoint_prefix="dataset_images")
+        journal.record(Path("b.jpg"), REGISTERED, id=2, key="b", endpoint_prefix="dataset_images")
+        journal.record(Path("a.jpg"), UPLOADED)
+        journal.record(Path("b.jpg"), CONFIRMED)
+    unfinished, confirmed = replay_journal(path)
+    assert confirmed == {"b.jpg"}
+    assert unfinished == {
+        "a.jpg": {
+            "file_path": "a.jpg",
+            "state": UPLOADED,
+            "id": 1,
+            "key": "a",
+            "endpoint_prefix": "dataset_images",
+        }
+    }
+
+
+def test_records_made_once_closed_do_not_leave_the_journal_open(tmp_path):
+    path = tmp_path / "journal.jsonl"
+    journal = UploadJournal(path)
+    journal.record(Path("a.jpg"), REGISTERED, id=1, key="a", endpoint_prefix="dataset_images")
+    journal.close()
+    journal.record(Path("a.jpg"), CONFIRMED)
+    assert journal._fd is None
+    assert replay_journal(path) == ({}, {"a.jpg"})
@@ -0,0 +1,107 @@
+import asyncio
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from darwin.dataset import upload_manager
+from darwin.dataset.upload_manager import _delayed_upload_function, add_files_to_dataset_async
+from darwin.exceptions import MultipartUploadNotAborted
+from darwin.retry import RetryPolicy
+
+
+class FakeAsyncClient:
+    """Registers every file, fails to sign `unsigned.jpg` and records the confirmations"""
+
+    def __init__(self):
+        self.confirmed = []
+        self.registrations = 0
+
+    async def put(self, endpoint, payload, team=None, retry=False, **kwargs):
+        if endpoint.endswith("/data"):
+            first = self.registrations * 1000
+            self.registrations += 1
+            return {
+                "image_data": [
+                    {"id": first + i, "key": name, "original_filename": name}
+                    for i, name in enumerate(payload["image_filenames"])
+                ]
+            }
+        self.confirmed.append(int(endpoint.split("/")[2]))
+        return {}
+
+    async def post(self, endpoint, payload, team=None, retry=False, **kwargs):
+        if payload["filePath"].endswith("unsigned.jpg"):
+            raise ConnectionError("sign_upload failed")
+        return {"signature": {}, "postEndpoint": payload["filePath"]}
+
+
+def test_async_uploads_report_failures_and_only_confirm_files_on_s3(monkeypatch):
+    async def upload_file_to_s3_async(client, signature, end_point, file_path):
+        return 503 if file_path.name == "unavailable.jpg" else 204
+
+    monkeypatch.setattr(upload_manager, "upload_file_to_s3_async", upload_file_to_s3_async)
+    client = FakeAsyncClient()
+    filenames = [Path("ok.jpg"), Path("unsigned.jpg"), Path("unavailable.jpg")]
+    responses = asyncio.run(add_files_to_dataset_async(client, "1", filenames, "team"))
+
+    assert [response["file_path"] for response in responses] == filenames
+    ok, unsigned, unavailable = responses
+    assert ok["s3_response_status_code"] == 204 and "error" not in ok
+    assert isinstance(unsigned["error"], ConnectionError)
+    assert unsigned["s3_response_status_code"] is None
+    assert unavailable["s3_response_status_code"] == 503
+    assert unavailable["backend_response"] is None
+    assert client.confirmed == [ok["image_id"]]
+
+
+def test_async_uploads_keep_the_order_of_the_registrations(monkeypatch):
+    async def upload_file_to_s3_async(client, signature, end_point, file_path):
+        # Files of later chunks complete first
+        await asyncio.sleep(0.001 * (500 - int(file_path.stem)) / 100)
+        return 204
+
+    monkeypatch.setattr(upload_manager, "upload_file_to_s3_async", upload_file_to_s3_async)
+    filenames = [Path(f"{i}.jpg") for i in range(500)]
+    responses = asyncio.run(
+        add_files_to_dataset_async(FakeAsyncClient(), "1", filenames, "team", max_concurrency=50)
+    )
+    assert [response["file_path"] for response in responses] == filenames
+
+
+def test_multipart_uploads_not_aborted_are_reported_and_not_confirmed(tmp_path, monkeypatch):
+    pytest.importorskip("requests")
+    monkeypatch.setattr(upload_manager, "MULTIPART_THRESHOLD", 1)
+    video = tmp_path / "video.mp4"
+    video.write_bytes(b"0" * 10)
+    confirmed = []
+
+    class Session:
+        def put(self, url, data):
+            return SimpleNamespace(status_code=500, headers={})
+
+        def delete(self, url):
+            raise ConnectionError("abort failed")
+
+    def post(endpoint, payload, team=None, **kwargs):
+        return {"partUrls": ["https://s3/part"], "completeUrl": "", "abortUrl": "https://s3/abort"}
+
+    def put(endpoint, payload, team=None, **kwargs):
+        confirmed.append(endpoint)
+        return {}
+
+    client = SimpleNamespace(
+        unsupported_endpoints=set(),
+        retry_policy=RetryPolicy(max_attempts=1),
+        get_session=lambda endpoint_class: Session(),
+        post=post,
+        put=put,
+    )
+    response = _delayed_upload_function(
+        client, {"id": 1, "key": "video.mp4"}, video, "dataset_videos", "team"
+    )
+    assert isinstance(response["error"], MultipartUploadNotAborted)
+    assert isinstance(response["error"].__cause__, ConnectionError)
+    assert response["s3_response_status_code"] == 500
+    assert response["backend_response"] is None
+    assert confirmed == []
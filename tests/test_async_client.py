@@ -0,0 +1,109 @@
+import asyncio
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("aiohttp")
+
+from darwin.async_client import AsyncClient
+from darwin.client import ENDPOINT_CLASSES, Client
+from darwin.config import Config
+from darwin.dataset_index import DatasetIndex
+from darwin.http_cache import HttpCache
+from darwin.retry import RetryPolicy
+from darwin.throttle import TokenBucket
+
+
+def make_client():
+    return SimpleNamespace(
+        url="http://127.0.0.1/api/",
+        base_url="http://127.0.0.1",
+        default_team=None,
+        retry_policy=RetryPolicy(max_attempts=1),
+        rate_limiters={endpoint_class: TokenBucket() for endpoint_class in ENDPOINT_CLASSES},
+        instrumentation=None,
+    )
+
+
+def test_requests_in_flight_are_not_bounded_by_the_threads_limit():
+    requests = 200
+    in_flight = 0
+    peak = 0
+
+    async def main():
+        all_sent = asyncio.Event()
+
+        async def send():
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            if peak == requests:
+                all_sent.set()
+            await asyncio.wait_for(all_sent.wait(), 5)
+            in_flight -= 1
+            return SimpleNamespace(status=200, headers={})
+
+        async with AsyncClient(make_client(), max_concurrency=requests) as client:
+            await asyncio.gather(
+                *[client.run(send, "get", "http://127.0.0.1/") for _ in range(requests)]
+            )
+
+    asyncio.run(main())
+    assert peak == requests
+
+
+def test_requests_in_flight_are_bounded_by_max_concurrency():
+    in_flight = 0
+    peak = 0
+
+    async def main():
+        async def send():
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return SimpleNamespace(status=200, headers={})
+
+        async with AsyncClient(make_client(), max_concurrency=10) as client:
+            await asyncio.gather(*[client.run(send, "get", "http://127.0.0.1/") for _ in range(50)])
+
+    asyncio.run(main())
+    assert peak == 10
+
+
+def test_writes_invalidate_what_the_client_cached(tmp_path):
+    class Handler(BaseHTTPRequestHandler):
+        def do_PUT(self):
+            self.rfile.read(int(self.headers["Content-Length"]))
+            self.send_response(200)
+            self.send_header("Content-Length", "2")
+            self.end_headers()
+            self.wfile.write(b"{}")
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    api_url = f"http://127.0.0.1:{server.server_port}/api/"
+    config = Config(None)
+    config.set_global(api_url, f"http://127.0.0.1:{server.server_port}", "team")
+    config.set_team("team", "key", str(tmp_path))
+    client = Client(config, dataset_index=DatasetIndex(), http_cache=HttpCache(tmp_path / "http"))
+    client.dataset_index.update("team", [{"id": 1, "slug": "cats"}, {"id": 2, "slug": "dogs"}])
+    client.http_cache.put("team", f"{api_url}datasets?page_size=500", b"[]")
+
+    async def main():
+        async with AsyncClient(client) as async_client:
+            await async_client.put("datasets/1/archive", {})
+
+    try:
+        asyncio.run(main())
+    finally:
+        server.shutdown()
+    assert client.dataset_index.get("team", "cats") is None
+    assert client.dataset_index.get("team", "dogs") is not None
+    assert client.http_cache.get("team", f"{api_url}datasets?page_size=500") is None
@@ -0,0 +1,21 @@
+from darwin.http_cache import HttpCache
+
+DATASETS = "https://darwin.v7labs.com/api/datasets?page_size=500"
+
+
+def test_revalidations_do_not_grow_the_size_of_the_cache(tmp_path):
+    cache = HttpCache(tmp_path)
+    cache.put("team", DATASETS, b"[]", etag='"1"')
+    for _ in range(10):
+        cache.revalidate("team", cache.get("team", DATASETS))
+    assert cache._size == sum(size for _, size, _ in cache._entries())
+
+
+def test_changes_only_drop_the_responses_they_may_affect(tmp_path):
+    cache = HttpCache(tmp_path)
+    cache.put("team", DATASETS, b"[]")
+    cache.invalidate("team", "https://darwin.v7labs.com/api/dataset_images/1/confirm_upload")
+    assert cache.get("team", DATASETS) is not None
+    cache.invalidate("team", "https://darwin.v7labs.com/api/datasets/1/archive")
+    assert cache.get("team", DATASETS) is None
+    assert cache._size == 0
@@ -0,0 +1,21 @@
+import pytest
+
+from darwin.pagination import iter_json_array
+
+
+@pytest.mark.parametrize(
+    "chunks, items",
+    [
+        ([b"[0.", b"53]"], [0.53]),
+        ([b"[1e", b"5]"], [1e5]),
+        ([b"[1", b"2, -", b"3.5E-", b"1 ]"], [12, -0.35]),
+        ([b'[{"a": 1}', b', tr', b"ue]"], [{"a": 1}, True]),
+    ],
+)
+def test_items_cut_by_the_end_of_a_chunk_are_decoded_whole(chunks, items):
+    assert list(iter_json_array(chunks)) == items
+
+
+def test_malformed_items_are_rejected():
+    with pytest.raises(ValueError):
+        list(iter_json_array([b"[1", b"x]"]))
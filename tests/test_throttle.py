@@ -0,0 +1,76 @@
+import threading
+import time
+
+from darwin.client import Client
+from darwin.config import Config
+from darwin.executor import DEFAULT_MAX_WORKERS
+from darwin.throttle import AdaptiveConcurrency
+
+
+def _run(concurrency: AdaptiveConcurrency, workers: int, duration: float = 0.01) -> int:
+    """Sends fake requests from several threads, returning the highest number in flight"""
+    lock = threading.Lock()
+    in_flight = 0
+    peak = 0
+
+    def request():
+        nonlocal in_flight, peak
+        with concurrency.slot():
+            with lock:
+                in_flight += 1
+                peak = max(peak, in_flight)
+            time.sleep(duration)
+            with lock:
+                in_flight -= 1
+
+    threads = [threading.Thread(target=request) for _ in range(workers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return peak
+
+
+def test_slot_limits_requests_in_flight():
+    assert _run(AdaptiveConcurrency(initial=3, maximum=64), workers=16) == 3
+
+
+def test_slot_follows_limit_decrease():
+    concurrency = AdaptiveConcurrency(initial=8, maximum=64, cooldown=0)
+    concurrency.record(0.1, 503)
+    assert concurrency.limit == 4
+    assert _run(concurrency, workers=16) == 4
+
+
+def test_limit_increase_releases_waiting_requests():
+    concurrency = AdaptiveConcurrency(initial=1, maximum=64, latency_tolerance=None)
+    entered = threading.Event()
+    release = threading.Event()
+
+    def hold():
+        with concurrency.slot():
+            release.wait(5)
+
+    def wait():
+        with concurrency.slot():
+            entered.set()
+
+    holder = threading.Thread(target=hold)
+    holder.start()
+    waiter = threading.Thread(target=wait)
+    waiter.start()
+    assert not entered.wait(0.05)
+    # The limit reaches 2 after one healthy response
+    concurrency.record(0.1, 200)
+    assert entered.wait(5)
+    release.set()
+    holder.join()
+    waiter.join()
+
+
+def test_client_tunes_each_endpoint_class_independently():
+    client = Client(Config(None))
+    assert all(c.limit == DEFAULT_MAX_WORKERS for c in client.concurrency.values())
+    client.concurrency["s3"].record(5.0, 503)
+    assert client.concurrency["s3"].limit == DEFAULT_MAX_WORKERS // 2
+    assert client.concurrency["api"].limit == DEFAULT_MAX_WORKERS